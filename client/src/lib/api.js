@@ -49,6 +49,14 @@ api.interceptors.response.use(
   }
 )
 
+// Order listings return one page at a time, newest first, with the cursor for
+// the next (older) page in X-Next-Cursor. Resolves to { data, nextCursor };
+// pass nextCursor back as `before` to load more, it is null on the last page.
+export const getOrderPage = async (url, params = {}, before) => {
+  const response = await api.get(url, { params: { ...params, before } })
+  return { data: response.data, nextCursor: response.headers['x-next-cursor'] || null }
+}
+
 // Auth API
 export const authAPI = {
   login: (credentials) => {
@@ -78,7 +86,7 @@ export const employeeAPI = {
     api.get('/api/employee/menu-items/filter', { params: filters }),
   getCategories: () => api.get('/api/employee/categories'),
   getCafeCategories: (cafeId) => api.get(`/api/employee/cafes/${cafeId}/categories`),
-  getMyOrders: () => api.get('/api/employee/orders'),
+  getMyOrders: (before) => getOrderPage('/api/employee/orders', {}, before),
   getOrderDetails: (orderId) => api.get(`/api/employee/orders/${orderId}`),
   initializeDummyData: () => api.post('/api/employee/init-dummy-data'),
 }
@@ -125,10 +133,11 @@ export const cafeOwnerAPI = {
     api.patch(`/api/cafe-owner/menu-items/${itemId}/restock`, { quantity }),
   
   // Order Management
-  getCafeOrders: (statusFilter) => 
-    api.get('/api/cafe-owner/orders', { params: { status_filter: statusFilter } }),
-  getSpecificCafeOrders: (cafeId, statusFilter) => 
-    api.get(`/api/cafe-owner/cafes/${cafeId}/orders`, { params: { status_filter: statusFilter } }),
+  getCafeOrders: (statusFilter, before) => 
+    getOrderPage('/api/cafe-owner/orders', { status_filter: statusFilter }, before),
+  getCafeOrdersSummary: () => api.get('/api/cafe-owner/orders/summary'),
+  getSpecificCafeOrders: (cafeId, statusFilter, before) => 
+    getOrderPage(`/api/cafe-owner/cafes/${cafeId}/orders`, { status_filter: statusFilter }, before),
   updateOrderStatus: (orderId, statusData) => 
     api.patch(`/api/cafe-owner/orders/${orderId}/status`, statusData),
   
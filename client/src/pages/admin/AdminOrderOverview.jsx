@@ -5,11 +5,16 @@ import { Input } from '@/components/ui/input';
 import { Badge } from '@/components/ui/badge';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { useTheme } from '@/context/ThemeContext';
+import api, { getOrderPage } from '@/lib/api';
+import { Button } from '@/components/ui/button';
 
 const AdminOrderOverview = () => {
   const { theme } = useTheme();
   const [orders, setOrders] = useState([]);
+  const [summary, setSummary] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [filterStatus, setFilterStatus] = useState('all');
 
@@ -19,17 +24,14 @@ const AdminOrderOverview = () => {
 
   const fetchOrders = async () => {
     try {
-      const token = localStorage.getItem('token');
-      const response = await fetch('/api/admin/orders', {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
-      
-      if (response.ok) {
-        const data = await response.json();
-        setOrders(data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at)));
-      }
+      // Pages come newest first; totals come from the server rather than the loaded pages
+      const [page, summaryResponse] = await Promise.all([
+        getOrderPage('/api/admin/orders'),
+        api.get('/api/admin/orders/summary')
+      ]);
+      setOrders(page.data);
+      setNextCursor(page.nextCursor);
+      setSummary(summaryResponse.data);
     } catch (error) {
       console.error('Error fetching orders:', error);
     } finally {
@@ -37,6 +39,19 @@ const AdminOrderOverview = () => {
     }
   };
 
+  const fetchMoreOrders = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await getOrderPage('/api/admin/orders', {}, nextCursor);
+      setOrders(prev => [...prev, ...page.data]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error fetching more orders:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getStatusColor = (status) => {
     switch (status) {
       case 'PENDING':
@@ -66,10 +81,10 @@ const AdminOrderOverview = () => {
     return matchesSearch && matchesStatus;
   });
 
-  const totalRevenue = orders.reduce((sum, order) => sum + (order.total_amount || 0), 0);
-  const totalOrders = orders.length;
-  const completedOrders = orders.filter(order => order.status === 'DELIVERED').length;
-  const pendingOrders = orders.filter(order => order.status === 'PENDING').length;
+  const totalRevenue = summary?.total_revenue || 0;
+  const totalOrders = summary?.total_orders || 0;
+  const completedOrders = summary?.delivered_orders || 0;
+  const pendingOrders = summary?.pending_orders || 0;
 
   return (
     <div className="space-y-6">
@@ -236,6 +251,13 @@ const AdminOrderOverview = () => {
               </tbody>
             </table>
           </div>
+          {nextCursor && (
+            <div className="pt-4">
+              <Button variant="outline" className="w-full" onClick={fetchMoreOrders} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more orders'}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
@@ -13,7 +13,9 @@ import { ThemeToggle } from '@/components/ui/theme-toggle'
 const Orders = () => {
   const { user } = useAuth()
   const [orders, setOrders] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [cancelLoading, setCancelLoading] = useState({})
 
   // Removed WebSocket real-time updates to fix connection issues
@@ -27,8 +29,9 @@ const Orders = () => {
 
   const loadOrders = async () => {
     try {
-      const response = await employeeAPI.getMyOrders()
-      setOrders(response.data)
+      const page = await employeeAPI.getMyOrders()
+      setOrders(page.data)
+      setNextCursor(page.nextCursor)
     } catch (error) {
       toast({
         title: "Error",
@@ -40,6 +43,23 @@ const Orders = () => {
     }
   }
 
+  const loadMoreOrders = async () => {
+    setLoadingMore(true)
+    try {
+      const page = await employeeAPI.getMyOrders(nextCursor)
+      setOrders(prev => [...prev, ...page.data])
+      setNextCursor(page.nextCursor)
+    } catch (error) {
+      toast({
+        title: "Error",
+        description: "Failed to load more orders. Please try again.",
+        variant: "destructive",
+      })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleCancelOrder = async (orderId, orderNumber) => {
     setCancelLoading(prev => ({ ...prev, [orderId]: true }))
     
@@ -49,7 +69,8 @@ const Orders = () => {
         title: "Order Cancelled",
         description: `Order #${orderNumber} has been cancelled successfully.`,
       })
-      loadOrders() // Refresh orders list
+      // Update in place so older pages that were loaded stay on screen
+      setOrders(prev => prev.map(order => order.id === orderId ? { ...order, status: 'CANCELLED' } : order))
     } catch (error) {
       toast({
         title: "Error",
@@ -181,6 +202,11 @@ const Orders = () => {
                 </CardContent>
               </Card>
             ))}
+            {nextCursor && (
+              <Button variant="outline" className="w-full" onClick={loadMoreOrders} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more orders'}
+              </Button>
+            )}
           </div>
         )}
       </div>
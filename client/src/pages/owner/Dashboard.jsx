@@ -55,24 +55,22 @@ const Dashboard = () => {
   const loadDashboardData = async () => {
     try {
       setLoading(true)
-      const [cafesResponse, ordersResponse] = await Promise.all([
+      const [cafesResponse, ordersPage, summaryResponse] = await Promise.all([
         cafeOwnerAPI.getMyCafes(),
-        cafeOwnerAPI.getCafeOrders()
+        cafeOwnerAPI.getCafeOrders(),
+        cafeOwnerAPI.getCafeOrdersSummary()
       ])
       
       setCafes(cafesResponse.data)
-      setOrders(ordersResponse.data)
+      // The newest page is enough for the recent orders list; totals come from the server
+      setOrders(ordersPage.data)
       
-      // Calculate stats
-      const totalOrders = ordersResponse.data.length
-      const totalRevenue = ordersResponse.data.reduce((sum, order) => sum + order.total_amount, 0)
-      const pendingOrders = ordersResponse.data.filter(order => order.status === 'PENDING').length
       const activeCafes = cafesResponse.data.filter(cafe => cafe.is_active).length
       
       setStats({
-        totalOrders,
-        totalRevenue,
-        pendingOrders,
+        totalOrders: summaryResponse.data.total_orders,
+        totalRevenue: summaryResponse.data.total_revenue,
+        pendingOrders: summaryResponse.data.pending_orders,
         activeCafes
       })
     } catch (error) {
@@ -13,7 +13,9 @@ import { ArrowLeft, Clock, CheckCircle, XCircle, Package, Receipt, Edit, X } fro
 
 const OrderManagement = () => {
   const [orders, setOrders] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [statusFilter, setStatusFilter] = useState('all')
   const [showUpdateModal, setShowUpdateModal] = useState(false)
   const [selectedOrder, setSelectedOrder] = useState(null)
@@ -61,10 +63,10 @@ const OrderManagement = () => {
   const loadOrders = async () => {
     setLoading(true)
     try {
-      const response = await cafeOwnerAPI.getCafeOrders(statusFilter === 'all' ? undefined : statusFilter)
-      // Sort orders by newest first (created_at descending)
-      const sortedOrders = response.data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-      setOrders(sortedOrders)
+      // Pages come newest first
+      const page = await cafeOwnerAPI.getCafeOrders(statusFilter === 'all' ? undefined : statusFilter)
+      setOrders(page.data)
+      setNextCursor(page.nextCursor)
     } catch (error) {
       toast({
         title: "Error",
@@ -76,6 +78,23 @@ const OrderManagement = () => {
     }
   }
 
+  const loadMoreOrders = async () => {
+    setLoadingMore(true)
+    try {
+      const page = await cafeOwnerAPI.getCafeOrders(statusFilter === 'all' ? undefined : statusFilter, nextCursor)
+      setOrders(prev => [...prev, ...page.data])
+      setNextCursor(page.nextCursor)
+    } catch (error) {
+      toast({
+        title: "Error",
+        description: error.response?.data?.detail || "Failed to load more orders.",
+        variant: "destructive",
+      })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleUpdateOrder = (order) => {
     setSelectedOrder(order)
     setUpdateData({
@@ -100,9 +119,15 @@ const OrderManagement = () => {
         description: "Order status updated successfully.",
       })
       
+      // Update in place so older pages that were loaded stay on screen
+      const updatedId = selectedOrder.id
+      setOrders(prev => prev.map(order => order.id === updatedId ? {
+        ...order,
+        status: updateData.status,
+        estimated_preparation_time: updateData.estimated_preparation_time ? parseInt(updateData.estimated_preparation_time) : null
+      } : order))
       setShowUpdateModal(false)
       setSelectedOrder(null)
-      loadOrders()
     } catch (error) {
       toast({
         title: "Error",
@@ -243,6 +268,11 @@ const OrderManagement = () => {
                 </CardContent>
               </Card>
             ))}
+            {nextCursor && (
+              <Button variant="outline" className="w-full" onClick={loadMoreOrders} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more orders'}
+              </Button>
+            )}
           </div>
         )}
 
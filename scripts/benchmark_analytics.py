@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark admin analytics as the orders table grows.
+
+Builds throwaway SQLite databases with increasing numbers of orders spread
+over 90 days and times a 30-day summary computed live from the orders and
+order_items tables against the same summary read from the daily rollups.
+
+Usage: python scripts/benchmark_analytics.py [--sizes 10000,100000,300000] [--runs 20]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'admin-service'))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem, Order, OrderItem, OrderStatus
+from rollups import rebuild_rollups, analytics_range, sales_summary
+
+CAFES = 20
+DAYS = 90
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Admin analytics benchmark")
+    parser.add_argument("--sizes", default="10000,100000,300000", help="Comma-separated order counts")
+    parser.add_argument("--runs", type=int, default=20, help="Summaries per method and size")
+    return parser.parse_args()
+
+def create_orders(SessionLocal, size: int):
+    rng = random.Random(size)
+    db = SessionLocal()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    customer = User(email="emp@bench.local", username="emp", hashed_password="x",
+                    full_name="Bench Employee", user_type=UserType.EMPLOYEE)
+    db.add_all([owner, customer])
+    db.flush()
+    cafes = [Cafe(name=f"Cafe {index}", owner_id=owner.id) for index in range(CAFES)]
+    category = Category(name="Mains")
+    db.add_all(cafes + [category])
+    db.flush()
+    items = [MenuItem(name=f"Item {index}", price=5.0, available_quantity=50, max_daily_quantity=50,
+                      cafe_id=cafe.id, category_id=category.id) for index, cafe in enumerate(cafes)]
+    db.add_all(items)
+    db.flush()
+
+    now = datetime.utcnow()
+    statuses = [OrderStatus.DELIVERED] * 8 + [OrderStatus.PENDING, OrderStatus.CANCELLED]
+    order_rows, item_rows = [], []
+    for index in range(size):
+        cafe = rng.randrange(CAFES)
+        quantity = rng.randint(1, 3)
+        order_rows.append({
+            "id": index + 1,
+            "order_number": f"B{index:08d}",
+            "customer_id": customer.id,
+            "cafe_id": cafes[cafe].id,
+            "total_amount": 5.0 * quantity,
+            "status": rng.choice(statuses),
+            "created_at": now - timedelta(seconds=rng.randrange(DAYS * 86400))
+        })
+        item_rows.append({
+            "order_id": index + 1,
+            "menu_item_id": items[cafe].id,
+            "quantity": quantity,
+            "unit_price": 5.0,
+            "total_price": 5.0 * quantity
+        })
+    db.bulk_insert_mappings(Order, order_rows)
+    db.bulk_insert_mappings(OrderItem, item_rows)
+    db.commit()
+    db.close()
+
+def live_summary(db, date_from, date_to) -> dict:
+    """The summary the way it would be computed without rollups."""
+    start = datetime.combine(date_from, datetime.min.time())
+    end = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+    in_range = (Order.created_at >= start, Order.created_at < end)
+    orders = db.query(func.count(Order.id)).filter(*in_range).scalar()
+    completed = (*in_range, Order.status != OrderStatus.CANCELLED)
+    revenue = db.query(func.coalesce(func.sum(Order.total_amount), 0.0)).filter(*completed).scalar()
+    items = db.query(func.coalesce(func.sum(OrderItem.quantity), 0)).join(
+        Order, OrderItem.order_id == Order.id
+    ).filter(*completed).scalar()
+    return {"orders": orders, "revenue": round(revenue, 2), "items_sold": items}
+
+def timed(fn, runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) * 1000 / runs
+
+def main():
+    args = parse_args()
+    print(f"{'orders':>8} {'live ms':>10} {'rollup ms':>10} {'rebuild ms':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(value) for value in args.sizes.split(",")):
+            engine = create_engine(f"sqlite:///{os.path.join(workdir, f'analytics_{size}.db')}")
+            Base.metadata.create_all(bind=engine)
+            SessionLocal = sessionmaker(bind=engine)
+            create_orders(SessionLocal, size)
+
+            db = SessionLocal()
+            started = time.perf_counter()
+            rebuild_rollups(db)
+            rebuild_ms = (time.perf_counter() - started) * 1000
+
+            date_from, date_to = analytics_range(None, None)
+            live = live_summary(db, date_from, date_to)
+            rolled = sales_summary(db, date_from, date_to)
+            if any(live[key] != rolled[key] for key in live):
+                print(f"mismatch at {size} orders: live {live}, rollup {rolled}")
+                sys.exit(1)
+
+            live_ms = timed(lambda: live_summary(db, date_from, date_to), args.runs)
+            rollup_ms = timed(lambda: sales_summary(db, date_from, date_to), args.runs)
+            print(f"{size:>8} {live_ms:>10.2f} {rollup_ms:>10.2f} {rebuild_ms:>11.0f}")
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark order listings on the sync and async database paths.
+
+Serves one page of a customer's orders (with cafe and line items) two ways
+from the same FastAPI app: the previous pattern, an `async def` handler
+querying through the synchronous Session, which blocks the event loop for
+the whole query, and the AsyncSession path the services now use. Concurrent
+clients hit each route for a fixed time while a probe measures event loop
+lag (how late a 10 ms timer fires), which is how long any other request on
+that worker waits before it is even looked at.
+
+Keep --concurrency below the pool capacity (DB_POOL_SIZE + DB_MAX_OVERFLOW,
+15 by default): past it the sync path stalls for DB_POOL_TIMEOUT_SECONDS,
+because a handler waiting for a connection blocks the event loop that would
+run the teardown returning one.
+
+Usage: python scripts/benchmark_async_reads.py [--orders 20000] [--concurrency 12] [--seconds 10]
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'order-service'))
+
+import httpx
+from fastapi import Depends, FastAPI, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import joinedload, selectinload, sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem, Order, OrderItem, OrderStatus
+from engine_factory import create_service_engine, create_async_service_engine
+from pagination import OrderPageParams, paginate_orders, paginate_orders_async
+
+CUSTOMERS = 200
+CAFES = 10
+PROBE_INTERVAL_SECONDS = 0.01
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync vs async order listing benchmark")
+    parser.add_argument("--orders", type=int, default=20000, help="Orders in the database")
+    parser.add_argument("--concurrency", type=int, default=12, help="Concurrent clients")
+    parser.add_argument("--seconds", type=float, default=10, help="Run time per path")
+    return parser.parse_args()
+
+def seed(engine, size: int):
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(size)
+    db = sessionmaker(bind=engine)()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    customers = [User(email=f"emp{index}@bench.local", username=f"emp{index}", hashed_password="x",
+                      full_name=f"Employee {index}", user_type=UserType.EMPLOYEE) for index in range(CUSTOMERS)]
+    db.add_all([owner] + customers)
+    db.flush()
+    cafes = [Cafe(name=f"Cafe {index}", owner_id=owner.id) for index in range(CAFES)]
+    category = Category(name="Mains")
+    db.add_all(cafes + [category])
+    db.flush()
+    items = [MenuItem(name=f"Item {index}", price=5.0, available_quantity=50, max_daily_quantity=50,
+                      cafe_id=cafe.id, category_id=category.id) for index, cafe in enumerate(cafes)]
+    db.add_all(items)
+    db.flush()
+
+    now = datetime.utcnow()
+    db.execute(Order.__table__.insert(), [{
+        "order_number": f"BENCH-{index}", "total_amount": 10.0, "status": OrderStatus.DELIVERED,
+        "customer_id": customers[rng.randrange(CUSTOMERS)].id, "cafe_id": cafes[index % CAFES].id,
+        "created_at": now - timedelta(minutes=index), "updated_at": now
+    } for index in range(size)])
+    order_ids = [order_id for (order_id,) in db.execute(select(Order.id))]
+    db.execute(OrderItem.__table__.insert(), [{
+        "order_id": order_id, "menu_item_id": items[order_id % CAFES].id,
+        "quantity": 2, "unit_price": 5.0, "total_price": 10.0
+    } for order_id in order_ids])
+    db.commit()
+    customer_ids = [customer.id for customer in customers]
+    db.close()
+    return customer_ids
+
+def order_options():
+    return (joinedload(Order.cafe), selectinload(Order.order_items).joinedload(OrderItem.menu_item))
+
+def serialize(orders):
+    return [{
+        "id": order.id,
+        "order_number": order.order_number,
+        "cafe": order.cafe.name,
+        "items": [{"name": item.menu_item.name, "quantity": item.quantity} for item in order.order_items]
+    } for order in orders]
+
+def build_app(url: str):
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=create_service_engine(url, "benchmark"))
+    async_engine = create_async_service_engine(url, "benchmark")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync/{customer_id}")
+    async def sync_orders(customer_id: int, response: Response, page: OrderPageParams = Depends(), db=Depends(get_db)):
+        query = db.query(Order).options(*order_options()).filter(Order.customer_id == customer_id)
+        return serialize(paginate_orders(query, page, response))
+
+    @app.get("/async/{customer_id}")
+    async def async_orders(customer_id: int, response: Response, page: OrderPageParams = Depends(), db=Depends(get_async_db)):
+        statement = select(Order).options(*order_options()).where(Order.customer_id == customer_id)
+        return serialize(await paginate_orders_async(db, statement, page, response))
+
+    return app, async_engine
+
+async def run(app: FastAPI, async_engine, path: str, customer_ids, args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + args.seconds
+        completed = 0
+        probes = []
+
+        async def load():
+            nonlocal completed
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                response = await client.get(f"/{path}/{rng.choice(customer_ids)}")
+                response.raise_for_status()
+                completed += 1
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+                probes.append((time.perf_counter() - started - PROBE_INTERVAL_SECONDS) * 1000)
+
+        await asyncio.gather(probe(), *(load() for _ in range(args.concurrency)))
+    # Pooled aiosqlite connections belong to this event loop
+    await async_engine.dispose()
+    probes.sort()
+    return completed / args.seconds, statistics.median(probes), probes[int(len(probes) * 0.99) - 1], probes[-1]
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        url = f"sqlite:///{os.path.join(workdir, 'orders.db')}"
+        seed_engine = create_service_engine(url, "benchmark")
+        customer_ids = seed(seed_engine, args.orders)
+        seed_engine.dispose()
+        app, async_engine = build_app(url)
+
+        print(f"{args.orders} orders, {args.concurrency} concurrent clients, {args.seconds:g}s per path")
+        print(f"{'path':>8} {'req/s':>8} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+        for path in ("sync", "async"):
+            rate, p50, p99, worst = asyncio.run(run(app, async_engine, path, customer_ids, args))
+            print(f"{path:>8} {rate:>8.0f} {p50:>11.1f} {p99:>11.1f} {worst:>11.1f}")
+
+if __name__ == "__main__":
+    main()
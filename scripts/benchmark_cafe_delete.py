@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark deleting a cafe with a long order history.
+
+Seeds a throwaway database with one large cafe and deletes it three ways: the
+previous ORM path (load every order, its items and feedback, and delete them
+one by one), cafe_deletion.delete_cafe_rows in one transaction (what
+DELETE /admin/cafes/{id} now does), and the batched path the background job
+takes, one transaction per CAFE_DELETE_BATCH_SIZE orders. The longest
+transaction is how long other writers wait for the SQLite write lock.
+
+Usage: python scripts/benchmark_cafe_delete.py [--orders 50000] [--items-per-order 3] [--batch-size 2000]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'admin-service'))
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import sessionmaker
+from models import (
+    User, UserType, Cafe, Category, MenuItem, Order, OrderItem, OrderFeedback, OrderStatus, migrate_schema
+)
+from engine_factory import create_service_engine
+from cafe_deletion import cafe_footprint, delete_cafe_rows, delete_order_batch
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cafe deletion benchmark")
+    parser.add_argument("--orders", type=int, default=50000, help="Orders placed at the cafe")
+    parser.add_argument("--items-per-order", type=int, default=3, help="Order items per order")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Orders per batch on the batched path")
+    return parser.parse_args()
+
+def seed(SessionLocal, args) -> int:
+    db = SessionLocal()
+    owner = User(email="owner@bench.local", username="owner", full_name="Owner",
+                 hashed_password="x", user_type=UserType.CAFE_OWNER)
+    category = Category(name="Coffee")
+    db.add_all([owner, category])
+    db.flush()
+    cafe = Cafe(name="Big Cafe", address="1 Bench Street", owner_id=owner.id)
+    db.add(cafe)
+    db.flush()
+    cafe_id = cafe.id
+    db.execute(insert(MenuItem), [{
+        "name": f"Item {index}", "price": 3.5, "cafe_id": cafe_id, "category_id": category.id,
+        "available_quantity": 50, "max_daily_quantity": 50
+    } for index in range(50)])
+    menu_item_ids = [item.id for item in db.query(MenuItem.id).filter(MenuItem.cafe_id == cafe_id)]
+
+    db.execute(insert(Order), [{
+        "order_number": f"ORD-{index}", "total_amount": 10.5, "customer_id": owner.id,
+        "cafe_id": cafe_id, "status": OrderStatus.DELIVERED
+    } for index in range(args.orders)])
+    order_ids = [row.id for row in db.query(Order.id).filter(Order.cafe_id == cafe_id)]
+    db.execute(insert(OrderItem), [{
+        "order_id": order_id, "menu_item_id": random.choice(menu_item_ids), "quantity": 1, "unit_price": 3.5,
+        "total_price": 3.5
+    } for order_id in order_ids for _ in range(args.items_per_order)])
+    db.execute(insert(OrderFeedback), [{
+        "order_id": order_id, "customer_id": owner.id, "cafe_id": cafe_id, "rating": 4
+    } for order_id in order_ids[::4]])
+    db.commit()
+    db.close()
+    return cafe_id
+
+def orm_delete(db, cafe_id) -> list:
+    """The previous approach: every row loaded and deleted through the session."""
+    started = time.perf_counter()
+    for order in db.query(Order).filter(Order.cafe_id == cafe_id).all():
+        for order_item in db.query(OrderItem).filter(OrderItem.order_id == order.id).all():
+            db.delete(order_item)
+        for feedback in db.query(OrderFeedback).filter(OrderFeedback.order_id == order.id).all():
+            db.delete(feedback)
+        db.delete(order)
+    for item in db.query(MenuItem).filter(MenuItem.cafe_id == cafe_id).all():
+        db.delete(item)
+    for feedback in db.query(OrderFeedback).filter(OrderFeedback.cafe_id == cafe_id).all():
+        db.delete(feedback)
+    db.delete(db.query(Cafe).filter(Cafe.id == cafe_id).first())
+    db.commit()
+    return [time.perf_counter() - started]
+
+def set_based_delete(db, cafe_id) -> list:
+    started = time.perf_counter()
+    delete_cafe_rows(db, cafe_id)
+    db.commit()
+    return [time.perf_counter() - started]
+
+def batched_delete(db, cafe_id, batch_size) -> list:
+    """CafeDeletionJob.run, timing each transaction."""
+    transactions = []
+    started = time.perf_counter()
+    db.execute(update(Cafe).where(Cafe.id == cafe_id).values(is_active=False))
+    db.commit()
+    transactions.append(time.perf_counter() - started)
+    while True:
+        started = time.perf_counter()
+        counts = delete_order_batch(db, cafe_id, batch_size)
+        db.commit()
+        transactions.append(time.perf_counter() - started)
+        if not counts["orders"]:
+            break
+    started = time.perf_counter()
+    delete_cafe_rows(db, cafe_id)
+    db.commit()
+    transactions.append(time.perf_counter() - started)
+    return transactions
+
+def main():
+    args = parse_args()
+    paths = [
+        ("orm", orm_delete),
+        ("set-based", set_based_delete),
+        ("batched", lambda db, cafe_id: batched_delete(db, cafe_id, args.batch_size))
+    ]
+    print(f"{args.orders} orders, {args.items_per_order} items each, batches of {args.batch_size}")
+    print(f"{'path':>10} {'rows':>9} {'seconds':>8} {'transactions':>13} {'longest ms':>11}")
+    for name, delete_cafe in paths:
+        with tempfile.TemporaryDirectory() as workdir:
+            engine = create_service_engine(f"sqlite:///{os.path.join(workdir, 'cafes.db')}", "benchmark")
+            migrate_schema(engine)
+            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            cafe_id = seed(SessionLocal, args)
+
+            db = SessionLocal()
+            rows = sum(cafe_footprint(db, cafe_id).values()) + 1
+            db.close()
+            db = SessionLocal()
+            transactions = delete_cafe(db, cafe_id)
+            remaining = sum(cafe_footprint(db, cafe_id).values())
+            db.close()
+            engine.dispose()
+
+        assert remaining == 0, f"{name} left {remaining} rows behind"
+        print(f"{name:>10} {rows:>9} {sum(transactions):>8.2f} {len(transactions):>13} {max(transactions) * 1000:>11.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark mixed read/write throughput on the shared SQLite database.
+
+Runs reader processes (a customer's recent orders with their items) next
+to writer processes (place an order: decrement stock, insert the order and
+its line item, commit) against a throwaway database, first through an engine
+built the way the services used to build theirs (rollback journal, default
+busy handling) and then through engine_factory.create_service_engine (WAL,
+synchronous=NORMAL, busy_timeout, mmap and cache size). Workers are
+separate processes with their own engines, as the services are.
+
+Usage: python scripts/benchmark_db_concurrency.py [--readers 8] [--writers 4] [--seconds 10]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import multiprocessing
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'order-service'))
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem, Order, OrderItem, OrderStatus
+from engine_factory import create_service_engine
+
+CUSTOMERS = 50
+ITEMS = 20
+SEED_ORDERS = 20000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SQLite concurrency benchmark")
+    parser.add_argument("--readers", type=int, default=8, help="Reader processes")
+    parser.add_argument("--writers", type=int, default=4, help="Writer processes")
+    parser.add_argument("--seconds", type=float, default=10, help="Run time per engine")
+    return parser.parse_args()
+
+def seed(engine):
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    customers = [User(email=f"emp{index}@bench.local", username=f"emp{index}", hashed_password="x",
+                      full_name=f"Employee {index}", user_type=UserType.EMPLOYEE) for index in range(CUSTOMERS)]
+    db.add_all([owner] + customers)
+    db.flush()
+    cafe = Cafe(name="Bench Cafe", owner_id=owner.id)
+    category = Category(name="Mains")
+    db.add_all([cafe, category])
+    db.flush()
+    db.add_all([MenuItem(name=f"Item {index}", price=5.0, available_quantity=10**9, max_daily_quantity=10**9,
+                         cafe_id=cafe.id, category_id=category.id) for index in range(ITEMS)])
+    db.flush()
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    db.execute(Order.__table__.insert(), [{
+        "order_number": f"SEED-{index}", "total_amount": 5.0, "status": OrderStatus.DELIVERED,
+        "customer_id": customers[rng.randrange(CUSTOMERS)].id, "cafe_id": cafe.id,
+        "created_at": now, "updated_at": now
+    } for index in range(SEED_ORDERS)])
+    db.commit()
+    ids = ([customer.id for customer in customers], cafe.id,
+           [item_id for (item_id,) in db.execute(select(MenuItem.id))])
+    db.close()
+    return ids
+
+def make_engine(name: str, url: str):
+    if name == "legacy":
+        # How every service built its SQLite engine before engine_factory
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_service_engine(url, "benchmark")
+
+def read_orders(db, rng, customer_ids, cafe_id, item_ids, sequence):
+    db.execute(
+        select(Order.id, Order.order_number, Order.status, OrderItem.quantity, OrderItem.menu_item_id)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .where(Order.customer_id == rng.choice(customer_ids))
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(20)
+    ).all()
+
+def place_order(db, rng, customer_ids, cafe_id, item_ids, sequence):
+    item_id = rng.choice(item_ids)
+    db.execute(update(MenuItem).where(MenuItem.id == item_id)
+               .values(available_quantity=MenuItem.available_quantity - 1))
+    order = Order(order_number=f"{os.getpid()}-{sequence}", total_amount=5.0,
+                  customer_id=rng.choice(customer_ids), cafe_id=cafe_id)
+    db.add(order)
+    db.flush()
+    db.add(OrderItem(order_id=order.id, menu_item_id=item_id, quantity=1, unit_price=5.0, total_price=5.0))
+    db.commit()
+
+def worker(name, url, operation, ids, start, stop, done, errors):
+    engine = make_engine(name, url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random()
+    sequence = 0
+    start.wait()
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            sequence += 1
+            operation(db, rng, *ids, sequence)
+            with done.get_lock():
+                done.value += 1
+        except OperationalError:
+            db.rollback()
+            with errors.get_lock():
+                errors.value += 1
+        finally:
+            db.close()
+    engine.dispose()
+
+def run(name, url, args):
+    engine = make_engine(name, url)
+    ids = seed(engine)
+    engine.dispose()
+
+    start, stop = multiprocessing.Event(), multiprocessing.Event()
+    reads, writes, errors = (multiprocessing.Value("i", 0) for _ in range(3))
+    processes = [multiprocessing.Process(target=worker, args=(name, url, read_orders, ids, start, stop, reads, errors))
+                 for _ in range(args.readers)]
+    processes += [multiprocessing.Process(target=worker, args=(name, url, place_order, ids, start, stop, writes, errors))
+                  for _ in range(args.writers)]
+    for process in processes:
+        process.start()
+    start.set()
+    time.sleep(args.seconds)
+    stop.set()
+    for process in processes:
+        process.join()
+    return {"reads": reads.value, "writes": writes.value, "errors": errors.value}
+
+def main():
+    args = parse_args()
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per engine")
+    print(f"{'engine':>10} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ("legacy", "factory"):
+            result = run(name, f"sqlite:///{os.path.join(workdir, name + '.db')}", args)
+            print(f"{name:>10} {result['reads'] / args.seconds:>10.0f} "
+                  f"{result['writes'] / args.seconds:>10.0f} {result['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admin order export.
+
+Builds a throwaway SQLite database of orders (two line items each) and
+compares dumping it the old way, by loading every Order with its customer,
+cafe and items and serialising one list, against the streaming CSV and
+NDJSON exports. Reports rows per second and peak Python memory.
+
+Usage: python scripts/benchmark_export.py [--orders 200000]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'admin-service'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem, Order, OrderItem, OrderStatus
+from export import stream_orders
+
+CAFES = 20
+ITEMS_PER_ORDER = 2
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Order export benchmark")
+    parser.add_argument("--orders", type=int, default=200000, help="Orders in the database")
+    return parser.parse_args()
+
+def create_orders(SessionLocal, size: int):
+    rng = random.Random(size)
+    db = SessionLocal()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    customer = User(email="emp@bench.local", username="emp", hashed_password="x",
+                    full_name="Bench Employee", user_type=UserType.EMPLOYEE)
+    db.add_all([owner, customer])
+    db.flush()
+    cafes = [Cafe(name=f"Cafe {index}", owner_id=owner.id) for index in range(CAFES)]
+    category = Category(name="Mains")
+    db.add_all(cafes + [category])
+    db.flush()
+    items = [MenuItem(name=f"Item {index}", price=5.0, available_quantity=50, max_daily_quantity=50,
+                      cafe_id=cafe.id, category_id=category.id) for index, cafe in enumerate(cafes)]
+    db.add_all(items)
+    db.flush()
+
+    now = datetime.utcnow()
+    order_rows, item_rows = [], []
+    for index in range(size):
+        cafe = rng.randrange(CAFES)
+        order_rows.append({
+            "id": index + 1,
+            "order_number": f"B{index:08d}",
+            "customer_id": customer.id,
+            "cafe_id": cafes[cafe].id,
+            "total_amount": 5.0 * ITEMS_PER_ORDER,
+            "status": OrderStatus.DELIVERED,
+            "payment_status": "completed",
+            "created_at": now - timedelta(seconds=size - index)
+        })
+        for _ in range(ITEMS_PER_ORDER):
+            item_rows.append({"order_id": index + 1, "menu_item_id": items[cafe].id,
+                              "quantity": 1, "unit_price": 5.0, "total_price": 5.0})
+    db.bulk_insert_mappings(Order, order_rows)
+    db.bulk_insert_mappings(OrderItem, item_rows)
+    db.commit()
+    db.close()
+
+def legacy_export(SessionLocal) -> int:
+    """Everything in memory first, the way /admin/orders builds its response."""
+    db = SessionLocal()
+    try:
+        orders = db.query(Order).all()
+        body = json.dumps([{
+            "id": order.id,
+            "order_number": order.order_number,
+            "total_amount": order.total_amount,
+            "status": order.status.value,
+            "customer_name": order.customer.full_name if order.customer else None,
+            "cafe_name": order.cafe.name if order.cafe else None,
+            "created_at": order.created_at.isoformat(),
+            "items": [{"menu_item_id": item.menu_item_id, "quantity": item.quantity} for item in order.order_items]
+        } for order in orders])
+        return len(body)
+    finally:
+        db.close()
+
+def streamed_export(SessionLocal, export_format: str) -> int:
+    return sum(len(chunk) for chunk in stream_orders(SessionLocal, export_format))
+
+def measure(fn, rows: int):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows / elapsed, peak / (1024 * 1024)
+
+def main():
+    args = parse_args()
+    rows = args.orders * ITEMS_PER_ORDER
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'export.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+        create_orders(SessionLocal, args.orders)
+
+        print(f"{args.orders} orders, {rows} line items")
+        print(f"{'method':>10} {'rows/sec':>12} {'peak MiB':>10}")
+        for name, fn in (
+            ("legacy", lambda: legacy_export(SessionLocal)),
+            ("csv", lambda: streamed_export(SessionLocal, "csv")),
+            ("ndjson", lambda: streamed_export(SessionLocal, "ndjson")),
+        ):
+            rate, peak = measure(fn, rows)
+            print(f"{name:>10} {rate:>12,.0f} {peak:>10.1f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Concurrent stress test for order stock reservation.
+
+Many threads race to order the same menu items from a throwaway SQLite
+database. The old read-compare-write approach is run next to the
+reservation engine used by the order and user services, and the script
+reports orders/sec and whether more units were sold than were in stock.
+
+Usage: python scripts/benchmark_inventory.py [--threads 16] [--stock 500]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'order-service'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem
+from inventory import reserve_stock, InsufficientStockError
+
+ITEMS_PER_ORDER = 3
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stock reservation stress test")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent order threads")
+    parser.add_argument("--stock", type=int, default=500, help="Starting stock per menu item")
+    parser.add_argument("--orders", type=int, default=100, help="Orders attempted per thread")
+    return parser.parse_args()
+
+def create_database(path: str, stock: int):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    db = SessionLocal()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    db.add(owner)
+    db.flush()
+    cafe = Cafe(name="Bench Cafe", owner_id=owner.id)
+    category = Category(name="Bench")
+    db.add_all([cafe, category])
+    db.flush()
+    for index in range(ITEMS_PER_ORDER):
+        db.add(MenuItem(name=f"Item {index}", price=5.0, available_quantity=stock, max_daily_quantity=stock,
+                        cafe_id=cafe.id, category_id=category.id))
+    db.commit()
+    item_ids = [item.id for item in db.query(MenuItem).all()]
+    db.close()
+    return engine, SessionLocal, item_ids
+
+def legacy_order(db, item_ids):
+    """The previous approach: read each item, compare in Python, write back."""
+    items = [db.query(MenuItem).filter(MenuItem.id == item_id).first() for item_id in item_ids]
+    if any(item.available_quantity < 1 for item in items):
+        return False
+    time.sleep(0)  # let other threads interleave between the read and the write
+    for item in items:
+        item.available_quantity -= 1
+    db.commit()
+    return True
+
+def reservation_order(db, item_ids):
+    try:
+        reserve_stock(db, [(item_id, 1) for item_id in item_ids])
+    except InsufficientStockError:
+        return False
+    db.commit()
+    return True
+
+def run(name, place_order, args):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine, SessionLocal, item_ids = create_database(path, args.stock)
+    sold = [0]
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(args.orders):
+            db = SessionLocal()
+            try:
+                if place_order(db, item_ids):
+                    with lock:
+                        sold[0] += 1
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    errors[0] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    remaining = [item.available_quantity for item in db.query(MenuItem).all()]
+    db.close()
+    engine.dispose()
+
+    oversold = any(args.stock - left < sold[0] or left < 0 for left in remaining)
+    print(f"{name:<12} orders placed: {sold[0]:>5}  remaining stock: {remaining}  "
+          f"lock errors: {errors[0]:>4}  {sold[0] / elapsed:8.1f} orders/s  "
+          f"{'OVERSOLD' if oversold else 'consistent'}")
+    return oversold
+
+def main():
+    args = parse_args()
+    print(f"{args.threads} threads x {args.orders} orders, {ITEMS_PER_ORDER} items per order, "
+          f"starting stock {args.stock}")
+    run("legacy", legacy_order, args)
+    oversold = run("reservation", reservation_order, args)
+    if oversold:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
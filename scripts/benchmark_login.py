@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark login throughput under concurrent load.
+
+Serves a password check two ways from one FastAPI app: the previous pattern,
+calling pwd_context.verify inline in the async handler, and
+auth.verify_password_async, which runs bcrypt on the password executor.
+Concurrent clients log in for a fixed time while other clients call a
+trivial endpoint, whose latency shows how long the rest of the service
+waits behind a login storm.
+
+The work factor comes from BCRYPT_ROUNDS, as in the services, and the pool
+size from PASSWORD_HASH_WORKERS.
+
+Usage: BCRYPT_ROUNDS=12 python scripts/benchmark_login.py [--logins 16] [--others 4] [--seconds 10]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'user-service'))
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from auth import pwd_context, verify_password_async, BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
+PASSWORD = "correct horse battery staple"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument("--logins", type=int, default=16, help="Concurrent clients logging in")
+    parser.add_argument("--others", type=int, default=4, help="Concurrent clients calling a cheap endpoint")
+    parser.add_argument("--seconds", type=float, default=10, help="Run time per path")
+    return parser.parse_args()
+
+def build_app(stored_hash: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/inline/login")
+    async def inline_login():
+        if not pwd_context.verify(PASSWORD, stored_hash):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.post("/pooled/login")
+    async def pooled_login():
+        valid, _ = await verify_password_async(PASSWORD, stored_hash)
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+async def run(app: FastAPI, path: str, args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + args.seconds
+        logins = 0
+        latencies = []
+
+        async def login():
+            nonlocal logins
+            while time.perf_counter() < deadline:
+                # ASGITransport never reads a socket; yield once per request as a server would
+                await asyncio.sleep(0)
+                response = await client.post(f"/{path}/login")
+                response.raise_for_status()
+                logins += 1
+
+        async def other():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await asyncio.sleep(0)
+                (await client.get("/ping")).raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(login() for _ in range(args.logins)), *(other() for _ in range(args.others)))
+    latencies.sort()
+    return logins / args.seconds, len(latencies) / args.seconds, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+def main():
+    args = parse_args()
+    app = build_app(pwd_context.hash(PASSWORD))
+    print(f"bcrypt rounds {BCRYPT_ROUNDS}, {PASSWORD_HASH_WORKERS} hash workers, "
+          f"{args.logins} login clients, {args.others} other clients, {args.seconds:g}s per path")
+    print(f"{'path':>8} {'logins/s':>9} {'other req/s':>12} {'other p50 ms':>13} {'other p99 ms':>13}")
+    for path in ("inline", "pooled"):
+        logins, others, p50, p99 = asyncio.run(run(app, path, args))
+        print(f"{path:>8} {logins:>9.1f} {others:>12.0f} {p50:>13.1f} {p99:>13.1f}")
+
+if __name__ == "__main__":
+    main()
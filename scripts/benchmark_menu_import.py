@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading a cafe menu.
+
+Compares creating the items one at a time the way the single-item
+endpoints do (category lookup, insert, commit and refresh per item) with
+the bulk import, for a fresh menu and for re-importing the same menu as
+updates. HTTP round trips are not included, so the real gap is larger.
+
+Usage: python scripts/benchmark_menu_import.py [--items 500]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'menu-service'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem
+from menu_import import import_menu_items
+
+CATEGORIES = ["Coffee", "Sandwich", "Salad", "Soup", "Dessert"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Menu import benchmark")
+    parser.add_argument("--items", type=int, default=500, help="Items in the menu")
+    return parser.parse_args()
+
+def create_cafes(SessionLocal) -> list:
+    db = SessionLocal()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    db.add(owner)
+    db.flush()
+    cafes = [Cafe(name=f"Cafe {index}", owner_id=owner.id) for index in range(2)]
+    db.add_all(cafes + [Category(name=name) for name in CATEGORIES])
+    db.commit()
+    cafe_ids = [cafe.id for cafe in cafes]
+    db.close()
+    return cafe_ids
+
+def menu(size: int) -> list:
+    return [{
+        "name": f"Item {index}",
+        "description": "Daily special",
+        "price": 3.0 + index % 7,
+        "max_daily_quantity": 50,
+        "category": CATEGORIES[index % len(CATEGORIES)]
+    } for index in range(size)]
+
+def one_by_one(db, cafe_id, rows):
+    """The previous approach: one request, and so one commit, per item."""
+    for row in rows:
+        category = db.query(Category).filter(Category.name == row["category"]).first()
+        item = MenuItem(name=row["name"], description=row["description"], price=row["price"],
+                        max_daily_quantity=row["max_daily_quantity"], available_quantity=row["max_daily_quantity"],
+                        cafe_id=cafe_id, category_id=category.id)
+        db.add(item)
+        db.commit()
+        db.refresh(item)
+
+def bulk(db, cafe_id, rows):
+    report = import_menu_items(db, cafe_id, rows)
+    db.commit()
+    if report["failed"]:
+        raise RuntimeError(f"{report['failed']} rows failed to import")
+
+def main():
+    args = parse_args()
+    rows = menu(args.items)
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'menu.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+        legacy_cafe, bulk_cafe = create_cafes(SessionLocal)
+
+        statements = 0
+        def count(*_):
+            nonlocal statements
+            statements += 1
+        event.listen(engine, "before_cursor_execute", count)
+
+        print(f"{args.items} items")
+        print(f"{'method':>14} {'ms':>10} {'statements':>11}")
+        for name, fn, cafe_id in (
+            ("one-by-one", one_by_one, legacy_cafe),
+            ("bulk create", bulk, bulk_cafe),
+            ("bulk update", bulk, bulk_cafe),
+        ):
+            db = SessionLocal()
+            statements = 0
+            started = time.perf_counter()
+            fn(db, cafe_id, rows)
+            elapsed = (time.perf_counter() - started) * 1000
+            db.close()
+            print(f"{name:>14} {elapsed:>10.1f} {statements:>11}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
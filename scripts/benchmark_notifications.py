@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark WebSocket notification fan-out.
+
+Connects thousands of in-process fake sockets (each send sleeps for a small
+simulated network delay, and a few "slow consumers" stall) to the
+notification service's fan-out hub and to the old sequential broadcast loop,
+then reports delivery latency percentiles for the healthy clients.
+
+Usage: python scripts/benchmark_notifications.py [--sockets 5000] [--messages 5]
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'notification-service'))
+
+from fanout import FanoutHub, user_type_topic
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Notification fan-out benchmark")
+    parser.add_argument("--sockets", type=int, default=5000, help="Connected sockets")
+    parser.add_argument("--messages", type=int, default=5, help="Broadcasts to measure")
+    parser.add_argument("--send-ms", type=float, default=1.0, help="Mean simulated send time of a healthy socket")
+    parser.add_argument("--slow", type=int, default=5, help="Sockets that stall on every send")
+    parser.add_argument("--slow-seconds", type=float, default=0.5, help="Stall of a slow socket per send")
+    return parser.parse_args()
+
+class FakeWebSocket:
+    def __init__(self, delay: float, latencies: list):
+        self.delay = delay
+        self.latencies = latencies
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send_text(self, message: str):
+        await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - float(message))
+
+def make_sockets(args, latencies):
+    rng = random.Random(1)
+    sockets = [FakeWebSocket(rng.expovariate(1000 / args.send_ms), latencies) for _ in range(args.sockets - args.slow)]
+    slow = [FakeWebSocket(args.slow_seconds, []) for _ in range(args.slow)]
+    return sockets + slow
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+    return f"p50 {pick(0.50):8.1f} ms  p95 {pick(0.95):8.1f} ms  p99 {pick(0.99):8.1f} ms  max {ordered[-1] * 1000:8.1f} ms"
+
+async def run_legacy(args):
+    """The previous approach: await send_text on each socket in turn."""
+    latencies = []
+    sockets = make_sockets(args, latencies)
+    for _ in range(args.messages):
+        message = str(time.perf_counter())
+        for socket in sockets:
+            await socket.send_text(message)
+    return latencies, 0
+
+async def run_fanout(args):
+    latencies = []
+    hub = FanoutHub(queue_size=4, send_timeout=args.slow_seconds / 2)
+    for socket in make_sockets(args, latencies):
+        await hub.connect(socket, "EMPLOYEE")
+    expected = (args.sockets - args.slow) * args.messages
+    for _ in range(args.messages):
+        hub.publish(str(time.perf_counter()), [user_type_topic("EMPLOYEE")])
+        await asyncio.sleep(0.05)
+    while len(latencies) < expected:
+        await asyncio.sleep(0.01)
+    for subscriber in list(hub.subscribers):
+        hub.disconnect(subscriber)
+    return latencies, hub.evicted
+
+def main():
+    args = parse_args()
+    print(f"{args.sockets} sockets ({args.slow} stalling {args.slow_seconds}s per send), "
+          f"{args.messages} broadcasts, ~{args.send_ms} ms per healthy send")
+    for name, runner in (("sequential", run_legacy), ("fan-out", run_fanout)):
+        start = time.perf_counter()
+        latencies, evicted = asyncio.run(runner(args))
+        elapsed = time.perf_counter() - start
+        print(f"{name:<11} {percentiles(latencies)}  total {elapsed:6.1f} s  evicted {evicted}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk user onboarding.
+
+Onboards synthetic employees into a throwaway database two ways: one at a
+time the way admin-service's create_user does it (an email query, a username
+query, a bcrypt hash, an insert and a commit per user), and through
+onboarding.onboard_employees (one uniqueness query, hashing on the thread
+pool, chunked executemany inserts). The one-at-a-time path runs on a sample
+and is extrapolated to the full size.
+
+bcrypt dominates both paths, so --rounds sets BCRYPT_ROUNDS for the run
+(default 8 to keep it short); the pool's speedup on hashing grows with
+ONBOARDING_HASH_WORKERS up to the number of cores.
+
+Usage: python scripts/benchmark_onboarding.py [--employees 10000] [--sample 200] [--rounds 8]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk onboarding benchmark")
+    parser.add_argument("--employees", type=int, default=10000, help="Employees to onboard in bulk")
+    parser.add_argument("--sample", type=int, default=200, help="Employees created one at a time")
+    parser.add_argument("--rounds", type=int, default=8, help="bcrypt work factor")
+    return parser.parse_args()
+
+args = parse_args()
+# auth reads the work factor at import time
+os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'admin-service'))
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from models import User, UserType, migrate_schema
+from auth import get_password_hash
+from engine_factory import create_service_engine
+from onboarding import onboard_employees, shutdown_hash_pool, ONBOARDING_HASH_WORKERS, ONBOARDING_CHUNK_SIZE
+
+def employees(prefix: str, size: int) -> list:
+    return [{
+        "email": f"{prefix}{index}@bench.local",
+        "username": f"{prefix}{index}",
+        "full_name": f"Employee {index}",
+        "password": f"Welcome-{index}!"
+    } for index in range(size)]
+
+def one_at_a_time(SessionLocal, rows):
+    """The previous approach: create_user per employee."""
+    db = SessionLocal()
+    try:
+        for row in rows:
+            if db.query(User).filter(User.email == row["email"]).first():
+                continue
+            if db.query(User).filter(User.username == row["username"]).first():
+                continue
+            db.add(User(email=row["email"], username=row["username"], full_name=row["full_name"],
+                        hashed_password=get_password_hash(row["password"]), user_type=UserType.EMPLOYEE,
+                        is_active=True))
+            db.commit()
+    finally:
+        db.close()
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_service_engine(f"sqlite:///{os.path.join(workdir, 'onboarding.db')}", "benchmark")
+        migrate_schema(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        started = time.perf_counter()
+        one_at_a_time(SessionLocal, employees("single", args.sample))
+        single = (time.perf_counter() - started) / args.sample
+
+        started = time.perf_counter()
+        for event in onboard_employees(SessionLocal, employees("bulk", args.employees)):
+            if event["event"] == "done":
+                created = event["created"]
+        bulk = time.perf_counter() - started
+        shutdown_hash_pool()
+
+        db = SessionLocal()
+        total = db.query(func.count(User.id)).scalar()
+        db.close()
+        engine.dispose()
+
+    print(f"bcrypt rounds {args.rounds}, {ONBOARDING_HASH_WORKERS} hash threads, chunks of {ONBOARDING_CHUNK_SIZE}")
+    print(f"{'path':>14} {'employees':>10} {'seconds':>9} {'per user ms':>12}")
+    print(f"{'one at a time':>14} {args.employees:>10} {single * args.employees:>9.1f} {single * 1000:>12.2f}  (from {args.sample} users)")
+    print(f"{'bulk':>14} {created:>10} {bulk:>9.1f} {bulk / args.employees * 1000:>12.2f}")
+    print(f"{total} users in the database")
+
+if __name__ == "__main__":
+    main()
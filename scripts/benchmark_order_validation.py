@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark menu-item validation for order creation.
+
+Compares the old one-query-per-line lookup with the batched IN (...)
+lookup used by create_order/complete_order, for orders of different
+sizes, and reports queries and mean latency per order.
+
+Usage: python scripts/benchmark_order_validation.py [--menu-size 2000] [--runs 200]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'order-service'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem
+from inventory import load_menu_items
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Order validation benchmark")
+    parser.add_argument("--menu-size", type=int, default=2000, help="Menu items in the cafe")
+    parser.add_argument("--runs", type=int, default=200, help="Orders validated per case")
+    parser.add_argument("--lines", default="1,5,10,20,30", help="Comma-separated order sizes")
+    return parser.parse_args()
+
+def legacy_lookup(db, cafe_id, item_ids):
+    """The previous approach: one query per order line."""
+    items = {}
+    for item_id in item_ids:
+        items[item_id] = db.query(MenuItem).filter(
+            MenuItem.id == item_id,
+            MenuItem.cafe_id == cafe_id,
+            MenuItem.is_available == True
+        ).first()
+    return items
+
+def main():
+    args = parse_args()
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    db = SessionLocal()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    db.add(owner)
+    db.flush()
+    cafe = Cafe(name="Bench Cafe", owner_id=owner.id)
+    category = Category(name="Bench")
+    db.add_all([cafe, category])
+    db.flush()
+    db.add_all([
+        MenuItem(name=f"Item {index}", price=4.0, available_quantity=100, max_daily_quantity=100,
+                 cafe_id=cafe.id, category_id=category.id)
+        for index in range(args.menu_size)
+    ])
+    db.commit()
+    cafe_id = cafe.id
+    all_ids = [item_id for (item_id,) in db.query(MenuItem.id).all()]
+    db.close()
+
+    queries = [0]
+    event.listen(engine, "before_cursor_execute", lambda *a, **k: queries.__setitem__(0, queries[0] + 1))
+
+    print(f"Menu of {args.menu_size} items, {args.runs} orders per case")
+    print(f"{'lines':>5} | {'legacy queries':>14} {'legacy ms':>10} | {'batched queries':>15} {'batched ms':>10}")
+    for lines in [int(value) for value in args.lines.split(",")]:
+        results = []
+        for lookup in (legacy_lookup, load_menu_items):
+            rng = random.Random(lines)
+            queries[0] = 0
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                db = SessionLocal()
+                lookup(db, cafe_id, rng.sample(all_ids, lines))
+                db.close()
+            elapsed_ms = (time.perf_counter() - start) * 1000 / args.runs
+            results.append((queries[0] / args.runs, elapsed_ms))
+        (legacy_q, legacy_ms), (batched_q, batched_ms) = results
+        print(f"{lines:>5} | {legacy_q:>14.0f} {legacy_ms:>10.2f} | {batched_q:>15.0f} {batched_ms:>10.2f}")
+
+if __name__ == "__main__":
+    main()
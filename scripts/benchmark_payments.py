@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the payment service.
+
+Fires batches of concurrent /process-payment requests at the FastAPI app
+in-process and reports throughput per concurrency level. Because the
+simulated gateway awaits its latency instead of sleeping the thread,
+throughput should grow roughly linearly with concurrency.
+
+Usage: python scripts/benchmark_payments.py [--profile fast] [--requests 200]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'payment-service'))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Payment service load benchmark")
+    parser.add_argument("--profile", default="fast", help="Simulator latency profile")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,10,50,100", help="Comma-separated concurrency levels")
+    parser.add_argument("--seed", type=int, default=42, help="Simulator seed")
+    return parser.parse_args()
+
+async def run_level(client, total: int, concurrency: int) -> float:
+    """Send `total` payments with at most `concurrency` in flight; return requests/sec."""
+    semaphore = asyncio.Semaphore(concurrency)
+    payload = {"method": "credit_card", "amount": 12.5}
+
+    async def one():
+        async with semaphore:
+            response = await client.post("/process-payment", json=payload)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+async def main():
+    args = parse_args()
+    os.environ["PAYMENT_LATENCY_PROFILE"] = args.profile
+    os.environ["PAYMENT_SIMULATOR_SEED"] = str(args.seed)
+
+    import httpx
+    import main as payment_service
+    from models import UserType
+    from middleware import get_current_principal
+    from token_claims import Principal
+
+    # Authentication is not what is being measured
+    employee = Principal(1, "benchmark", UserType.EMPLOYEE)
+    payment_service.app.dependency_overrides[get_current_principal] = lambda: employee
+
+    transport = httpx.ASGITransport(app=payment_service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://payment-service") as client:
+        print(f"Latency profile: {args.profile}, {args.requests} requests per level")
+        baseline = None
+        for concurrency in [int(level) for level in args.concurrency.split(",")]:
+            rps = await run_level(client, args.requests, concurrency)
+            baseline = baseline or rps
+            print(f"  concurrency {concurrency:>4}: {rps:8.1f} req/s  ({rps / baseline:5.1f}x)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
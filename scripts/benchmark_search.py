@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark menu item search as the catalogue grows.
+
+Builds throwaway SQLite catalogues of increasing size and times the old
+search (chained ILIKE filters plus a cafe and a category query per hit)
+against the FTS5-backed search used by the user and menu services.
+
+Usage: python scripts/benchmark_search.py [--sizes 1000,10000,50000] [--runs 20]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'menu-service'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base, User, UserType, Cafe, Category, MenuItem
+from search import ensure_search_index, search_menu_items
+
+ADJECTIVES = ["spicy", "grilled", "crispy", "smoked", "creamy", "classic", "masala", "herbed", "roasted", "tangy"]
+DISHES = ["paneer", "chicken", "veggie", "mushroom", "tofu", "egg", "fish", "lamb", "corn", "potato"]
+FORMS = ["wrap", "sandwich", "bowl", "salad", "burger", "curry", "pizza", "pasta", "soup", "roll"]
+QUERIES = ["paneer wrap", "crispy", "smok", "mushroom soup", "masala curry"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Menu search benchmark")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated catalogue sizes")
+    parser.add_argument("--runs", type=int, default=20, help="Searches per query and catalogue size")
+    return parser.parse_args()
+
+def create_catalogue(path: str, size: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    rng = random.Random(size)
+    db = SessionLocal()
+    owner = User(email="owner@bench.local", username="owner", hashed_password="x",
+                 full_name="Bench Owner", user_type=UserType.CAFE_OWNER)
+    db.add(owner)
+    db.flush()
+    cafes = [Cafe(name=f"Cafe {index}", owner_id=owner.id) for index in range(20)]
+    categories = [Category(name=form.title()) for form in FORMS]
+    db.add_all(cafes + categories)
+    db.flush()
+    for index in range(size):
+        form = rng.randrange(len(FORMS))
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} {FORMS[form]}".title()
+        description = " ".join(rng.choice(ADJECTIVES + DISHES) for _ in range(6))
+        db.add(MenuItem(name=name, description=description, price=5.0, available_quantity=50,
+                        max_daily_quantity=50, cafe_id=cafes[index % len(cafes)].id,
+                        category_id=categories[form].id))
+    db.commit()
+    db.close()
+    ensure_search_index(engine)
+    return engine, SessionLocal
+
+def legacy_search(db, query):
+    """The previous approach: ILIKE per term, then a cafe and a category query per hit."""
+    search_query = db.query(MenuItem).join(Cafe).filter(
+        Cafe.is_active == True,
+        MenuItem.is_available == True,
+        MenuItem.available_quantity > 0
+    )
+    for term in query.lower().split():
+        search_query = search_query.filter(
+            (MenuItem.name.ilike(f"%{term}%")) | (MenuItem.description.ilike(f"%{term}%"))
+        )
+    results = []
+    for item in search_query.all():
+        cafe = db.query(Cafe).filter(Cafe.id == item.cafe_id).first()
+        category = db.query(Category).filter(Category.id == item.category_id).first()
+        results.append((item, cafe, category))
+    return results
+
+def timed(SessionLocal, search, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        for query in QUERIES:
+            db = SessionLocal()
+            search(db, query)
+            db.close()
+    return (time.perf_counter() - start) * 1000 / (runs * len(QUERIES))
+
+def main():
+    args = parse_args()
+    print(f"{'items':>7} | {'legacy ms':>10} | {'fts ms':>8}")
+    for size in [int(value) for value in args.sizes.split(",")]:
+        engine, SessionLocal = create_catalogue(os.path.join(tempfile.mkdtemp(), "bench.db"), size)
+        legacy_ms = timed(SessionLocal, legacy_search, max(1, args.runs // 10))
+        fts_ms = timed(SessionLocal, search_menu_items, args.runs)
+        engine.dispose()
+        print(f"{size:>7} | {legacy_ms:>10.1f} | {fts_ms:>8.2f}")
+
+if __name__ == "__main__":
+    main()
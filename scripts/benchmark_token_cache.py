@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request token verification with and without the token cache.
+
+Loads each service's own auth.verify_token and calls it for a stream of
+requests from a pool of active users, each resending the same token, the way
+the web client does. The cold run disables the verified-token cache, so every
+call does the full jose decode (HMAC check plus JSON parsing). The warm run
+uses the cache as the services do.
+
+Usage: python scripts/benchmark_token_cache.py [--service order-service] [--users 500] [--requests 50000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import importlib
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+SERVICES = sorted(name for name in os.listdir(SERVICES_DIR) if name.endswith("-service"))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Token cache benchmark")
+    parser.add_argument("--service", choices=SERVICES, action="append",
+                        help="Service to measure (repeatable); defaults to all")
+    parser.add_argument("--users", type=int, default=500, help="Distinct tokens in use")
+    parser.add_argument("--requests", type=int, default=50000, help="verify_token calls per run")
+    return parser.parse_args()
+
+def load_auth(service: str):
+    """Import a service's auth module (and the token_cache it uses) fresh."""
+    for name in ("auth", "token_cache"):
+        sys.modules.pop(name, None)
+    path = os.path.join(SERVICES_DIR, service)
+    sys.path.insert(0, path)
+    try:
+        return importlib.import_module("auth"), importlib.import_module("token_cache")
+    finally:
+        sys.path.remove(path)
+
+def run(auth, tokens, requests: int) -> float:
+    rng = random.Random(requests)
+    stream = [rng.choice(tokens) for _ in range(requests)]
+    started = time.perf_counter()
+    for token in stream:
+        auth.verify_token(token)
+    return (time.perf_counter() - started) / requests * 1e6
+
+def main():
+    args = parse_args()
+    print(f"{args.users} users, {args.requests} requests per run")
+    print(f"{'service':>22} {'uncached us':>12} {'cached us':>10} {'speedup':>8} {'hit rate':>9}")
+    for service in args.service or SERVICES:
+        auth, cache_module = load_auth(service)
+        cache = cache_module.token_cache
+        tokens = [auth.create_access_token({"sub": f"user{index}", "uid": index, "role": "EMPLOYEE", "ver": 0})
+                  for index in range(args.users)]
+
+        cache.ttl_seconds = 0
+        uncached = run(auth, tokens, args.requests)
+        cache.ttl_seconds = cache_module.TOKEN_CACHE_TTL_SECONDS
+        cache.clear()
+        cached = run(auth, tokens, args.requests)
+
+        hit_rate = cache.stats()["hit_rate"] or 0
+        print(f"{service:>22} {uncached:>12.1f} {cached:>10.1f} {uncached / cached:>7.1f}x {hit_rate:>9.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Onboard users in bulk from a CSV file into the shared microservices database.
+
+The CSV needs a header row with email, username, full_name and password,
+and may add user_type (EMPLOYEE by default). This runs the same pipeline as
+admin-service's POST /admin/users/bulk and prints its progress; rows that
+can't be created are listed at the end.
+
+Usage: python scripts/onboard_employees.py employees.csv [--database-url sqlite:///./shared_microservices.db]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'admin-service'))
+
+from sqlalchemy.orm import sessionmaker
+from models import migrate_schema
+from engine_factory import create_service_engine
+from onboarding import parse_employee_csv, onboard_employees, shutdown_hash_pool, OnboardingError
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk user onboarding from CSV")
+    parser.add_argument("csv_file", help="CSV file with email, username, full_name, password[, user_type]")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./shared_microservices.db"),
+                        help="Database to create the users in")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    with open(args.csv_file, "rb") as handle:
+        try:
+            rows = parse_employee_csv(handle.read())
+        except OnboardingError as e:
+            sys.exit(f"❌ {e}")
+
+    engine = create_service_engine(args.database_url, "onboarding")
+    migrate_schema(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    try:
+        for event in onboard_employees(SessionLocal, rows):
+            if event["event"] == "validated":
+                print(f"{event['total']} rows: {event['valid']} to create, {event['invalid']} rejected")
+            elif event["event"] == "progress":
+                print(f"  created {event['created']} / {event['valid']}")
+            else:
+                for error in event["errors"]:
+                    print(f"  row {error['row']} ({error['username']}): {'; '.join(error['errors'])}")
+                print(f"✅ Created {event['created']} of {event['total']} users, {event['failed']} failed")
+    finally:
+        shutdown_hash_pool()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -38,7 +38,7 @@ sleep 2
 # Start Cafe Service (Port 5002)
 echo "Starting Cafe Management Service on port 5002..."
 cd services/cafe-service
-SERVICE_PORT=5002 USER_SERVICE_URL=http://localhost:5001 python main.py > ../../logs/cafe-service.log 2>&1 &
+SERVICE_PORT=5002 USER_SERVICE_URL=http://localhost:5001 MENU_SERVICE_URL=http://localhost:5003 python main.py > ../../logs/cafe-service.log 2>&1 &
 CAFE_PID=$!
 cd ../..
 
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Multi-worker integration test for the notification backplane.
+
+Starts notification-service under uvicorn with several workers, spreads
+WebSocket clients across them, posts notifications (each POST is handled by
+whichever worker accepts it) and checks that every subscribed client
+receives every notification. Each notification is posted twice with the
+same Idempotency-Key, as an outbox redelivery would be, over separate
+connections so the copies can reach different workers; every client must
+receive it exactly once.
+
+Usage: python scripts/test-notification-workers.py [--workers 2] [--backplane sqlite]
+
+With --backplane memory the test is expected to fail: notifications only
+reach the sockets of the worker that handled the POST.
+"""
+
+import os
+import sys
+import json
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+import websockets
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'notification-service')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Notification multi-worker test")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers")
+    parser.add_argument("--clients", type=int, default=16, help="WebSocket clients")
+    parser.add_argument("--messages", type=int, default=10, help="Notifications to post")
+    parser.add_argument("--backplane", default="sqlite", help="NOTIFY_BACKPLANE value")
+    return parser.parse_args()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_service(args, port: int, workdir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'service.db')}",
+        NOTIFY_BACKPLANE=args.backplane,
+        NOTIFY_BACKPLANE_PATH=os.path.join(workdir, "backplane.db"),
+    )
+    # Create the schema up front so the workers don't race on create_all
+    subprocess.run(
+        [sys.executable, "-c", "from database import engine; from models import Base; Base.metadata.create_all(bind=engine)"],
+        cwd=SERVICE_DIR, env=env, check=True
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=env
+    )
+
+async def wait_until_ready(base_url: str):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("notification-service did not start")
+
+async def connections_per_worker(client: httpx.AsyncClient, workers: int) -> dict:
+    """Poll /connections/status until every worker has answered at least once."""
+    seen = {}
+    for _ in range(200):
+        # A fresh connection each time, so the requests reach different workers
+        status = (await client.get("/connections/status", headers={"Connection": "close"})).json()
+        seen[status["worker_pid"]] = status["total_connections"]
+        if len(seen) == workers:
+            break
+    return seen
+
+async def run(args, port: int) -> bool:
+    base_url = f"http://127.0.0.1:{port}"
+    await wait_until_ready(base_url)
+
+    sockets = []
+    for _ in range(args.clients):
+        sockets.append(await websockets.connect(f"ws://127.0.0.1:{port}/ws/CAFE_OWNER?cafe_id=1"))
+        # New connections tend to land on whichever worker is idle; give the others a chance
+        await asyncio.sleep(0.02)
+
+    ok = True
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        spread = await connections_per_worker(client, args.workers)
+        print(f"connections per worker: {spread}")
+        if sum(spread.values()) != args.clients or len([count for count in spread.values() if count]) < 2:
+            print("clients did not spread over several workers; rerun with more --clients")
+            ok = False
+
+        for index in range(args.messages):
+            for _ in range(2):
+                await client.post(
+                    "/notify/new-order",
+                    json={"order_id": index, "order_number": f"T-{index}", "cafe_id": 1},
+                    headers={"Idempotency-Key": f"test-order-{index}", "Connection": "close"}
+                )
+
+    missing = duplicates = 0
+    for ws in sockets:
+        received = []
+        try:
+            # Read until the socket goes quiet, so duplicates are counted too
+            while True:
+                message = json.loads(await asyncio.wait_for(ws.recv(), 1))
+                received.append(message["data"]["order_id"])
+        except asyncio.TimeoutError:
+            pass
+        missing += args.messages - len(set(received))
+        duplicates += len(received) - len(set(received))
+        await ws.close()
+
+    print(f"{args.clients} clients x {args.messages} notifications, "
+          f"missing deliveries: {missing}, duplicate deliveries: {duplicates}")
+    return ok and missing == 0 and duplicates == 0
+
+def main():
+    args = parse_args()
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        service = start_service(args, port, workdir)
+        try:
+            passed = asyncio.run(run(args, port))
+        finally:
+            service.terminate()
+            service.wait(timeout=10)
+    print("PASS" if passed else "FAIL")
+    sys.exit(0 if passed else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Query count regression test for user-service's order listings.
+
+Seeds a throwaway database, calls /employee/orders, /cafe-owner/orders and
+/cafe-owner/cafes/{id}/orders with a few orders and again with many more,
+and counts the statements each request sends to the database. The test
+fails if any endpoint's count grows with the number of orders, which is
+what a lazy load per order (an N+1 query) looks like.
+
+Usage: python scripts/test-order-query-count.py [--small 3] [--large 40]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'user-service')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Order listing query count test")
+    parser.add_argument("--small", type=int, default=3, help="Orders in the first run")
+    parser.add_argument("--large", type=int, default=40, help="Orders in the second run")
+    return parser.parse_args()
+
+def add_orders(SessionLocal, models, ids: dict, count: int):
+    """Add orders for the employee at the owner's cafe until there are `count`."""
+    db = SessionLocal()
+    existing = db.query(models.Order).count()
+    for index in range(existing, count):
+        order = models.Order(
+            order_number=f"QC-{index}", total_amount=7.0, status=models.OrderStatus.PENDING,
+            customer_id=ids["employee"], cafe_id=ids["cafe"]
+        )
+        db.add(order)
+        db.flush()
+        for menu_item_id in ids["menu_items"]:
+            db.add(models.OrderItem(order_id=order.id, menu_item_id=menu_item_id, quantity=1,
+                                    unit_price=3.5, total_price=3.5))
+    db.commit()
+    db.close()
+
+def seed(SessionLocal, models) -> dict:
+    db = SessionLocal()
+    owner = models.User(email="owner@test.local", username="owner", full_name="Owner",
+                        hashed_password="x", user_type=models.UserType.CAFE_OWNER)
+    employee = models.User(email="employee@test.local", username="employee", full_name="Employee",
+                           hashed_password="x", user_type=models.UserType.EMPLOYEE)
+    category = models.Category(name="Coffee")
+    db.add_all([owner, employee, category])
+    db.flush()
+    cafe = models.Cafe(name="Test Cafe", address="1 Test Street", owner_id=owner.id)
+    db.add(cafe)
+    db.flush()
+    menu_items = [models.MenuItem(name=f"Item {index}", price=3.5, cafe_id=cafe.id, category_id=category.id)
+                  for index in range(2)]
+    db.add_all(menu_items)
+    db.commit()
+    ids = {"owner": owner.id, "employee": employee.id, "cafe": cafe.id,
+           "menu_items": [item.id for item in menu_items]}
+    db.close()
+    return ids
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        # The service reads its settings at import time
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'orders.db')}"
+        os.environ["OUTBOX_DISPATCHER_ENABLED"] = "false"
+        sys.path.insert(0, SERVICE_DIR)
+
+        from sqlalchemy import event
+        from fastapi.testclient import TestClient
+        import models
+        import main as user_service
+        from auth import create_access_token
+        from token_claims import token_claims
+        from database import SessionLocal
+
+        ids = seed(SessionLocal, models)
+        db = SessionLocal()
+        tokens = {user.username: create_access_token(token_claims(user, 0)) for user in db.query(models.User)}
+        db.close()
+
+        endpoints = [
+            ("/employee/orders", "employee"),
+            ("/cafe-owner/orders", "owner"),
+            (f"/cafe-owner/cafes/{ids['cafe']}/orders", "owner"),
+        ]
+
+        statements = []
+
+        @event.listens_for(user_service.async_engine.sync_engine, "before_cursor_execute")
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        def measure(client, path, username):
+            # limit covers the large run, so every order is on the one page
+            del statements[:]
+            response = client.get(path, params={"limit": max(args.large, 1)},
+                                  headers={"Authorization": f"Bearer {tokens[username]}"})
+            # A lazy load per order fails outright on an AsyncSession, so an error counts as a failure too
+            if response.status_code != 200:
+                return None, response.status_code
+            return len(response.json()), len(statements)
+
+        failures = 0
+        with TestClient(user_service.app, raise_server_exceptions=False) as client:
+            add_orders(SessionLocal, models, ids, args.small)
+            # Warm up once so connection setup isn't counted
+            for path, username in endpoints:
+                measure(client, path, username)
+            small = {path: measure(client, path, username) for path, username in endpoints}
+            add_orders(SessionLocal, models, ids, args.large)
+            large = {path: measure(client, path, username) for path, username in endpoints}
+
+        for path, _ in endpoints:
+            (small_orders, small_count), (large_orders, large_count) = small[path], large[path]
+            if small_orders is None or large_orders is None:
+                failures += 1
+                print(f"FAIL {path}: HTTP {small_count if small_orders is None else large_count}")
+                continue
+            failed = small_count != large_count or large_orders != args.large
+            failures += failed
+            print(f"{'FAIL' if failed else 'ok':>4} {path}: {small_count} statements for {small_orders} orders, "
+                  f"{large_count} for {large_orders}")
+        user_service.async_engine.sync_engine.dispose()
+        user_service.engine.dispose()
+
+    print(f"{len(endpoints)} endpoints checked, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
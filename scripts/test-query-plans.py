@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Query plan test for the shared schema.
+
+Builds a SQLite database the way databases looked before schema versioning
+(tables only, no secondary indexes), runs migrate_schema on it, and then
+checks EXPLAIN QUERY PLAN for the services' hot queries. The test fails if
+any of them scans a whole table, or if a keyset-paginated listing needs a
+separate sort instead of reading its index in order.
+
+Usage: python scripts/test-query-plans.py [--verbose]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'order-service'))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.schema import CreateTable
+from models import (
+    Base, Cafe, MenuItem, Order, OrderItem, OrderFeedback, OrderStatus, OutboxEvent,
+    SCHEMA_VERSION, migrate_schema, schema_version
+)
+from pagination import _page_query
+
+OPEN_STATUSES = [OrderStatus.PENDING, OrderStatus.ACCEPTED, OrderStatus.PREPARING, OrderStatus.READY]
+
+class Page:
+    """The first page of a listing, as OrderPageParams parses it."""
+
+    def __init__(self, status=None):
+        self.limit = 50
+        self.before = None
+        self.after = None
+        self.date_from = None
+        self.date_to = None
+        self.status = status
+
+def listing(*criteria, status=None):
+    return _page_query(select(Order).where(*criteria), Page(status))
+
+# (name, statement, whether it must be served in index order)
+HOT_QUERIES = [
+    ("employee order history", listing(Order.customer_id == 7), True),
+    ("cafe order listing", listing(Order.cafe_id == 3), True),
+    ("cafe orders by status", listing(Order.cafe_id == 3, status=OrderStatus.PENDING), True),
+    ("admin orders by status", listing(status=OrderStatus.PENDING), True),
+    ("admin order listing", listing(), True),
+    ("kitchen open orders", select(Order).where(
+        Order.cafe_id.in_([3, 4]), Order.status.in_(OPEN_STATUSES)
+    ).order_by(Order.created_at, Order.id), False),
+    ("order line items", select(OrderItem).where(OrderItem.order_id.in_([1, 2, 3])), False),
+    ("menu item in use", select(OrderItem.id).where(OrderItem.menu_item_id == 5).limit(1), False),
+    ("cafe menu", select(MenuItem).where(
+        MenuItem.cafe_id == 3, MenuItem.is_available == True, MenuItem.available_quantity > 0
+    ), False),
+    ("menu import match", select(MenuItem.id, MenuItem.name).where(
+        MenuItem.cafe_id == 3, MenuItem.name.in_(["Latte", "Bagel"])
+    ), False),
+    ("menu items by category", select(MenuItem).where(MenuItem.category_id == 2), False),
+    ("owned cafes", select(Cafe.id).where(Cafe.owner_id == 7), False),
+    ("cafe feedback", select(OrderFeedback).where(OrderFeedback.cafe_id == 3), False),
+    ("order feedback", select(OrderFeedback).where(OrderFeedback.order_id == 11), False),
+    ("customer feedback", select(OrderFeedback).where(OrderFeedback.customer_id == 7), False),
+    ("outbox due events", select(OutboxEvent.id).where(
+        OutboxEvent.status == "pending", OutboxEvent.next_attempt_at <= datetime(2026, 1, 1)
+    ).order_by(OutboxEvent.id).limit(100), False),
+    ("outbox claimed events", select(OutboxEvent).where(OutboxEvent.claim_token == "token"), False),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query plan test")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    return parser.parse_args()
+
+def create_legacy_schema(engine):
+    """Tables as create_all made them before SCHEMA_VERSION 2, minus the indexes."""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name != "schema_versions":
+                conn.execute(CreateTable(table))
+
+def plan(conn, statement):
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+def problems(details, ordered: bool):
+    found = []
+    for detail in details:
+        words = detail.split()
+        # "SCAN orders" reads the whole table; "SCAN orders USING INDEX ..." walks an index in order
+        if words[0] == "SCAN" and "USING" not in words and words[1] not in ("CONSTANT",):
+            found.append(f"full table scan: {detail}")
+        if ordered and detail.startswith("USE TEMP B-TREE FOR"):
+            found.append(f"sorts instead of reading an index in order: {detail}")
+    return found
+
+def main():
+    args = parse_args()
+    failures = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'plans.db')}")
+        create_legacy_schema(engine)
+        before = schema_version(engine)
+        after = migrate_schema(engine)
+        print(f"migrated schema version {before} -> {after}")
+        if after != SCHEMA_VERSION or migrate_schema(engine) != SCHEMA_VERSION:
+            print(f"FAIL migrate_schema did not reach version {SCHEMA_VERSION}")
+            failures += 1
+
+        with engine.connect() as conn:
+            for name, statement, ordered in HOT_QUERIES:
+                details = plan(conn, statement)
+                found = problems(details, ordered)
+                print(f"{'FAIL' if found else 'ok':>4} {name}")
+                for problem in found:
+                    print(f"       {problem}")
+                if args.verbose or found:
+                    for detail in details:
+                        print(f"       | {detail}")
+                failures += bool(found)
+        engine.dispose()
+
+    print(f"{len(HOT_QUERIES)} queries checked, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
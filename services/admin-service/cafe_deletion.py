@@ -0,0 +1,164 @@
+import os
+import uuid
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from models import (
+    Cafe, MenuItem, Order, OrderItem, OrderFeedback,
+    DailyCafeSales, DailyCafeRating, RestockSchedule
+)
+
+# Set-based cafe deletion.
+#
+# A cafe and everything hanging off it is removed with a few DELETE statements
+# keyed by cafe_id (order items and feedback through the cafe's order ids)
+# instead of loading and deleting every row through the ORM. For cafes with a
+# long history, a background job first deactivates the cafe so no new orders
+# arrive, then deletes its orders in batches of CAFE_DELETE_BATCH_SIZE, each
+# in its own short transaction, so other writers get the SQLite write lock in
+# between. A job interrupted by a restart can simply be started again.
+CAFE_DELETE_BATCH_SIZE = int(os.getenv("CAFE_DELETE_BATCH_SIZE", "2000"))
+
+# Finished jobs kept for status lookups
+MAX_FINISHED_JOBS = 100
+
+def cafe_footprint(db: Session, cafe_id: int) -> dict:
+    """Rows that deleting the cafe would remove, by table."""
+    order_ids = select(Order.id).where(Order.cafe_id == cafe_id)
+    return {
+        "orders": db.scalar(select(func.count()).select_from(Order).where(Order.cafe_id == cafe_id)),
+        "order_items": db.scalar(select(func.count()).select_from(OrderItem).where(OrderItem.order_id.in_(order_ids))),
+        "feedbacks": db.scalar(select(func.count()).select_from(OrderFeedback).where(
+            or_(OrderFeedback.cafe_id == cafe_id, OrderFeedback.order_id.in_(order_ids))
+        )),
+        "menu_items": db.scalar(select(func.count()).select_from(MenuItem).where(MenuItem.cafe_id == cafe_id))
+    }
+
+def _delete(db: Session, statement) -> int:
+    return db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+def delete_order_batch(db: Session, cafe_id: int, batch_size: int = CAFE_DELETE_BATCH_SIZE) -> dict:
+    """Delete up to `batch_size` of the cafe's orders with their items and feedback; the caller commits."""
+    order_ids = db.scalars(
+        select(Order.id).where(Order.cafe_id == cafe_id).order_by(Order.id).limit(batch_size)
+    ).all()
+    if not order_ids:
+        return {"orders": 0, "order_items": 0, "feedbacks": 0}
+    return {
+        "order_items": _delete(db, delete(OrderItem).where(OrderItem.order_id.in_(order_ids))),
+        "feedbacks": _delete(db, delete(OrderFeedback).where(OrderFeedback.order_id.in_(order_ids))),
+        "orders": _delete(db, delete(Order).where(Order.id.in_(order_ids)))
+    }
+
+def delete_cafe_rows(db: Session, cafe_id: int) -> dict:
+    """Delete the cafe and all its remaining data; the caller commits.
+
+    Orders go through one subquery on cafe_id, so this also finishes whatever
+    a batched job left behind.
+    """
+    order_ids = select(Order.id).where(Order.cafe_id == cafe_id).scalar_subquery()
+    return {
+        "order_items": _delete(db, delete(OrderItem).where(OrderItem.order_id.in_(order_ids))),
+        "feedbacks": _delete(db, delete(OrderFeedback).where(
+            or_(OrderFeedback.cafe_id == cafe_id, OrderFeedback.order_id.in_(order_ids))
+        )),
+        "orders": _delete(db, delete(Order).where(Order.cafe_id == cafe_id)),
+        "menu_items": _delete(db, delete(MenuItem).where(MenuItem.cafe_id == cafe_id)),
+        "daily_rollups": _delete(db, delete(DailyCafeSales).where(DailyCafeSales.cafe_id == cafe_id))
+                         + _delete(db, delete(DailyCafeRating).where(DailyCafeRating.cafe_id == cafe_id)),
+        "restock_schedules": _delete(db, delete(RestockSchedule).where(RestockSchedule.cafe_id == cafe_id)),
+        "cafes": _delete(db, delete(Cafe).where(Cafe.id == cafe_id))
+    }
+
+class CafeDeletionJob:
+    """Background deletion of one cafe, reporting progress as it goes."""
+
+    def __init__(self, session_factory: sessionmaker, cafe_id: int, batch_size: int = CAFE_DELETE_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.cafe_id = cafe_id
+        self.batch_size = batch_size
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.orders_total: Optional[int] = None
+        self.deleted: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    def _count(self, counts: dict):
+        for table, rows in counts.items():
+            self.deleted[table] = self.deleted.get(table, 0) + rows
+
+    def run(self):
+        self.status = "running"
+        db = self.session_factory()
+        try:
+            # Stop new orders before deleting the old ones
+            db.execute(update(Cafe).where(Cafe.id == self.cafe_id).values(is_active=False))
+            db.commit()
+            self.orders_total = cafe_footprint(db, self.cafe_id)["orders"]
+
+            while True:
+                counts = delete_order_batch(db, self.cafe_id, self.batch_size)
+                db.commit()
+                if not counts["orders"]:
+                    break
+                self._count(counts)
+
+            self._count(delete_cafe_rows(db, self.cafe_id))
+            db.commit()
+            self.status = "done"
+        except Exception as e:
+            db.rollback()
+            self.status = "failed"
+            self.error = str(e)
+            print(f"Cafe {self.cafe_id} deletion failed: {e}")
+        finally:
+            db.close()
+            self.finished_at = datetime.utcnow()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "cafe_id": self.cafe_id,
+            "status": self.status,
+            "orders_total": self.orders_total,
+            "orders_deleted": self.deleted.get("orders", 0),
+            "deleted": self.deleted,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+class CafeDeletionJobs:
+    """Runs deletion jobs on daemon threads and keeps their status for polling."""
+
+    def __init__(self, session_factory: sessionmaker):
+        self.session_factory = session_factory
+        self._jobs: Dict[str, CafeDeletionJob] = {}
+        self._lock = threading.Lock()
+
+    def start(self, cafe_id: int) -> CafeDeletionJob:
+        """Start deleting a cafe, or return the job already deleting it."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.cafe_id == cafe_id and job.status in ("queued", "running"):
+                    return job
+            job = CafeDeletionJob(self.session_factory, cafe_id)
+            self._jobs[job.id] = job
+            self._prune()
+        threading.Thread(target=job.run, name=f"cafe-deletion-{cafe_id}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[CafeDeletionJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        finished: List[CafeDeletionJob] = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at
+        )
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
@@ -1,13 +1,17 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 import os
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from engine_factory import create_service_engine, create_async_service_engine
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///../../shared_microservices.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+engine = create_service_engine(DATABASE_URL, "admin-service")
+async_engine = create_async_service_engine(DATABASE_URL, "admin-service")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit, since async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -16,4 +20,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """AsyncSession for handlers that await their queries instead of blocking the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,154 @@
+import io
+import csv
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+from models import Order, OrderItem, MenuItem, User, Cafe
+
+# Streaming order export for finance.
+#
+# Orders are read in (created_at, id) order with their line items through a
+# single joined SELECT of plain columns fetched `EXPORT_FETCH_SIZE` rows at
+# a time, so neither the ORM identity map nor the response body grows with
+# the export. CSV has one row per line item (orders without items get one
+# row with empty item columns); NDJSON has one object per order with its
+# items nested.
+EXPORT_FETCH_SIZE = 2000
+# Rows buffered before a chunk is handed to the response
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson"
+}
+
+CSV_COLUMNS = [
+    "order_id", "order_number", "created_at", "status", "payment_status", "payment_method",
+    "total_amount", "cafe_id", "cafe_name", "customer_id", "customer_name", "customer_email",
+    "item_id", "menu_item_id", "item_name", "quantity", "unit_price", "item_total"
+]
+
+def _export_query(date_from: Optional[datetime], date_to: Optional[datetime], cafe_id: Optional[int]):
+    query = select(
+        Order.id, Order.order_number, Order.created_at, Order.status, Order.payment_status,
+        Order.payment_method, Order.total_amount, Order.cafe_id, Cafe.name, Order.customer_id,
+        User.full_name, User.email, OrderItem.id, OrderItem.menu_item_id, MenuItem.name,
+        OrderItem.quantity, OrderItem.unit_price, OrderItem.total_price
+    ).select_from(Order).outerjoin(
+        Cafe, Cafe.id == Order.cafe_id
+    ).outerjoin(
+        User, User.id == Order.customer_id
+    ).outerjoin(
+        OrderItem, OrderItem.order_id == Order.id
+    ).outerjoin(
+        MenuItem, MenuItem.id == OrderItem.menu_item_id
+    )
+    if date_from is not None:
+        query = query.where(Order.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(Order.created_at < date_to)
+    if cafe_id is not None:
+        query = query.where(Order.cafe_id == cafe_id)
+    return query.order_by(Order.created_at, Order.id, OrderItem.id).execution_options(yield_per=EXPORT_FETCH_SIZE)
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+def _csv_row(row: tuple) -> list:
+    # Only created_at and status need converting; everything else is written as is
+    values = list(row)
+    values[2] = values[2].isoformat() if values[2] else None
+    values[3] = _status_value(values[3])
+    return values
+
+def _export_rows(session_factory: sessionmaker, date_from, date_to, cafe_id) -> Iterator[tuple]:
+    # The request's session is closed before a streamed body is sent, so the export owns its own
+    db = session_factory()
+    try:
+        for row in db.execute(_export_query(date_from, date_to, cafe_id)):
+            yield tuple(row)
+    finally:
+        db.close()
+
+def stream_orders_csv(
+    session_factory: sessionmaker,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cafe_id: Optional[int] = None
+) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    pending = 0
+    for row in _export_rows(session_factory, date_from, date_to, cafe_id):
+        writer.writerow(_csv_row(row))
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+def _order_record(row) -> dict:
+    return {
+        "order_id": row[0],
+        "order_number": row[1],
+        "created_at": row[2].isoformat() if row[2] else None,
+        "status": _status_value(row[3]),
+        "payment_status": row[4],
+        "payment_method": row[5],
+        "total_amount": row[6],
+        "cafe_id": row[7],
+        "cafe_name": row[8],
+        "customer_id": row[9],
+        "customer_name": row[10],
+        "customer_email": row[11],
+        "items": []
+    }
+
+def stream_orders_ndjson(
+    session_factory: sessionmaker,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cafe_id: Optional[int] = None
+) -> Iterator[str]:
+    lines = []
+    order = None
+    for row in _export_rows(session_factory, date_from, date_to, cafe_id):
+        # Rows arrive grouped by order, so an order is complete once the next one starts
+        if order is None or order["order_id"] != row[0]:
+            if order is not None:
+                lines.append(json.dumps(order))
+                if len(lines) >= EXPORT_CHUNK_ROWS:
+                    yield "\n".join(lines) + "\n"
+                    lines = []
+            order = _order_record(row)
+        if row[12] is not None:
+            order["items"].append({
+                "item_id": row[12],
+                "menu_item_id": row[13],
+                "name": row[14],
+                "quantity": row[15],
+                "unit_price": row[16],
+                "total_price": row[17]
+            })
+    if order is not None:
+        lines.append(json.dumps(order))
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def stream_orders(session_factory: sessionmaker, export_format: str, **filters) -> Iterator[str]:
+    if export_format == "ndjson":
+        return stream_orders_ndjson(session_factory, **filters)
+    return stream_orders_csv(session_factory, **filters)
+
+def export_filename(export_format: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> str:
+    parts = ["orders"]
+    if date_from is not None:
+        parts.append(date_from.strftime("%Y%m%d"))
+    if date_to is not None:
+        parts.append(date_to.strftime("%Y%m%d"))
+    return "-".join(parts) + "." + export_format
@@ -1,21 +1,63 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 import os
 
-from database import SessionLocal, engine, Base
-from models import User, Cafe, Order, OrderFeedback, OrderItem, MenuItem, Category, UserType, OrderStatus
-from middleware import get_current_user, get_current_super_admin
+from database import SessionLocal, engine, async_engine
+from engine_factory import pool_stats
+from models import User, Cafe, Order, OrderFeedback, MenuItem, Category, UserType, OrderStatus, migrate_schema
+from middleware import get_current_super_admin
+from token_claims import Principal, revocation_list, revoke_user_tokens
 from auth import verify_token
+from principal_cache import principal_cache
+from token_cache import token_cache
+from pagination import OrderPageParams, paginate_orders, NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
+from export import EXPORT_FORMATS, stream_orders, export_filename
+from onboarding import parse_employee_csv, stream_onboarding, shutdown_hash_pool, OnboardingError
+from cafe_deletion import CafeDeletionJobs, delete_cafe_rows
+from rollups import (
+    refresh_rollups, rebuild_rollups, rollups_as_of, RollupRefresher,
+    analytics_range, sales_summary, daily_series, cafe_totals
+)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
 
 app = FastAPI(title="Admin Service", description="Super admin management service for company oversight")
 
+rollup_refresher = RollupRefresher(SessionLocal)
+cafe_deletions = CafeDeletionJobs(SessionLocal)
+
+@app.on_event("startup")
+async def start_rollup_refresher():
+    rollup_refresher.start()
+
+@app.on_event("shutdown")
+async def stop_rollup_refresher():
+    rollup_refresher.stop()
+
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+def stop_onboarding_workers():
+    shutdown_hash_pool()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, "Content-Disposition"],
 )
 
 # Dependency to get database session
@@ -101,27 +144,123 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "admin-service"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
 # System Overview
 @app.get("/admin/stats", response_model=SystemStats)
 async def get_system_stats(
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Get comprehensive system statistics."""
+    # One round trip instead of a query per counter
+    counts = db.execute(select(
+        select(func.count(User.id)).scalar_subquery(),
+        select(func.count(Cafe.id)).scalar_subquery(),
+        select(func.count(MenuItem.id)).scalar_subquery(),
+        select(func.count(Order.id)).scalar_subquery(),
+        select(func.count(OrderFeedback.id)).scalar_subquery(),
+        select(func.count(User.id)).where(User.is_active == True).scalar_subquery(),
+        select(func.count(Cafe.id)).where(Cafe.is_active == True).scalar_subquery()
+    )).one()
     return SystemStats(
-        total_users=db.query(User).count(),
-        total_cafes=db.query(Cafe).count(),
-        total_menu_items=db.query(MenuItem).count(),
-        total_orders=db.query(Order).count(),
-        total_feedbacks=db.query(OrderFeedback).count(),
-        active_users=db.query(User).filter(User.is_active == True).count(),
-        active_cafes=db.query(Cafe).filter(Cafe.is_active == True).count()
+        total_users=counts[0],
+        total_cafes=counts[1],
+        total_menu_items=counts[2],
+        total_orders=counts[3],
+        total_feedbacks=counts[4],
+        active_users=counts[5],
+        active_cafes=counts[6]
     )
 
+# Analytics, answered from the daily rollups
+def _analytics_period(date_from: Optional[date], date_to: Optional[date]):
+    date_from, date_to = analytics_range(date_from, date_to)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return date_from, date_to
+
+@app.get("/admin/analytics/summary")
+async def get_analytics_summary(
+    date_from: Optional[date] = Query(None, description="First day (UTC), defaults to 30 days ago"),
+    date_to: Optional[date] = Query(None, description="Last day (UTC), defaults to today"),
+    cafe_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_super_admin),
+    db: Session = Depends(get_db)
+):
+    """Get order, revenue and rating totals for a period."""
+    date_from, date_to = _analytics_period(date_from, date_to)
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "cafe_id": cafe_id,
+        "as_of": rollups_as_of(db),
+        **sales_summary(db, date_from, date_to, cafe_id)
+    }
+
+@app.get("/admin/analytics/daily")
+async def get_analytics_daily(
+    date_from: Optional[date] = Query(None, description="First day (UTC), defaults to 30 days ago"),
+    date_to: Optional[date] = Query(None, description="Last day (UTC), defaults to today"),
+    cafe_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_super_admin),
+    db: Session = Depends(get_db)
+):
+    """Get per-day totals for a period, oldest first; days without activity are omitted."""
+    date_from, date_to = _analytics_period(date_from, date_to)
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "cafe_id": cafe_id,
+        "as_of": rollups_as_of(db),
+        "days": daily_series(db, date_from, date_to, cafe_id)
+    }
+
+@app.get("/admin/analytics/cafes")
+async def get_analytics_cafes(
+    date_from: Optional[date] = Query(None, description="First day (UTC), defaults to 30 days ago"),
+    date_to: Optional[date] = Query(None, description="Last day (UTC), defaults to today"),
+    current_user: Principal = Depends(get_current_super_admin),
+    db: Session = Depends(get_db)
+):
+    """Get per-cafe totals for a period, highest revenue first."""
+    date_from, date_to = _analytics_period(date_from, date_to)
+    totals = cafe_totals(db, date_from, date_to)
+    cafes = db.query(Cafe.id, Cafe.name).filter(Cafe.id.in_(totals.keys())).all() if totals else []
+    names = {cafe_id: name for cafe_id, name in cafes}
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "as_of": rollups_as_of(db),
+        "cafes": sorted([{
+            "cafe_id": cafe_id,
+            "cafe_name": names.get(cafe_id),
+            **values
+        } for cafe_id, values in totals.items()], key=lambda cafe: cafe["revenue"], reverse=True)
+    }
+
+@app.post("/admin/analytics/refresh")
+async def refresh_analytics(
+    rebuild: bool = False,
+    current_user: Principal = Depends(get_current_super_admin),
+    db: Session = Depends(get_db)
+):
+    """Bring the rollups up to date now; `rebuild` recomputes them from scratch."""
+    result = rebuild_rollups(db) if rebuild else refresh_rollups(db)
+    return {**result, "as_of": rollups_as_of(db)}
+
 # User Management
 @app.get("/admin/users")
 async def get_all_users(
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Get all users in the system."""
@@ -139,11 +278,11 @@ async def get_all_users(
 @app.post("/admin/users")
 async def create_user(
     user_data: UserCreateAdmin,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Create a new user."""
-    from auth import get_password_hash
+    from auth import get_password_hash_async
     
     # Check if user already exists
     if db.query(User).filter(User.email == user_data.email).first():
@@ -156,7 +295,7 @@ async def create_user(
         email=user_data.email,
         username=user_data.username,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         user_type=user_data.user_type,
         is_active=True
     )
@@ -175,17 +314,35 @@ async def create_user(
         "created_at": new_user.created_at
     }
 
+@app.post("/admin/users/bulk")
+async def bulk_onboard_users(
+    request: Request,
+    current_user: Principal = Depends(get_current_super_admin)
+):
+    """Create many users from a CSV upload, streaming progress as NDJSON.
+
+    Columns: email, username, full_name, password and optionally user_type
+    (EMPLOYEE by default). Invalid rows and clashes with existing users are
+    reported in the final `done` event; every other row is created.
+    """
+    try:
+        rows = parse_employee_csv(await request.body())
+    except OnboardingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(stream_onboarding(SessionLocal, rows), media_type="application/x-ndjson")
+
 @app.put("/admin/users/{user_id}")
 async def update_user(
     user_id: int,
     user_data: UserUpdateAdmin,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Update a user."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    token_identity = (user.username, user.user_type, user.is_active)
     
     # Update fields if provided
     if user_data.email is not None:
@@ -209,8 +366,16 @@ async def update_user(
     if user_data.is_active is not None:
         user.is_active = user_data.is_active
     
+    # Tokens carry the username and role, so changing either or deactivating the user revokes them
+    revoked_version = None
+    if (user.username, user.user_type, user.is_active) != token_identity:
+        revoked_version = revoke_user_tokens(db, user_id)
+    
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate_user(user_id=user_id)
+    if revoked_version is not None:
+        revocation_list.add(user_id, revoked_version)
     
     return {
         "id": user.id,
@@ -225,7 +390,7 @@ async def update_user(
 @app.delete("/admin/users/{user_id}")
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Delete a user."""
@@ -238,14 +403,17 @@ async def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     
     db.delete(user)
+    revoked_version = revoke_user_tokens(db, user_id)
     db.commit()
+    principal_cache.invalidate_user(user_id=user_id)
+    revocation_list.add(user_id, revoked_version)
     
     return {"message": "User deleted successfully"}
 
 # Cafe Management
 @app.get("/admin/cafes")
 async def get_all_cafes(
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Get all cafes in the system."""
@@ -266,7 +434,7 @@ async def get_all_cafes(
 @app.post("/admin/cafes")
 async def create_cafe(
     cafe_data: CafeCreateAdmin,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Create a new cafe."""
@@ -306,7 +474,7 @@ async def create_cafe(
 async def update_cafe(
     cafe_id: int,
     cafe_data: CafeUpdateAdmin,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Update a cafe."""
@@ -353,47 +521,41 @@ async def update_cafe(
 @app.delete("/admin/cafes/{cafe_id}")
 async def delete_cafe(
     cafe_id: int,
-    current_user: User = Depends(get_current_super_admin),
+    response: Response,
+    background: bool = Query(False, description="Deactivate now and delete in batches on a background job"),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
-    """Delete a cafe."""
+    """Delete a cafe and all its orders, menu items, feedback and rollups."""
     cafe = db.query(Cafe).filter(Cafe.id == cafe_id).first()
     if not cafe:
         raise HTTPException(status_code=404, detail="Cafe not found")
-    
-    # First delete all order items for orders from this cafe
-    orders = db.query(Order).filter(Order.cafe_id == cafe_id).all()
-    for order in orders:
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-        for order_item in order_items:
-            db.delete(order_item)
-        # Delete feedbacks for this order
-        feedbacks = db.query(OrderFeedback).filter(OrderFeedback.order_id == order.id).all()
-        for feedback in feedbacks:
-            db.delete(feedback)
-        # Delete the order
-        db.delete(order)
-    
-    # Delete all menu items associated with this cafe
-    menu_items = db.query(MenuItem).filter(MenuItem.cafe_id == cafe_id).all()
-    for item in menu_items:
-        db.delete(item)
-    
-    # Delete all feedbacks associated with this cafe
-    feedbacks = db.query(OrderFeedback).filter(OrderFeedback.cafe_id == cafe_id).all()
-    for feedback in feedbacks:
-        db.delete(feedback)
-    
-    # Finally delete the cafe
-    db.delete(cafe)
+
+    if background:
+        job = cafe_deletions.start(cafe_id)
+        response.status_code = 202
+        return job.to_dict()
+
+    deleted = delete_cafe_rows(db, cafe_id)
     db.commit()
-    
-    return {"message": "Cafe and all associated data deleted successfully"}
+
+    return {"message": "Cafe and all associated data deleted successfully", "deleted": deleted}
+
+@app.get("/admin/cafe-deletions/{job_id}")
+async def get_cafe_deletion(
+    job_id: str,
+    current_user: Principal = Depends(get_current_super_admin)
+):
+    """Progress of a background cafe deletion."""
+    job = cafe_deletions.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Cafe deletion job not found")
+    return job.to_dict()
 
 # Menu Item Management
 @app.get("/admin/menu-items")
 async def get_all_menu_items(
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Get all menu items across all cafes."""
@@ -417,7 +579,7 @@ async def get_all_menu_items(
 @app.post("/admin/menu-items")
 async def create_menu_item(
     item_data: MenuItemCreateAdmin,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Create a new menu item."""
@@ -467,7 +629,7 @@ async def create_menu_item(
 async def update_menu_item(
     item_id: int,
     item_data: MenuItemUpdateAdmin,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Update a menu item."""
@@ -521,7 +683,7 @@ async def update_menu_item(
 @app.delete("/admin/menu-items/{item_id}")
 async def delete_menu_item(
     item_id: int,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Delete a menu item."""
@@ -537,11 +699,17 @@ async def delete_menu_item(
 # Order Overview
 @app.get("/admin/orders")
 async def get_all_orders(
-    current_user: User = Depends(get_current_super_admin),
+    response: Response,
+    page: OrderPageParams = Depends(),
+    cafe_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
-    """Get all orders in the system."""
-    orders = db.query(Order).all()
+    """Get orders across the system, newest first, one page at a time."""
+    query = db.query(Order).options(joinedload(Order.customer), joinedload(Order.cafe))
+    if cafe_id is not None:
+        query = query.filter(Order.cafe_id == cafe_id)
+    orders = paginate_orders(query, page, response)
     return [{
         "id": order.id,
         "order_number": order.order_number,
@@ -555,10 +723,49 @@ async def get_all_orders(
         "updated_at": order.updated_at
     } for order in orders]
 
+@app.get("/admin/orders/summary")
+async def get_orders_summary(
+    current_user: Principal = Depends(get_current_super_admin),
+    db: Session = Depends(get_db)
+):
+    """Order totals across the system, for the order overview (the listing itself is paginated)."""
+    def count_status(order_status: OrderStatus):
+        return func.coalesce(func.sum(case((Order.status == order_status, 1), else_=0)), 0)
+
+    total_orders, total_revenue, delivered_orders, pending_orders = db.execute(select(
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.total_amount), 0),
+        count_status(OrderStatus.DELIVERED),
+        count_status(OrderStatus.PENDING)
+    )).one()
+    return {
+        "total_orders": total_orders,
+        "total_revenue": float(total_revenue),
+        "delivered_orders": delivered_orders,
+        "pending_orders": pending_orders
+    }
+
+@app.get("/admin/orders/export")
+async def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv (one row per line item) or ndjson (one object per order)"),
+    date_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only orders created before this time"),
+    cafe_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_super_admin)
+):
+    """Stream orders with their line items, oldest first, for finance exports."""
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    return StreamingResponse(
+        stream_orders(SessionLocal, format, date_from=date_from, date_to=date_to, cafe_id=cafe_id),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format, date_from, date_to)}"'}
+    )
+
 # Categories
 @app.get("/admin/categories")
 async def get_all_categories(
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Get all categories."""
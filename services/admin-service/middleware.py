@@ -1,45 +1,73 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import os
 
-from database import get_db
+from database import get_async_db
 from models import User, UserType
 from auth import verify_token
+from principal_cache import principal_cache
+from token_claims import Principal, principal_from_claims, revocation_list
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def verified_payload(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decode the bearer token and reject it if invalid or revoked."""
+    payload = verify_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None:
+        raise credentials_exception
+    if "uid" in payload and revocation_list.is_revoked(payload["uid"], payload.get("ver", 0)):
+        raise credentials_exception
+    return payload
+
+async def load_user(payload: dict, db: AsyncSession) -> User:
+    """Load the user a verified token was issued to."""
     try:
-        token = credentials.credentials
-        payload = verify_token(token)
-        if payload is None:
-            raise credentials_exception
-        
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        
-        user = db.query(User).filter(User.username == username).first()
+        # Serve repeat requests for the same token from the principal cache
+        cache_key = principal_cache.key_for(payload)
+        user = principal_cache.get(cache_key)
         if user is None:
+            user = await db.scalar(select(User).where(User.username == payload["sub"]).limit(1))
+            if user is None:
+                raise credentials_exception
+            # Detach so commits made later in this request don't expire the cached copy
+            db.expunge(user)
+            principal_cache.put(cache_key, user)
+
+        if not user.is_active:
             raise credentials_exception
-            
+
         return user
     except Exception:
         raise credentials_exception
 
-async def get_current_super_admin(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user."""
+    return await load_user(verified_payload(credentials), db)
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Get the caller's id and role from the token; only tokens without role claims touch the users table."""
+    payload = verified_payload(credentials)
+    principal = principal_from_claims(payload)
+    if principal is None:
+        return Principal.from_user(await load_user(payload, db))
+    return principal
+
+async def get_current_super_admin(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Ensure current user is a super admin."""
     if current_user.user_type != UserType.SUPER_ADMIN:
         raise HTTPException(
@@ -48,7 +76,7 @@ async def get_current_super_admin(current_user: User = Depends(get_current_user)
         )
     return current_user
 
-async def get_current_cafe_owner(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_cafe_owner(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Ensure current user is a cafe owner."""
     if current_user.user_type != UserType.CAFE_OWNER:
         raise HTTPException(
@@ -57,7 +85,7 @@ async def get_current_cafe_owner(current_user: User = Depends(get_current_user))
         )
     return current_user
 
-async def get_current_employee(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_employee(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Ensure current user is an employee."""
     if current_user.user_type != UserType.EMPLOYEE:
         raise HTTPException(
@@ -0,0 +1,214 @@
+import io
+import os
+import csv
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from models import User, UserType
+from auth import pwd_context
+
+# Bulk user onboarding from CSV.
+#
+# The whole file is validated up front: rows are checked field by field, for
+# duplicates within the file, and against existing users with one query.
+# Passwords are then hashed in chunks on a thread pool while earlier chunks
+# are inserted with one executemany each and committed, so progress can be
+# reported chunk by chunk and memory stays bounded by the chunk size. bcrypt
+# releases the GIL, so the threads hash in parallel; the pool is separate from
+# auth's password_executor so an import doesn't queue logins behind it. Only
+# ONBOARDING_HASH_AHEAD chunks are submitted ahead of the inserts, and the
+# rest are cancelled if the client goes away mid-import.
+ONBOARDING_MAX_ROWS = int(os.getenv("ONBOARDING_MAX_ROWS", "20000"))
+ONBOARDING_CHUNK_SIZE = int(os.getenv("ONBOARDING_CHUNK_SIZE", "500"))
+ONBOARDING_HASH_WORKERS = int(os.getenv("ONBOARDING_HASH_WORKERS", str(os.cpu_count() or 1)))
+ONBOARDING_HASH_AHEAD = int(os.getenv("ONBOARDING_HASH_AHEAD", str(ONBOARDING_HASH_WORKERS)))
+
+REQUIRED_COLUMNS = ("email", "username", "full_name", "password")
+
+class OnboardingError(ValueError):
+    """The upload as a whole can't be read; row-level problems go in the report instead."""
+
+class EmployeeImport(BaseModel):
+    email: str = Field(min_length=3, pattern=r"^[^@\s]+@[^@\s]+$")
+    username: str = Field(min_length=1)
+    full_name: str = Field(min_length=1)
+    password: str = Field(min_length=1)
+    user_type: UserType = UserType.EMPLOYEE
+
+def parse_employee_csv(body: bytes) -> List[dict]:
+    """Rows from a CSV body with a header row containing at least REQUIRED_COLUMNS."""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise OnboardingError("Body must be UTF-8")
+
+    reader = csv.DictReader(io.StringIO(text))
+    header = {name.strip() for name in reader.fieldnames or [] if name}
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise OnboardingError(f"CSV header is missing: {', '.join(missing)}")
+
+    # Empty cells count as missing so defaults apply
+    rows = [{
+        key.strip(): value.strip() for key, value in row.items()
+        if key and value is not None and value.strip() != ""
+    } for row in reader]
+    if not rows:
+        raise OnboardingError("No users to onboard")
+    if len(rows) > ONBOARDING_MAX_ROWS:
+        raise OnboardingError(f"At most {ONBOARDING_MAX_ROWS} users can be onboarded at once")
+    return rows
+
+def _row_error(index: int, username, errors: List[str]) -> dict:
+    return {"row": index + 1, "username": username, "errors": errors}
+
+def _existing_keys(db: Session, employees: List[EmployeeImport]) -> Tuple[set, set]:
+    """Emails and usernames among `employees` that already belong to a user, in one query."""
+    emails = {employee.email for employee in employees}
+    usernames = {employee.username for employee in employees}
+    if not emails:
+        return set(), set()
+    taken_emails, taken_usernames = set(), set()
+    for email, username in db.query(User.email, User.username).filter(
+        or_(User.email.in_(emails), User.username.in_(usernames))
+    ):
+        taken_emails.add(email)
+        taken_usernames.add(username)
+    return taken_emails & emails, taken_usernames & usernames
+
+def validate_employees(db: Session, rows: List[dict]) -> Tuple[List[Tuple[int, EmployeeImport]], List[dict]]:
+    """Split rows into (index, employee) pairs to create and per-row errors."""
+    errors = []
+    candidates = []
+    seen_emails, seen_usernames = set(), set()
+    for index, row in enumerate(rows):
+        try:
+            employee = EmployeeImport.model_validate(row)
+        except ValidationError as e:
+            errors.append(_row_error(index, row.get("username"), [
+                f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}" for detail in e.errors()
+            ]))
+            continue
+        duplicates = []
+        if employee.email in seen_emails:
+            duplicates.append("Duplicate email in this upload")
+        if employee.username in seen_usernames:
+            duplicates.append("Duplicate username in this upload")
+        if duplicates:
+            errors.append(_row_error(index, employee.username, duplicates))
+            continue
+        seen_emails.add(employee.email)
+        seen_usernames.add(employee.username)
+        candidates.append((index, employee))
+
+    candidates, clashes = _drop_existing(db, candidates)
+    errors.extend(clashes)
+    errors.sort(key=lambda error: error["row"])
+    return candidates, errors
+
+def _drop_existing(db: Session, candidates: List[Tuple[int, EmployeeImport]]):
+    taken_emails, taken_usernames = _existing_keys(db, [employee for _, employee in candidates])
+    kept, clashes = [], []
+    for index, employee in candidates:
+        problems = []
+        if employee.email in taken_emails:
+            problems.append("Email already registered")
+        if employee.username in taken_usernames:
+            problems.append("Username already taken")
+        if problems:
+            clashes.append(_row_error(index, employee.username, problems))
+        else:
+            kept.append((index, employee))
+    return kept, clashes
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash one chunk of passwords; runs on the hash pool."""
+    return [pwd_context.hash(password) for password in passwords]
+
+_hash_pool: Optional[ThreadPoolExecutor] = None
+
+def hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(max_workers=ONBOARDING_HASH_WORKERS, thread_name_prefix="onboarding-hash")
+    return _hash_pool
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(cancel_futures=True)
+        _hash_pool = None
+
+def _insert_chunk(db: Session, chunk: List[Tuple[int, EmployeeImport]], hashes: List[str], errors: List[dict]) -> int:
+    now = datetime.utcnow()
+    values = [{
+        "email": employee.email,
+        "username": employee.username,
+        "full_name": employee.full_name,
+        "hashed_password": hashed,
+        "user_type": employee.user_type,
+        "is_active": True,
+        "created_at": now
+    } for (_, employee), hashed in zip(chunk, hashes)]
+    try:
+        db.execute(insert(User), values)
+        db.commit()
+        return len(values)
+    except IntegrityError:
+        db.rollback()
+
+    # Someone registered one of these users after validation; insert the rest
+    kept, clashes = _drop_existing(db, chunk)
+    errors.extend(clashes)
+    kept_indexes = {index for index, _ in kept}
+    values = [value for (index, _), value in zip(chunk, values) if index in kept_indexes]
+    if values:
+        db.execute(insert(User), values)
+        db.commit()
+    return len(values)
+
+def onboard_employees(session_factory: sessionmaker, rows: List[dict], chunk_size: int = ONBOARDING_CHUNK_SIZE) -> Iterator[dict]:
+    """Create users from parsed CSV rows, yielding a progress event after each committed chunk."""
+    # A streamed body outlives the request's session, so onboarding owns its own
+    db = session_factory()
+    pending = deque()
+    try:
+        candidates, errors = validate_employees(db, rows)
+        yield {"event": "validated", "total": len(rows), "valid": len(candidates), "invalid": len(errors)}
+
+        chunks = iter([candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)])
+        # Hash a few chunks ahead on the pool while earlier ones are inserted
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append((chunk, hash_pool().submit(hash_passwords, [employee.password for _, employee in chunk])))
+        for _ in range(max(1, ONBOARDING_HASH_AHEAD)):
+            submit_next()
+
+        created = processed = 0
+        while pending:
+            chunk, hashing = pending.popleft()
+            hashes = hashing.result()
+            submit_next()
+            created += _insert_chunk(db, chunk, hashes, errors)
+            processed += len(chunk)
+            yield {"event": "progress", "processed": processed, "valid": len(candidates), "created": created}
+
+        errors.sort(key=lambda error: error["row"])
+        yield {"event": "done", "total": len(rows), "created": created, "failed": len(errors), "errors": errors}
+    finally:
+        # An abandoned import (the client disconnected) stops hashing what's left
+        for _, hashing in pending:
+            hashing.cancel()
+        db.close()
+
+def stream_onboarding(session_factory: sessionmaker, rows: List[dict]) -> Iterator[str]:
+    """onboard_employees as NDJSON lines."""
+    for event in onboard_employees(session_factory, rows):
+        yield json.dumps(event) + "\n"
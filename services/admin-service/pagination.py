@@ -0,0 +1,126 @@
+import base64
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Order, OrderStatus
+
+# Keyset pagination for order listings.
+#
+# Orders are returned newest first, ordered by (created_at, id). A cursor is an
+# opaque token for one (created_at, id) position; `before` pages towards older
+# orders and `after` towards newer ones, so no request ever needs an OFFSET scan.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+class OrderPageParams:
+    """Query parameters shared by every paginated order-listing endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of orders to return"),
+        before: Optional[str] = Query(None, description="Return orders older than this cursor"),
+        after: Optional[str] = Query(None, description="Return orders newer than this cursor"),
+        date_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+        date_to: Optional[datetime] = Query(None, description="Only orders created before this time"),
+        status_filter: Optional[str] = Query(None, description="Filter by order status")
+    ):
+        if before and after:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either 'before' or 'after', not both"
+            )
+        self.limit = limit
+        self.before = decode_cursor(before) if before else None
+        self.after = decode_cursor(after) if after else None
+        self.date_from = date_from
+        self.date_to = date_to
+        self.status = None
+        if status_filter:
+            try:
+                self.status = OrderStatus(status_filter.upper())
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid status filter"
+                )
+
+def encode_cursor(order: Order) -> str:
+    """Build the opaque cursor for an order's (created_at, id) position."""
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Turn a cursor back into a (created_at, id) pair."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, order_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def _page_query(query, page: OrderPageParams):
+    """Apply filters and keyset bounds for one page plus a lookahead row.
+
+    Works on a legacy Query and on a select() alike, since both provide
+    filter, order_by and limit.
+    """
+    if page.status is not None:
+        query = query.filter(Order.status == page.status)
+    if page.date_from is not None:
+        query = query.filter(Order.created_at >= page.date_from)
+    if page.date_to is not None:
+        query = query.filter(Order.created_at < page.date_to)
+
+    if page.after:
+        created_at, order_id = page.after
+        query = query.filter(or_(
+            Order.created_at > created_at,
+            and_(Order.created_at == created_at, Order.id > order_id)
+        )).order_by(Order.created_at.asc(), Order.id.asc())
+    else:
+        if page.before:
+            created_at, order_id = page.before
+            query = query.filter(or_(
+                Order.created_at < created_at,
+                and_(Order.created_at == created_at, Order.id < order_id)
+            ))
+        query = query.order_by(Order.created_at.desc(), Order.id.desc())
+
+    return query.limit(page.limit + 1)
+
+def _finish_page(orders: List[Order], page: OrderPageParams, response: Response) -> List[Order]:
+    has_more = len(orders) > page.limit
+    orders = orders[:page.limit]
+
+    if page.after:
+        orders.reverse()
+        has_older, has_newer = True, has_more
+    else:
+        has_older, has_newer = has_more, page.before is not None
+
+    if orders and has_older:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(orders[-1])
+    if orders and has_newer:
+        response.headers[PREV_CURSOR_HEADER] = encode_cursor(orders[0])
+
+    return orders
+
+def paginate_orders(query, page: OrderPageParams, response: Response) -> List[Order]:
+    """Apply filters and one page of keyset pagination to an Order query.
+
+    The page is returned newest first. Cursors for the neighbouring pages are
+    sent back in the X-Next-Cursor (older) and X-Prev-Cursor (newer) headers.
+    """
+    return _finish_page(_page_query(query, page).all(), page, response)
+
+async def paginate_orders_async(db: AsyncSession, statement, page: OrderPageParams, response: Response) -> List[Order]:
+    """paginate_orders for a select(Order) statement run on an AsyncSession."""
+    orders = (await db.scalars(_page_query(statement, page))).unique().all()
+    return _finish_page(list(orders), page, response)
@@ -0,0 +1,380 @@
+import os
+import json
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from models import (
+    Order, OrderItem, OrderFeedback, OrderStatus, OutboxEvent,
+    DailyCafeSales, DailyCafeRating, RollupWatermark
+)
+
+# Materialized daily rollups for the admin analytics endpoints.
+#
+# daily_cafe_sales and daily_cafe_ratings hold one row per cafe and UTC day,
+# so analytics queries read at most cafes x days rows however large the
+# orders table grows. A background refresher folds in what changed since the
+# last run: order changes are found through the outbox events every order
+# write already records, new feedback through its id. Each affected
+# (cafe, day) row is recomputed from the source tables, so a refresh can be
+# repeated or run by several workers at once without double counting.
+ROLLUP_REFRESH_SECONDS = float(os.getenv("ROLLUP_REFRESH_SECONDS", "30"))
+
+ORDERS_WATERMARK = "orders"
+FEEDBACK_WATERMARK = "feedback"
+
+# Source rows read per batch
+REFRESH_BATCH_SIZE = 1000
+# Outbox ids may commit slightly out of order on databases with concurrent
+# writers; re-reading a few events behind the watermark is harmless
+WATERMARK_OVERLAP = 100
+
+Key = Tuple[int, date]
+
+def _as_date(value) -> date:
+    # func.date() returns a string on SQLite and a date elsewhere
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def _day_bounds(days: Iterable[date]) -> Tuple[datetime, datetime]:
+    days = list(days)
+    return datetime.combine(min(days), time.min), datetime.combine(max(days) + timedelta(days=1), time.min)
+
+def _group_by_cafe(keys: Iterable[Key]) -> Dict[int, Set[date]]:
+    by_cafe: Dict[int, Set[date]] = {}
+    for cafe_id, day in keys:
+        by_cafe.setdefault(cafe_id, set()).add(day)
+    return by_cafe
+
+def _get_watermark(db: Session, name: str) -> Optional[RollupWatermark]:
+    return db.query(RollupWatermark).filter(RollupWatermark.name == name).first()
+
+def _set_watermark(db: Session, name: str, last_id: int):
+    watermark = _get_watermark(db, name)
+    if watermark is None:
+        db.add(RollupWatermark(name=name, last_id=last_id, updated_at=datetime.utcnow()))
+    else:
+        watermark.last_id = max(watermark.last_id or 0, last_id)
+        watermark.updated_at = datetime.utcnow()
+
+def _sales_for(db: Session, cafe_id: int, days: Set[date]) -> Dict[date, dict]:
+    start, end = _day_bounds(days)
+    order_day = func.date(Order.created_at)
+    not_cancelled = Order.status != OrderStatus.CANCELLED
+
+    totals = db.query(
+        order_day,
+        func.count(Order.id),
+        func.sum(case((not_cancelled, 0), else_=1)),
+        func.sum(case((not_cancelled, Order.total_amount), else_=0))
+    ).filter(
+        Order.cafe_id == cafe_id,
+        Order.created_at >= start,
+        Order.created_at < end
+    ).group_by(order_day).all()
+
+    items = dict((_as_date(day), quantity or 0) for day, quantity in db.query(
+        order_day,
+        func.sum(OrderItem.quantity)
+    ).join(OrderItem, OrderItem.order_id == Order.id).filter(
+        Order.cafe_id == cafe_id,
+        Order.created_at >= start,
+        Order.created_at < end,
+        not_cancelled
+    ).group_by(order_day).all())
+
+    result = {}
+    for day, orders, cancelled, revenue in totals:
+        day = _as_date(day)
+        if day in days:
+            result[day] = {
+                "orders": orders,
+                "cancelled_orders": cancelled or 0,
+                "revenue": round(revenue or 0.0, 2),
+                "items": items.get(day, 0)
+            }
+    return result
+
+def _ratings_for(db: Session, cafe_id: int, days: Set[date]) -> Dict[date, dict]:
+    start, end = _day_bounds(days)
+    feedback_day = func.date(OrderFeedback.created_at)
+    rows = db.query(
+        feedback_day,
+        func.count(OrderFeedback.id),
+        func.sum(OrderFeedback.rating)
+    ).filter(
+        OrderFeedback.cafe_id == cafe_id,
+        OrderFeedback.created_at >= start,
+        OrderFeedback.created_at < end
+    ).group_by(feedback_day).all()
+
+    result = {}
+    for day, ratings, rating_total in rows:
+        day = _as_date(day)
+        if day in days:
+            result[day] = {"ratings": ratings, "rating_total": rating_total or 0}
+    return result
+
+def _store(db: Session, model, cafe_id: int, days: Set[date], values: Dict[date, dict]):
+    """Replace the rollup rows of `cafe_id` for `days` with `values`; days without values are removed."""
+    existing = {
+        row.day: row for row in db.query(model).filter(model.cafe_id == cafe_id, model.day.in_(days)).all()
+    }
+    for day in days:
+        row = existing.get(day)
+        if day not in values:
+            if row is not None:
+                db.delete(row)
+            continue
+        if row is None:
+            row = model(cafe_id=cafe_id, day=day)
+            db.add(row)
+        for column, value in values[day].items():
+            setattr(row, column, value)
+        row.updated_at = datetime.utcnow()
+
+def recompute_sales(db: Session, keys: Iterable[Key]):
+    for cafe_id, days in _group_by_cafe(keys).items():
+        _store(db, DailyCafeSales, cafe_id, days, _sales_for(db, cafe_id, days))
+
+def recompute_ratings(db: Session, keys: Iterable[Key]):
+    for cafe_id, days in _group_by_cafe(keys).items():
+        _store(db, DailyCafeRating, cafe_id, days, _ratings_for(db, cafe_id, days))
+
+def _order_keys(db: Session, order_ids: Set[int]) -> Set[Key]:
+    if not order_ids:
+        return set()
+    order_day = func.date(Order.created_at)
+    rows = db.query(Order.cafe_id, order_day).filter(Order.id.in_(order_ids)).distinct().all()
+    return {(cafe_id, _as_date(day)) for cafe_id, day in rows if day is not None}
+
+def _refresh_sales(db: Session, watermark: int) -> int:
+    """Fold in order events after `watermark`; returns the number of events read."""
+    read = 0
+    after = max(watermark - WATERMARK_OVERLAP, 0)
+    while True:
+        events = db.query(OutboxEvent.id, OutboxEvent.payload).filter(
+            OutboxEvent.id > after
+        ).order_by(OutboxEvent.id).limit(REFRESH_BATCH_SIZE).all()
+        if not events:
+            return read
+
+        order_ids = set()
+        for event_id, payload in events:
+            after = event_id
+            order_id = json.loads(payload).get("order_id")
+            if order_id is not None:
+                order_ids.add(order_id)
+        recompute_sales(db, _order_keys(db, order_ids))
+        _set_watermark(db, ORDERS_WATERMARK, after)
+        db.commit()
+        read += len(events)
+
+def _refresh_ratings(db: Session, watermark: int) -> int:
+    """Fold in feedback created after `watermark`; returns the number of feedback rows read."""
+    read = 0
+    after = watermark
+    feedback_day = func.date(OrderFeedback.created_at)
+    while True:
+        rows = db.query(OrderFeedback.id, OrderFeedback.cafe_id, feedback_day).filter(
+            OrderFeedback.id > after
+        ).order_by(OrderFeedback.id).limit(REFRESH_BATCH_SIZE).all()
+        if not rows:
+            return read
+
+        after = rows[-1][0]
+        recompute_ratings(db, {(cafe_id, _as_date(day)) for _, cafe_id, day in rows})
+        _set_watermark(db, FEEDBACK_WATERMARK, after)
+        db.commit()
+        read += len(rows)
+
+def rebuild_rollups(db: Session) -> dict:
+    """Recompute every rollup row from scratch and reset the watermarks."""
+    # Read the high-water marks first: anything newer is picked up by the next refresh
+    last_event = db.query(func.coalesce(func.max(OutboxEvent.id), 0)).scalar()
+    last_feedback = db.query(func.coalesce(func.max(OrderFeedback.id), 0)).scalar()
+
+    db.query(DailyCafeSales).delete(synchronize_session=False)
+    db.query(DailyCafeRating).delete(synchronize_session=False)
+
+    order_day = func.date(Order.created_at)
+    sales_keys = {(cafe_id, _as_date(day)) for cafe_id, day in db.query(Order.cafe_id, order_day).distinct()}
+    feedback_day = func.date(OrderFeedback.created_at)
+    rating_keys = {
+        (cafe_id, _as_date(day)) for cafe_id, day in db.query(OrderFeedback.cafe_id, feedback_day).distinct()
+    }
+    recompute_sales(db, sales_keys)
+    recompute_ratings(db, rating_keys)
+
+    _set_watermark(db, ORDERS_WATERMARK, last_event)
+    _set_watermark(db, FEEDBACK_WATERMARK, last_feedback)
+    db.commit()
+    return {"rebuilt": True, "sales_rows": len(sales_keys), "rating_rows": len(rating_keys)}
+
+def refresh_rollups(db: Session) -> dict:
+    """Bring the rollups up to date; the first run on a database does a full rebuild."""
+    orders_mark = _get_watermark(db, ORDERS_WATERMARK)
+    feedback_mark = _get_watermark(db, FEEDBACK_WATERMARK)
+    if orders_mark is None or feedback_mark is None:
+        return rebuild_rollups(db)
+    try:
+        return {
+            "rebuilt": False,
+            "order_events": _refresh_sales(db, orders_mark.last_id or 0),
+            "feedbacks": _refresh_ratings(db, feedback_mark.last_id or 0)
+        }
+    except IntegrityError:
+        # Another worker inserted the same (cafe, day) row first; its values are just as current
+        db.rollback()
+        return {"rebuilt": False, "order_events": 0, "feedbacks": 0}
+
+def rollups_as_of(db: Session) -> Optional[datetime]:
+    """When the rollups were last brought up to date, or None if they never were."""
+    return db.query(func.min(RollupWatermark.updated_at)).scalar()
+
+class RollupRefresher:
+    """Background thread that calls refresh_rollups every `interval` seconds."""
+
+    def __init__(self, session_factory: sessionmaker, interval: float = ROLLUP_REFRESH_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rollup-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                refresh_rollups(db)
+            except Exception as e:
+                db.rollback()
+                print(f"Rollup refresh failed: {e}")
+            finally:
+                db.close()
+            self._stop.wait(self.interval)
+
+def analytics_range(date_from: Optional[date], date_to: Optional[date], default_days: int = 30) -> Tuple[date, date]:
+    """Inclusive day range, defaulting to the last `default_days` UTC days."""
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=default_days - 1)
+    return date_from, date_to
+
+def _filtered(query, model, date_from: date, date_to: date, cafe_id: Optional[int]):
+    query = query.filter(model.day >= date_from, model.day <= date_to)
+    if cafe_id is not None:
+        query = query.filter(model.cafe_id == cafe_id)
+    return query
+
+def _average(total, count) -> Optional[float]:
+    return round(total / count, 2) if count else None
+
+def sales_summary(db: Session, date_from: date, date_to: date, cafe_id: Optional[int] = None) -> dict:
+    orders, cancelled, revenue, items = _filtered(db.query(
+        func.coalesce(func.sum(DailyCafeSales.orders), 0),
+        func.coalesce(func.sum(DailyCafeSales.cancelled_orders), 0),
+        func.coalesce(func.sum(DailyCafeSales.revenue), 0.0),
+        func.coalesce(func.sum(DailyCafeSales.items), 0)
+    ), DailyCafeSales, date_from, date_to, cafe_id).one()
+    ratings, rating_total = _filtered(db.query(
+        func.coalesce(func.sum(DailyCafeRating.ratings), 0),
+        func.coalesce(func.sum(DailyCafeRating.rating_total), 0)
+    ), DailyCafeRating, date_from, date_to, cafe_id).one()
+
+    completed = orders - cancelled
+    return {
+        "orders": orders,
+        "cancelled_orders": cancelled,
+        "revenue": round(revenue, 2),
+        "items_sold": items,
+        "average_order_value": _average(revenue, completed),
+        "ratings": ratings,
+        "average_rating": _average(rating_total, ratings)
+    }
+
+def daily_series(db: Session, date_from: date, date_to: date, cafe_id: Optional[int] = None) -> List[dict]:
+    """One entry per day with activity, oldest first."""
+    sales = _filtered(db.query(
+        DailyCafeSales.day,
+        func.sum(DailyCafeSales.orders),
+        func.sum(DailyCafeSales.cancelled_orders),
+        func.sum(DailyCafeSales.revenue),
+        func.sum(DailyCafeSales.items)
+    ), DailyCafeSales, date_from, date_to, cafe_id).group_by(DailyCafeSales.day).all()
+    ratings = dict((day, (count, total)) for day, count, total in _filtered(db.query(
+        DailyCafeRating.day,
+        func.sum(DailyCafeRating.ratings),
+        func.sum(DailyCafeRating.rating_total)
+    ), DailyCafeRating, date_from, date_to, cafe_id).group_by(DailyCafeRating.day).all())
+
+    days = {}
+    for day, orders, cancelled, revenue, items in sales:
+        days[day] = {
+            "day": day.isoformat(),
+            "orders": orders,
+            "cancelled_orders": cancelled,
+            "revenue": round(revenue or 0.0, 2),
+            "items_sold": items,
+            "ratings": 0,
+            "average_rating": None
+        }
+    for day, (count, total) in ratings.items():
+        entry = days.setdefault(day, {
+            "day": day.isoformat(),
+            "orders": 0,
+            "cancelled_orders": 0,
+            "revenue": 0.0,
+            "items_sold": 0
+        })
+        entry["ratings"] = count
+        entry["average_rating"] = _average(total, count)
+    return [days[day] for day in sorted(days)]
+
+def cafe_totals(db: Session, date_from: date, date_to: date) -> Dict[int, dict]:
+    """Totals per cafe id for the range; cafes without activity are absent."""
+    totals: Dict[int, dict] = {}
+    for cafe_id, orders, cancelled, revenue, items in _filtered(db.query(
+        DailyCafeSales.cafe_id,
+        func.sum(DailyCafeSales.orders),
+        func.sum(DailyCafeSales.cancelled_orders),
+        func.sum(DailyCafeSales.revenue),
+        func.sum(DailyCafeSales.items)
+    ), DailyCafeSales, date_from, date_to, None).group_by(DailyCafeSales.cafe_id):
+        totals[cafe_id] = {
+            "orders": orders,
+            "cancelled_orders": cancelled,
+            "revenue": round(revenue or 0.0, 2),
+            "items_sold": items,
+            "ratings": 0,
+            "average_rating": None
+        }
+    for cafe_id, count, total in _filtered(db.query(
+        DailyCafeRating.cafe_id,
+        func.sum(DailyCafeRating.ratings),
+        func.sum(DailyCafeRating.rating_total)
+    ), DailyCafeRating, date_from, date_to, None).group_by(DailyCafeRating.cafe_id):
+        entry = totals.setdefault(cafe_id, {
+            "orders": 0,
+            "cancelled_orders": 0,
+            "revenue": 0.0,
+            "items_sold": 0
+        })
+        entry["ratings"] = count
+        entry["average_rating"] = _average(total, count)
+    return totals
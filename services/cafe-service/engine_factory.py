@@ -0,0 +1,179 @@
+import os
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+
+# Shared engine setup, copied into every service.
+#
+# Every service builds its engine here so pool sizing is the same
+# everywhere. SQLite connections get WAL journaling and related pragmas on
+# connect: the services share one database file, and in WAL mode readers
+# no longer wait for writers and writers only wait for each other (up to
+# busy_timeout) instead of failing with "database is locked".
+#
+# create_async_service_engine builds the AsyncEngine behind each service's
+# get_async_db from the same DATABASE_URL, with the same pool sizing and
+# pragmas, so handlers can await their queries instead of blocking the event
+# loop. SQLite goes through aiosqlite and Postgres through asyncpg.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "300"))
+
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+
+class PoolMetrics:
+    """Connection counters for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.checkouts = 0
+
+    def opened(self, *_):
+        with self._lock:
+            self.connections_opened += 1
+
+    def checked_out(self, *_):
+        with self._lock:
+            self.checkouts += 1
+
+_metrics = {}
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or "mode=memory" in str(url)
+    )
+
+def _sqlite_pragmas(dbapi_connection, _):
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first, so switching the journal mode waits out other writers too
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # A negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    finally:
+        cursor.close()
+
+def create_service_engine(database_url: str, service_name: str) -> Engine:
+    """Create the engine for `service_name` with the shared pool and SQLite settings."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if _is_memory_sqlite(url):
+            # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+            engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        else:
+            engine = create_engine(
+                database_url,
+                poolclass=QueuePool,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+                connect_args={"check_same_thread": False}
+            )
+        event.listen(engine, "connect", _sqlite_pragmas)
+    else:
+        connect_args = {"application_name": service_name}
+        if "neon.tech" in database_url:
+            connect_args.update(sslmode="require", options="-c timezone=utc")
+        engine = create_engine(
+            database_url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True,
+            connect_args=connect_args
+        )
+
+    metrics = PoolMetrics()
+    event.listen(engine, "connect", metrics.opened)
+    event.listen(engine, "checkout", metrics.checked_out)
+    _metrics[engine] = (service_name, metrics)
+    return engine
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg"
+}
+
+def async_database_url(database_url: str):
+    """The same database as `database_url`, addressed through its asyncio driver."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for '{backend}' databases")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql":
+        # asyncpg takes TLS settings as connect arguments, not libpq query parameters
+        url = url.difference_update_query(["sslmode"])
+    return url
+
+def create_async_service_engine(database_url: str, service_name: str) -> AsyncEngine:
+    """Create the AsyncEngine for `service_name`, mirroring create_service_engine."""
+    url = async_database_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if _is_memory_sqlite(url):
+            engine = create_async_engine(url)
+        else:
+            engine = create_async_engine(
+                url,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT_SECONDS
+            )
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas)
+    else:
+        server_settings = {"application_name": service_name}
+        connect_args = {"server_settings": server_settings}
+        if "neon.tech" in database_url:
+            server_settings["timezone"] = "utc"
+            connect_args["ssl"] = "require"
+        engine = create_async_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True,
+            connect_args=connect_args
+        )
+
+    metrics = PoolMetrics()
+    event.listen(engine.sync_engine, "connect", metrics.opened)
+    event.listen(engine.sync_engine, "checkout", metrics.checked_out)
+    _metrics[engine.sync_engine] = (service_name, metrics)
+    return engine
+
+def pool_stats(engine) -> dict:
+    """Current pool usage and lifetime counters for an engine built by this module (sync or async)."""
+    engine = getattr(engine, "sync_engine", engine)
+    service_name, metrics = _metrics.get(engine, (None, PoolMetrics()))
+    pool = engine.pool
+    stats = {
+        "service": service_name,
+        "dialect": engine.dialect.name,
+        "pool": type(pool).__name__,
+        "connections_opened": metrics.connections_opened,
+        "checkouts": metrics.checkouts
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            pool_size=pool.size(),
+            max_overflow=DB_MAX_OVERFLOW,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0)
+        )
+    if engine.dialect.name == "sqlite":
+        stats["journal_mode"] = SQLITE_JOURNAL_MODE.lower()
+    return stats
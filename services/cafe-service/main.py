@@ -1,17 +1,23 @@
 import os
 import uvicorn
-import requests
-from fastapi import FastAPI, Depends, HTTPException, status
+import httpx
+from fastapi import FastAPI, Depends, HTTPException, status, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List
-from database import get_db, engine
-from models import Base, User, Cafe, UserType, Order, OrderItem, OrderStatus
+from database import get_db, engine, async_engine, SessionLocal
+from engine_factory import pool_stats
+from models import User, Cafe, UserType, Order, OrderItem, OrderStatus, migrate_schema
 from schemas import UserType as UserTypeSchema
-from middleware import get_current_user
+from middleware import get_current_principal, get_current_cafe_owner
+from token_claims import Principal, revocation_list
+from token_cache import token_cache
+from pagination import OrderPageParams, paginate_orders, NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
+from outbox import OutboxDispatcher, record_order_status, OUTBOX_DISPATCHER_ENABLED
+from service_client import service_clients, ServiceUnavailable
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
 
 app = FastAPI(title="Cafe Management Service", version="1.0.0")
 
@@ -22,8 +28,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER],
 )
 
+# Deliver order events from the outbox to notification-service
+outbox_dispatcher = OutboxDispatcher(SessionLocal)
+
+@app.on_event("startup")
+def start_outbox_dispatcher():
+    if OUTBOX_DISPATCHER_ENABLED:
+        outbox_dispatcher.start()
+
+@app.on_event("shutdown")
+def stop_outbox_dispatcher():
+    outbox_dispatcher.stop()
+
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+@app.on_event("shutdown")
+async def close_service_clients():
+    await service_clients.aclose()
+
 # Service URLs
 USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:5001")
 
@@ -55,15 +91,6 @@ async def verify_cafe_owner(current_user_data: dict) -> bool:
     """Verify if user is a cafe owner."""
     return current_user_data.get("user_type") == "CAFE_OWNER"
 
-async def get_current_cafe_owner(current_user: User = Depends(get_current_user)) -> User:
-    """Ensure current user is a cafe owner."""
-    if current_user.user_type.value != UserType.CAFE_OWNER.value:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied. Cafe owner privileges required."
-        )
-    return current_user
-
 @app.get("/")
 async def root():
     return {"message": "Cafe Management Service", "service": "cafes", "version": "1.0.0"}
@@ -72,10 +99,25 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "cafe-management"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
+@app.get("/health/dependencies")
+async def dependencies_health():
+    """Connection reuse, retries and circuit state for calls to other services."""
+    return service_clients.stats()
+
 @app.post("/cafes", response_model=CafeResponse)
 async def create_cafe(
     cafe_data: CafeCreate,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Create a new cafe."""
@@ -108,7 +150,7 @@ async def create_cafe(
 
 @app.get("/cafes", response_model=List[CafeResponse])
 async def get_my_cafes(
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Get all cafes owned by current user."""
@@ -118,7 +160,7 @@ async def get_my_cafes(
 @app.get("/cafes/{cafe_id}", response_model=CafeResponse)
 async def get_cafe(
     cafe_id: int,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Get a specific cafe."""
@@ -145,7 +187,7 @@ async def get_all_active_cafes(db: Session = Depends(get_db)):
 async def update_cafe(
     cafe_id: int,
     cafe_data: CafeCreate,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Update a cafe."""
@@ -172,20 +214,26 @@ async def update_cafe(
 # Orders endpoint for cafe owners
 @app.get("/orders")
 async def get_cafe_orders(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    page: OrderPageParams = Depends(),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Get all orders for cafes owned by the current user."""
+    """Get orders for cafes owned by the current user, newest first, one page at a time."""
     if current_user.user_type != UserType.CAFE_OWNER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied: Only cafe owners can view orders"
         )
     
-    # Get all orders for cafes owned by this user
-    orders = db.query(Order).join(Cafe).filter(
-        Cafe.owner_id == current_user.id
-    ).all()
+    # Get orders for cafes owned by this user
+    owned_cafe_ids = db.query(Cafe.id).filter(Cafe.owner_id == current_user.id)
+    query = db.query(Order).options(
+        joinedload(Order.customer),
+        joinedload(Order.cafe),
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item)
+    ).filter(Order.cafe_id.in_(owned_cafe_ids.scalar_subquery()))
+    orders = paginate_orders(query, page, response)
     
     # Format the orders with cafe information
     formatted_orders = []
@@ -214,7 +262,7 @@ async def get_cafe_orders(
 # Feedback endpoint for cafe owners
 @app.get("/feedback")
 async def get_cafe_feedback(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get all feedback for cafes owned by the current user."""
@@ -252,7 +300,7 @@ async def get_cafe_feedback(
 @app.get("/cafes/{cafe_id}/menu-items")
 async def get_cafe_menu_items(
     cafe_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get menu items for a specific cafe (for cafe owners)."""
@@ -276,23 +324,24 @@ async def get_cafe_menu_items(
     
     # Get menu items from Menu service
     try:
-        import requests
-        response = requests.get(f"http://localhost:8003/cafes/{cafe_id}/menu-items/public")
+        response = await service_clients["menu"].get(f"/cafes/{cafe_id}/menu-items/public")
         if response.status_code == 200:
             return response.json()
         else:
             return []
-    except Exception as e:
+    except (ServiceUnavailable, httpx.HTTPError, ValueError) as e:
         print(f"Error fetching menu items: {e}")
         return []
 
 @app.get("/cafes/{cafe_id}/orders")
 async def get_cafe_specific_orders(
     cafe_id: int,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    page: OrderPageParams = Depends(),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Get orders for a specific cafe."""
+    """Get orders for a specific cafe, newest first, one page at a time."""
     if current_user.user_type != UserType.CAFE_OWNER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -312,7 +361,11 @@ async def get_cafe_specific_orders(
         )
     
     # Get orders for this specific cafe
-    orders = db.query(Order).filter(Order.cafe_id == cafe_id).all()
+    query = db.query(Order).options(
+        joinedload(Order.customer),
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item)
+    ).filter(Order.cafe_id == cafe_id)
+    orders = paginate_orders(query, page, response)
     
     # Format the orders
     formatted_orders = []
@@ -340,7 +393,7 @@ async def get_cafe_specific_orders(
 # Categories endpoint for cafe management
 @app.get("/categories")
 async def get_categories(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get all categories for cafe owners."""
@@ -352,13 +405,12 @@ async def get_categories(
     
     # Get categories from Menu service
     try:
-        import requests
-        response = requests.get("http://localhost:8003/categories")
+        response = await service_clients["menu"].get("/categories")
         if response.status_code == 200:
             return response.json()
         else:
             return []
-    except Exception as e:
+    except (ServiceUnavailable, httpx.HTTPError, ValueError) as e:
         print(f"Error fetching categories: {e}")
         return []
 
@@ -367,7 +419,7 @@ async def get_categories(
 async def update_order_status(
     order_id: int,
     status_update: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update order status."""
@@ -402,6 +454,7 @@ async def update_order_status(
     if "estimated_preparation_time" in status_update:
         order.estimated_preparation_time = status_update["estimated_preparation_time"]
     
+    record_order_status(db, order)
     db.commit()
     db.refresh(order)
     
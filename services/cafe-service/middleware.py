@@ -1,27 +1,65 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models import User, UserType
 from auth import verify_token
+from principal_cache import principal_cache
+from token_claims import Principal, principal_from_claims, revocation_list
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Get current authenticated user."""
-    payload = verify_token(token)
+def check_not_revoked(payload: dict):
+    """Reject a token issued before its user's tokens were last revoked."""
+    if "uid" in payload and revocation_list.is_revoked(payload["uid"], payload.get("ver", 0)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+
+async def load_user(payload: dict, db: AsyncSession) -> User:
+    """Load the user a verified token was issued to."""
     username = payload.get("sub")
-    
-    user = db.query(User).filter(User.username == username).first()
+
+    # Serve repeat requests for the same token from the principal cache
+    cache_key = principal_cache.key_for(payload)
+    user = principal_cache.get(cache_key)
     if user is None:
+        user = await db.scalar(select(User).where(User.username == username).limit(1))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials"
+            )
+        # Detach so commits made later in this request don't expire the cached copy
+        db.expunge(user)
+        principal_cache.put(cache_key, user)
+
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
+            detail="Inactive user"
         )
-    
+
     return user
 
-async def get_current_cafe_owner(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    """Get current authenticated user."""
+    payload = verify_token(token)
+    check_not_revoked(payload)
+    return await load_user(payload, db)
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """Get the caller's id and role from the token; only tokens without role claims touch the users table."""
+    payload = verify_token(token)
+    principal = principal_from_claims(payload)
+    if principal is None:
+        return Principal.from_user(await load_user(payload, db))
+    check_not_revoked(payload)
+    return principal
+
+async def get_current_cafe_owner(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Ensure current user is a cafe owner."""
     if current_user.user_type.value != UserType.CAFE_OWNER.value:
         raise HTTPException(
@@ -30,7 +68,7 @@ async def get_current_cafe_owner(current_user: User = Depends(get_current_user))
         )
     return current_user
 
-async def get_current_employee(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_employee(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Ensure current user is an employee."""
     if current_user.user_type.value != UserType.EMPLOYEE.value:
         raise HTTPException(
@@ -0,0 +1,228 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from typing import Dict, Optional
+import httpx
+
+# Async HTTP client for calls to the other services.
+#
+# One pooled httpx.AsyncClient per target service keeps connections alive
+# between requests instead of opening a new TCP connection for each call.
+# Idempotent requests are retried on connection errors and 502/503/504 with
+# jittered exponential backoff, and a per-service circuit breaker fails calls
+# fast while a service keeps failing, so a dead dependency cannot tie up
+# request handlers for the full timeout every time.
+SERVICE_URLS = {
+    "user": os.getenv("USER_SERVICE_URL", "http://user-service:5001"),
+    "menu": os.getenv("MENU_SERVICE_URL", "http://menu-service:5003"),
+    "order": os.getenv("ORDER_SERVICE_URL", "http://order-service:5004"),
+    "notification": os.getenv("NOTIFICATION_SERVICE_URL", "http://notification-service:5007"),
+}
+SERVICE_CLIENT_TIMEOUT_SECONDS = float(os.getenv("SERVICE_CLIENT_TIMEOUT_SECONDS", "5"))
+SERVICE_CLIENT_CONNECT_TIMEOUT_SECONDS = float(os.getenv("SERVICE_CLIENT_CONNECT_TIMEOUT_SECONDS", "2"))
+SERVICE_CLIENT_RETRIES = int(os.getenv("SERVICE_CLIENT_RETRIES", "2"))
+SERVICE_CLIENT_BACKOFF_SECONDS = float(os.getenv("SERVICE_CLIENT_BACKOFF_SECONDS", "0.1"))
+SERVICE_CLIENT_MAX_CONNECTIONS = int(os.getenv("SERVICE_CLIENT_MAX_CONNECTIONS", "100"))
+SERVICE_CLIENT_MAX_KEEPALIVE = int(os.getenv("SERVICE_CLIENT_MAX_KEEPALIVE", "20"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+RETRY_STATUS_CODES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+MAX_BACKOFF_SECONDS = 2
+
+class ServiceUnavailable(Exception):
+    """Raised when a service cannot be reached or its circuit is open."""
+
+    def __init__(self, service: str, reason: str):
+        super().__init__(f"{service}-service unavailable: {reason}")
+        self.service = service
+        self.reason = reason
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one trial call through after the reset time."""
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one trial call is allowed."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Free the trial slot of a call that ended without an outcome, e.g. because it was cancelled."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                # A failed trial call restarts the reset timer
+                self.opened_at = time.monotonic()
+
+class ServiceClient:
+    """Pooled async client for one service with timeouts, retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        service: str,
+        base_url: str,
+        timeout: float = SERVICE_CLIENT_TIMEOUT_SECONDS,
+        retries: int = SERVICE_CLIENT_RETRIES,
+        backoff_seconds: float = SERVICE_CLIENT_BACKOFF_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.service = service
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.retried = 0
+        self.rejected = 0
+
+    def _http(self) -> httpx.AsyncClient:
+        # Created on first use so the pool belongs to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=SERVICE_CLIENT_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=SERVICE_CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=SERVICE_CLIENT_MAX_KEEPALIVE
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps callers that failed together from retrying together
+        return random.uniform(0, min(MAX_BACKOFF_SECONDS, self.backoff_seconds * 2 ** attempt))
+
+    async def request(self, method: str, path: str, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Send a request to the service; raises ServiceUnavailable if it cannot be served."""
+        method = method.upper()
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, SERVICE_CLIENT_CONNECT_TIMEOUT_SECONDS))
+
+        # The breaker sees one outcome per call, however many attempts it took
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise ServiceUnavailable(self.service, "circuit open")
+        try:
+            response, reason = await self._attempt(method, path, attempts, kwargs)
+        except BaseException:
+            # Cancelled (e.g. the caller disconnected) or failed outside HTTP;
+            # don't leave a half-open circuit waiting on a trial that never reports
+            self.breaker.release_trial()
+            raise
+
+        if response is None or response.status_code in RETRY_STATUS_CODES:
+            self.breaker.record_failure()
+            if response is None:
+                raise ServiceUnavailable(self.service, reason)
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def _attempt(self, method: str, path: str, attempts: int, kwargs: dict):
+        """Try the request up to `attempts` times; returns the last response, or None and why."""
+        reason = "no attempts made"
+        for attempt in range(attempts):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(self._backoff(attempt - 1))
+
+            self.requests += 1
+            try:
+                response = await self._http().request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                reason = f"{type(e).__name__}: {e}"
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt + 1 < attempts:
+                await response.aclose()
+                continue
+            return response, None
+
+        return None, reason
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "requests": self.requests,
+            "retried": self.retried,
+            "rejected": self.rejected
+        }
+
+class ServiceClients:
+    """One ServiceClient per service name, resolved from the *_SERVICE_URL settings."""
+
+    def __init__(self, urls: Dict[str, str] = SERVICE_URLS):
+        self.urls = dict(urls)
+        self._clients: Dict[str, ServiceClient] = {}
+
+    def __getitem__(self, service: str) -> ServiceClient:
+        client = self._clients.get(service)
+        if client is None:
+            if service not in self.urls:
+                raise KeyError(f"No URL configured for {service}-service")
+            client = self._clients[service] = ServiceClient(service, self.urls[service])
+        return client
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+
+    def stats(self) -> dict:
+        return {service: client.stats() for service, client in self._clients.items()}
+
+service_clients = ServiceClients()
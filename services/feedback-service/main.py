@@ -6,16 +6,32 @@ from typing import Optional, List
 from datetime import datetime
 import os
 
-from database import SessionLocal, engine, Base
-from models import User, Cafe, Order, OrderFeedback, OrderItem, MenuItem
-from middleware import get_current_user, get_current_employee
+from database import SessionLocal, engine, async_engine
+from engine_factory import pool_stats
+from models import User, Cafe, Order, OrderFeedback, OrderItem, MenuItem, migrate_schema
+from middleware import get_current_principal, get_current_employee
+from token_claims import Principal, revocation_list
+from token_cache import token_cache
 from auth import verify_token
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
 
 app = FastAPI(title="Feedback Service", description="Order feedback and rating management service")
 
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -70,11 +86,21 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "feedback-management"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
 @app.post("/orders/{order_id}/feedback", response_model=FeedbackResponse)
 async def create_feedback(
     order_id: int,
     feedback_data: FeedbackCreate,
-    current_user: User = Depends(get_current_employee),
+    current_user: Principal = Depends(get_current_employee),
     db: Session = Depends(get_db)
 ):
     """Create feedback for an order (only employees can give feedback)."""
@@ -121,7 +147,7 @@ async def create_feedback(
 @app.get("/orders/{order_id}/feedback", response_model=Optional[FeedbackResponse])
 async def get_order_feedback(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get feedback for a specific order."""
@@ -153,7 +179,7 @@ async def get_order_feedback(
 @app.get("/cafes/{cafe_id}/feedbacks", response_model=List[FeedbackWithDetails])
 async def get_cafe_feedbacks(
     cafe_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get all feedbacks for a specific cafe."""
@@ -197,7 +223,7 @@ async def get_cafe_feedbacks(
 
 @app.get("/my-feedbacks", response_model=List[dict])
 async def get_my_feedbacks(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get all feedbacks - for employees: their own, for cafe owners: all feedbacks for their cafes."""
@@ -274,7 +300,7 @@ async def get_my_feedbacks(
 @app.get("/orders/{order_id}/can-feedback")
 async def can_give_feedback(
     order_id: int,
-    current_user: User = Depends(get_current_employee),
+    current_user: Principal = Depends(get_current_employee),
     db: Session = Depends(get_db)
 ):
     """Check if user can give feedback for an order."""
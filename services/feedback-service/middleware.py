@@ -1,37 +1,74 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models import User
 from auth import verify_token
+from principal_cache import principal_cache
+from token_claims import Principal, principal_from_claims, revocation_list
 
 # Security scheme
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user."""
-    token = credentials.credentials
-    
-    # Verify token
-    payload = verify_token(token)
-    
-    # Get user from database
+def verified_payload(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decode the bearer token and reject it if its user's tokens were revoked since."""
+    payload = verify_token(credentials.credentials)
+    if "uid" in payload and revocation_list.is_revoked(payload["uid"], payload.get("ver", 0)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+async def load_user(payload: dict, db: AsyncSession) -> User:
+    """Load the user a verified token was issued to."""
+    # Get user from the principal cache, falling back to the database
     username = payload.get("sub")
-    
-    user = db.query(User).filter(User.username == username).first()
+
+    cache_key = principal_cache.key_for(payload)
+    user = principal_cache.get(cache_key)
     if user is None:
+        user = await db.scalar(select(User).where(User.username == username).limit(1))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        # Detach so commits made later in this request don't expire the cached copy
+        db.expunge(user)
+        principal_cache.put(cache_key, user)
+
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Inactive user",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     return user
 
-async def get_current_cafe_owner(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user."""
+    return await load_user(verified_payload(credentials), db)
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Get the caller's id and role from the token; only tokens without role claims touch the users table."""
+    payload = verified_payload(credentials)
+    principal = principal_from_claims(payload)
+    if principal is None:
+        return Principal.from_user(await load_user(payload, db))
+    return principal
+
+async def get_current_cafe_owner(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Ensure current user is a cafe owner."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(
@@ -40,7 +77,7 @@ async def get_current_cafe_owner(current_user: User = Depends(get_current_user))
         )
     return current_user
 
-async def get_current_employee(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_employee(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Ensure current user is an employee."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(
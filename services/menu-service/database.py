@@ -1,18 +1,19 @@
 import os
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from engine_factory import create_service_engine, create_async_service_engine
 
 # Use SQLite for development/demo (in production, use PostgreSQL)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./microservices_menu-service.db")
 
-# Database configuration
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Database configuration; pool sizing and SQLite pragmas come from engine_factory
+engine = create_service_engine(DATABASE_URL, "menu-service")
+async_engine = create_async_service_engine(DATABASE_URL, "menu-service")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit, since async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -20,4 +21,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """AsyncSession for handlers that await their queries instead of blocking the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,19 +1,55 @@
 import os
 import uvicorn
 import requests
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-from database import get_db, engine
-from models import Base, User, Cafe, MenuItem, Category, UserType
-from middleware import get_current_user, get_current_cafe_owner
+from database import get_db, get_async_db, engine, async_engine, SessionLocal
+from engine_factory import pool_stats
+from models import User, Cafe, MenuItem, Category, UserType, RestockSchedule, migrate_schema
+from middleware import get_current_cafe_owner
+from token_claims import Principal, revocation_list
+from token_cache import token_cache
+from search import ensure_search_index, search_menu_items, search_facets
+from menu_import import parse_menu_import, import_menu_items, MenuImportError
+from restock import (
+    RestockScheduler, RESTOCK_SCHEDULER_ENABLED, RESTOCK_DEFAULT_TIMEZONE, parse_restock_time, resolve_timezone,
+    preview_restock, restock_cafe, notify_restocked, schedule_response, skip_elapsed_run
+)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
+ensure_search_index(engine)
 
 app = FastAPI(title="Menu Management Service", version="1.0.0")
 
+restock_scheduler = RestockScheduler(SessionLocal)
+
+@app.on_event("startup")
+async def start_restock_scheduler():
+    if RESTOCK_SCHEDULER_ENABLED:
+        restock_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_restock_scheduler():
+    restock_scheduler.stop()
+
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -57,6 +93,11 @@ class MenuItemUpdate(BaseModel):
     category_id: Optional[int] = None
     is_available: Optional[bool] = None
 
+class RestockScheduleUpdate(BaseModel):
+    restock_time: str  # local opening time, HH:MM
+    timezone: Optional[str] = None
+    is_enabled: bool = True
+
 class MenuItemResponse(BaseModel):
     id: int
     name: str
@@ -82,11 +123,21 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "menu-management"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
 # Category endpoints
 @app.post("/categories", response_model=CategoryResponse)
 async def create_category(
     category_data: CategoryCreate,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Create a new food category."""
@@ -110,9 +161,9 @@ async def create_category(
     return CategoryResponse.model_validate(db_category)
 
 @app.get("/categories", response_model=List[CategoryResponse])
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_async_db)):
     """Get all food categories."""
-    categories = db.query(Category).all()
+    categories = (await db.scalars(select(Category))).all()
     return [CategoryResponse.model_validate(category) for category in categories]
 
 # Menu item endpoints
@@ -120,7 +171,7 @@ async def get_categories(db: Session = Depends(get_db)):
 async def create_menu_item(
     cafe_id: int,
     item_data: MenuItemCreate,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Add a new menu item to a cafe."""
@@ -162,13 +213,15 @@ async def create_menu_item(
     
     return MenuItemResponse.model_validate(db_item)
 
-@app.get("/cafes/{cafe_id}/menu-items", response_model=List[MenuItemResponse])
-async def get_menu_items(
+@app.post("/cafes/{cafe_id}/menu-items/bulk")
+async def bulk_import_menu_items(
     cafe_id: int,
-    current_user: User = Depends(get_current_cafe_owner),
+    request: Request,
+    atomic: bool = Query(False, description="Write nothing if any row is invalid"),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
-    """Get all menu items for a cafe."""
+    """Create or update many menu items at once from a JSON list or CSV, matching items by name."""
     # Verify cafe ownership
     cafe = db.query(Cafe).filter(
         Cafe.id == cafe_id,
@@ -181,15 +234,48 @@ async def get_menu_items(
             detail="Cafe not found or access denied"
         )
     
+    try:
+        rows = parse_menu_import(await request.body(), request.headers.get("content-type"))
+    except MenuImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    report = import_menu_items(db, cafe_id, rows, atomic=atomic)
+    if not report["applied"]:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=report)
+    db.commit()
+    return report
+
+@app.get("/cafes/{cafe_id}/menu-items", response_model=List[MenuItemResponse])
+async def get_menu_items(
+    cafe_id: int,
+    current_user: Principal = Depends(get_current_cafe_owner),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all menu items for a cafe."""
+    # Verify cafe ownership
+    cafe_owned = await db.scalar(select(Cafe.id).where(
+        Cafe.id == cafe_id,
+        Cafe.owner_id == current_user.id
+    ))
+    
+    if not cafe_owned:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cafe not found or access denied"
+        )
+    
     # Get ALL menu items for cafe owners (including unavailable ones)
-    menu_items = db.query(MenuItem).filter(MenuItem.cafe_id == cafe_id).all()
+    menu_items = (await db.scalars(
+        select(MenuItem).options(joinedload(MenuItem.category)).where(MenuItem.cafe_id == cafe_id)
+    )).all()
     return [MenuItemResponse.model_validate(item) for item in menu_items]
 
 @app.put("/menu-items/{item_id}", response_model=MenuItemResponse)
 async def update_menu_item(
     item_id: int,
     item_data: MenuItemUpdate,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Update a menu item."""
@@ -217,7 +303,7 @@ async def update_menu_item(
 @app.delete("/menu-items/{item_id}")
 async def delete_menu_item(
     item_id: int,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Delete a menu item."""
@@ -256,10 +342,11 @@ async def filter_menu_items(
     min_price: Optional[float] = Query(None, description="Minimum price filter"),
     max_price: Optional[float] = Query(None, description="Maximum price filter"),
     available_only: bool = Query(True, description="Show only items currently in stock"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Advanced filtering for menu items with multiple criteria."""
-    query = db.query(MenuItem).join(Cafe).filter(Cafe.is_active == True)
+    # Categories are loaded with the items; an AsyncSession can't lazy-load them during validation
+    query = select(MenuItem).options(joinedload(MenuItem.category)).join(Cafe).filter(Cafe.is_active == True)
     
     if cafe_id:
         query = query.filter(MenuItem.cafe_id == cafe_id)
@@ -279,42 +366,38 @@ async def filter_menu_items(
             MenuItem.available_quantity > 0
         )
     
-    menu_items = query.all()
+    menu_items = (await db.scalars(query)).all()
     return [MenuItemResponse.model_validate(item) for item in menu_items]
 
 @app.get("/cafes/{cafe_id}/menu-items/public", response_model=List[MenuItemResponse])
 async def get_public_menu_items(
     cafe_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all available menu items for a cafe (public endpoint)."""
-    menu_items = db.query(MenuItem).join(Cafe).filter(
+    menu_items = (await db.scalars(select(MenuItem).options(joinedload(MenuItem.category)).join(Cafe).where(
         MenuItem.cafe_id == cafe_id,
         Cafe.is_active == True,
         MenuItem.is_available == True,
         MenuItem.available_quantity > 0
-    ).all()
+    ))).all()
     
     return [MenuItemResponse.model_validate(item) for item in menu_items]
 
 @app.get("/menu-items/search", response_model=List[dict])
-async def search_menu_items(
+async def search_menu_items_endpoint(
     query: str = Query(..., description="Search query for menu items"),
+    category_id: Optional[int] = Query(None, description="Filter by category"),
+    cafe_id: Optional[int] = Query(None, description="Filter by cafe"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of results"),
     db: Session = Depends(get_db)
 ):
-    """Search menu items by name or description."""
-    menu_items = db.query(MenuItem).join(Cafe).filter(
-        Cafe.is_active == True,
-        MenuItem.is_available == True,
-        MenuItem.available_quantity > 0,
-        (MenuItem.name.ilike(f"%{query}%") | MenuItem.description.ilike(f"%{query}%"))
-    ).all()
+    """Search menu items by name or description, best matches first."""
+    menu_items = search_menu_items(db, query, category_id=category_id, cafe_id=cafe_id, limit=limit)
     
     # Return menu items with cafe information
     results = []
     for item in menu_items:
-        cafe = db.query(Cafe).filter(Cafe.id == item.cafe_id).first()
-        category = db.query(Category).filter(Category.id == item.category_id).first()
         results.append({
             "id": item.id,
             "name": item.name,
@@ -324,12 +407,22 @@ async def search_menu_items(
             "preparation_time": item.preparation_time,
             "cafe_id": item.cafe_id,
             "category_id": item.category_id,
-            "cafe_name": cafe.name if cafe else "Unknown Cafe",
-            "category_name": category.name if category else "Unknown Category"
+            "cafe_name": item.cafe.name if item.cafe else "Unknown Cafe",
+            "category_name": item.category.name if item.category else "Unknown Category"
         })
     
     return results
 
+@app.get("/menu-items/search/facets")
+async def search_menu_item_facets(
+    query: str = Query(..., description="Search query for menu items"),
+    category_id: Optional[int] = Query(None, description="Filter by category"),
+    cafe_id: Optional[int] = Query(None, description="Filter by cafe"),
+    db: Session = Depends(get_db)
+):
+    """Number of matching menu items per cafe and per category."""
+    return search_facets(db, query, category_id=category_id, cafe_id=cafe_id)
+
 # Additional endpoints for cafe management
 @app.post("/menu-items")
 async def create_menu_item(
@@ -392,7 +485,7 @@ async def delete_menu_item(
 async def toggle_availability(
     menu_item_id: int,
     availability_data: dict,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Toggle menu item availability."""
@@ -419,7 +512,7 @@ async def toggle_availability(
 async def restock_item(
     menu_item_id: int,
     restock_data: dict,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Restock menu item and make it available."""
@@ -444,6 +537,85 @@ async def restock_item(
     
     return MenuItemResponse.model_validate(menu_item)
 
+def get_owned_cafe(cafe_id: int, current_user: User, db: Session) -> Cafe:
+    cafe = db.query(Cafe).filter(
+        Cafe.id == cafe_id,
+        Cafe.owner_id == current_user.id
+    ).first()
+    
+    if not cafe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cafe not found or access denied"
+        )
+    return cafe
+
+@app.post("/cafes/{cafe_id}/restock")
+async def restock_cafe_items(
+    cafe_id: int,
+    background_tasks: BackgroundTasks,
+    dry_run: bool = Query(False, description="Only list the items that would be restocked"),
+    current_user: Principal = Depends(get_current_cafe_owner),
+    db: Session = Depends(get_db)
+):
+    """Reset every available item of the cafe to its max daily quantity."""
+    cafe = get_owned_cafe(cafe_id, current_user, db)
+    
+    if dry_run:
+        items = preview_restock(db, cafe_id)
+        return {"cafe_id": cafe_id, "dry_run": True, "items_restocked": len(items), "items": items}
+    
+    count = restock_cafe(db, cafe_id)
+    db.commit()
+    if count:
+        background_tasks.add_task(notify_restocked, cafe_id, cafe.name, count)
+    return {"cafe_id": cafe_id, "dry_run": False, "items_restocked": count}
+
+@app.get("/cafes/{cafe_id}/restock-schedule")
+async def get_restock_schedule(
+    cafe_id: int,
+    current_user: Principal = Depends(get_current_cafe_owner),
+    db: Session = Depends(get_db)
+):
+    """Get the cafe's daily restock schedule."""
+    get_owned_cafe(cafe_id, current_user, db)
+    schedule = db.query(RestockSchedule).filter(RestockSchedule.cafe_id == cafe_id).first()
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No restock schedule for this cafe"
+        )
+    return schedule_response(schedule)
+
+@app.put("/cafes/{cafe_id}/restock-schedule")
+async def set_restock_schedule(
+    cafe_id: int,
+    schedule_data: RestockScheduleUpdate,
+    current_user: Principal = Depends(get_current_cafe_owner),
+    db: Session = Depends(get_db)
+):
+    """Restock the cafe automatically every day at a local time."""
+    get_owned_cafe(cafe_id, current_user, db)
+    timezone_name = schedule_data.timezone or RESTOCK_DEFAULT_TIMEZONE
+    try:
+        restock_time = parse_restock_time(schedule_data.restock_time)
+        resolve_timezone(timezone_name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    schedule = db.query(RestockSchedule).filter(RestockSchedule.cafe_id == cafe_id).first()
+    if not schedule:
+        schedule = RestockSchedule(cafe_id=cafe_id)
+        db.add(schedule)
+    schedule.restock_time = restock_time.strftime("%H:%M")
+    schedule.timezone = timezone_name
+    schedule.is_enabled = schedule_data.is_enabled
+    skip_elapsed_run(schedule)
+    db.commit()
+    db.refresh(schedule)
+    
+    return schedule_response(schedule)
+
 @app.post("/categories")
 async def create_category(
     category: CategoryCreate,
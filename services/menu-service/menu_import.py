@@ -0,0 +1,187 @@
+import io
+import os
+import csv
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import func, insert, or_, update
+from sqlalchemy.orm import Session
+from models import MenuItem, Category
+
+# Bulk menu import for cafe owners.
+#
+# A whole menu arrives in one request, as JSON or CSV, and is written in one
+# transaction: categories are resolved with one query, existing items are
+# matched by (cafe_id, name) with another, and the inserts and updates go out
+# as two executemany statements. Every row gets an entry in the report.
+MENU_IMPORT_MAX_ROWS = int(os.getenv("MENU_IMPORT_MAX_ROWS", "2000"))
+
+# Optional columns only overwrite an existing item when the row provides them
+OPTIONAL_FIELDS = ("description", "preparation_time", "is_available")
+
+class MenuImportError(ValueError):
+    """The payload as a whole can't be read; row-level problems go in the report instead."""
+
+class MenuItemImport(BaseModel):
+    name: str = Field(min_length=1)
+    description: Optional[str] = None
+    price: float = Field(ge=0)
+    max_daily_quantity: int = Field(ge=0)
+    preparation_time: int = Field(15, ge=0)
+    category_id: Optional[int] = None
+    category: Optional[str] = None  # category name, instead of category_id
+    is_available: Optional[bool] = None
+
+def parse_menu_import(body: bytes, content_type: Optional[str]) -> List[dict]:
+    """Rows from a JSON body (a list, or {"items": [...]}) or a CSV body with a header row."""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise MenuImportError("Body must be UTF-8")
+
+    if content_type and "csv" in content_type:
+        # Empty cells count as missing so defaults and existing values apply
+        rows = [{
+            key.strip(): value.strip() for key, value in row.items()
+            if key and value is not None and value.strip() != ""
+        } for row in csv.DictReader(io.StringIO(text))]
+    else:
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            raise MenuImportError("Body must be a JSON list of items or CSV with a header row")
+        rows = payload.get("items") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise MenuImportError("Expected a JSON list of item objects")
+
+    if not rows:
+        raise MenuImportError("No items to import")
+    if len(rows) > MENU_IMPORT_MAX_ROWS:
+        raise MenuImportError(f"At most {MENU_IMPORT_MAX_ROWS} items can be imported at once")
+    return rows
+
+def _row_result(index: int, name, status: str, item_id: Optional[int] = None, errors: Optional[List[str]] = None) -> dict:
+    result = {"row": index + 1, "name": name, "status": status, "id": item_id}
+    if errors:
+        result["errors"] = errors
+    return result
+
+def _validation_errors(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}" for detail in error.errors()]
+
+def _category_ids(db: Session, items: List[MenuItemImport]) -> Dict[object, int]:
+    """Map requested category ids and lower-cased names to category ids, in one query."""
+    ids = {item.category_id for item in items if item.category_id is not None}
+    names = {item.category.strip().lower() for item in items if item.category_id is None and item.category}
+    if not ids and not names:
+        return {}
+    categories = db.query(Category.id, Category.name).filter(
+        or_(Category.id.in_(ids), func.lower(Category.name).in_(names))
+    ).all()
+    resolved = {}
+    for category_id, name in categories:
+        resolved[category_id] = category_id
+        resolved[name.lower()] = category_id
+    return resolved
+
+def import_menu_items(db: Session, cafe_id: int, rows: List[dict], atomic: bool = False) -> dict:
+    """Create or update the cafe's menu items from `rows`, matching existing items by name.
+
+    Valid rows are written and invalid ones reported; with `atomic`, any
+    invalid row means nothing is written. The caller commits.
+    """
+    results: List[Optional[dict]] = [None] * len(rows)
+    candidates = []
+    for index, row in enumerate(rows):
+        try:
+            item = MenuItemImport.model_validate(row)
+        except ValidationError as e:
+            results[index] = _row_result(index, row.get("name"), "error", errors=_validation_errors(e))
+            continue
+        item.name = item.name.strip()
+        if item.category_id is None and not item.category:
+            results[index] = _row_result(index, item.name, "error", errors=["category_id or category is required"])
+            continue
+        candidates.append((index, item))
+
+    categories = _category_ids(db, [item for _, item in candidates])
+    existing = {}
+    names = {item.name for _, item in candidates}
+    if names:
+        for item_id, name in db.query(MenuItem.id, MenuItem.name).filter(
+            MenuItem.cafe_id == cafe_id,
+            MenuItem.name.in_(names)
+        ).order_by(MenuItem.id):
+            existing.setdefault(name, item_id)
+
+    now = datetime.utcnow()
+    creates, updates = [], []
+    seen = set()
+    for index, item in candidates:
+        category_key = item.category_id if item.category_id is not None else item.category.strip().lower()
+        category_id = categories.get(category_key)
+        if category_id is None:
+            requested = item.category_id if item.category_id is not None else item.category
+            results[index] = _row_result(index, item.name, "error", errors=[f"Unknown category '{requested}'"])
+            continue
+        if item.name in seen:
+            results[index] = _row_result(index, item.name, "error", errors=["Duplicate name in this import"])
+            continue
+        seen.add(item.name)
+
+        values = {
+            "name": item.name,
+            "price": item.price,
+            "max_daily_quantity": item.max_daily_quantity,
+            "available_quantity": item.max_daily_quantity,  # Reset available quantity, as single-item updates do
+            "category_id": category_id,
+            "updated_at": now
+        }
+        item_id = existing.get(item.name)
+        if item_id is not None:
+            for field in OPTIONAL_FIELDS:
+                if field in item.model_fields_set and getattr(item, field) is not None:
+                    values[field] = getattr(item, field)
+            updates.append({"id": item_id, **values})
+            results[index] = _row_result(index, item.name, "updated", item_id)
+        else:
+            values.update(
+                description=item.description,
+                preparation_time=item.preparation_time,
+                is_available=True if item.is_available is None else item.is_available,
+                cafe_id=cafe_id,
+                created_at=now
+            )
+            creates.append((index, values))
+            results[index] = _row_result(index, item.name, "created")
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    applied = not (atomic and failed)
+    if applied:
+        if updates:
+            # Bulk UPDATE by primary key: one executemany
+            db.execute(update(MenuItem), updates)
+        if creates:
+            # Names are unique within the import, so RETURNING rows are matched by name;
+            # asking for parameter order instead makes SQLite insert one row at a time
+            new_ids = dict((name, item_id) for item_id, name in db.execute(
+                insert(MenuItem).returning(MenuItem.id, MenuItem.name),
+                [values for _, values in creates]
+            ))
+            for index, values in creates:
+                results[index]["id"] = new_ids.get(values["name"])
+    else:
+        for result in results:
+            if result["status"] != "error":
+                result["status"] = "skipped"
+
+    return {
+        "cafe_id": cafe_id,
+        "applied": applied,
+        "total": len(rows),
+        "created": len(creates) if applied else 0,
+        "updated": len(updates) if applied else 0,
+        "failed": failed,
+        "results": results
+    }
@@ -0,0 +1,198 @@
+import os
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import requests
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session, sessionmaker
+from models import Cafe, MenuItem, RestockSchedule
+
+# Scheduled daily restock.
+#
+# A cafe with a restock schedule gets every available item reset to its
+# max_daily_quantity once a day at the cafe's local opening time, with one
+# UPDATE for the whole cafe and one menu_update notification. Items an owner
+# has made unavailable keep their stock. A cafe-day is claimed by moving
+# last_restocked_on forward in the same transaction as the restock, so
+# several workers never restock a cafe twice.
+RESTOCK_SCHEDULER_ENABLED = os.getenv("RESTOCK_SCHEDULER_ENABLED", "true").lower() == "true"
+RESTOCK_CHECK_SECONDS = float(os.getenv("RESTOCK_CHECK_SECONDS", "60"))
+RESTOCK_DEFAULT_TIMEZONE = os.getenv("RESTOCK_DEFAULT_TIMEZONE", "UTC")
+NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification-service:5007")
+
+REQUEST_TIMEOUT_SECONDS = 5
+
+def parse_restock_time(value: str) -> time:
+    """'HH:MM' (24-hour) to a time; raises ValueError otherwise."""
+    try:
+        return datetime.strptime(value.strip(), "%H:%M").time()
+    except (AttributeError, ValueError):
+        raise ValueError("restock_time must be HH:MM (24-hour)")
+
+def resolve_timezone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone '{name}'")
+
+def _needs_restock(cafe_id: int):
+    return (
+        MenuItem.cafe_id == cafe_id,
+        MenuItem.is_available == True,
+        MenuItem.available_quantity != MenuItem.max_daily_quantity
+    )
+
+def preview_restock(db: Session, cafe_id: int) -> List[dict]:
+    """The items a restock of the cafe would change, without changing them."""
+    items = db.query(
+        MenuItem.id, MenuItem.name, MenuItem.available_quantity, MenuItem.max_daily_quantity
+    ).filter(*_needs_restock(cafe_id)).order_by(MenuItem.id).all()
+    return [{
+        "id": item_id,
+        "name": name,
+        "available_quantity": available,
+        "restocked_quantity": maximum
+    } for item_id, name, available, maximum in items]
+
+def restock_cafe(db: Session, cafe_id: int) -> int:
+    """Reset every available item of the cafe to max_daily_quantity; returns the items changed. The caller commits."""
+    result = db.execute(
+        update(MenuItem)
+        .where(*_needs_restock(cafe_id))
+        .values(available_quantity=MenuItem.max_daily_quantity, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def due_day(schedule: RestockSchedule, now: datetime) -> Optional[date]:
+    """The cafe's local date if its restock for that date is due at `now` (aware), else None."""
+    local = now.astimezone(resolve_timezone(schedule.timezone))
+    if local.time() < parse_restock_time(schedule.restock_time):
+        return None
+    if schedule.last_restocked_on is not None and schedule.last_restocked_on >= local.date():
+        return None
+    return local.date()
+
+def next_run_at(schedule: RestockSchedule, now: Optional[datetime] = None) -> Optional[datetime]:
+    """When the scheduler will next restock the cafe (UTC), or None if the schedule is disabled."""
+    if not schedule.is_enabled:
+        return None
+    now = now or datetime.now(timezone.utc)
+    zone = resolve_timezone(schedule.timezone)
+    local_day = now.astimezone(zone).date()
+    if schedule.last_restocked_on is not None and schedule.last_restocked_on >= local_day:
+        local_day += timedelta(days=1)
+    run_at = datetime.combine(local_day, parse_restock_time(schedule.restock_time), tzinfo=zone)
+    # Overdue runs happen on the scheduler's next check
+    return max(run_at, now).astimezone(timezone.utc)
+
+def skip_elapsed_run(schedule: RestockSchedule, now: Optional[datetime] = None):
+    """Start a new or changed schedule from its next run instead of restocking for a time already past today."""
+    day = due_day(schedule, now or datetime.now(timezone.utc))
+    if day is not None:
+        schedule.last_restocked_on = day
+
+def schedule_response(schedule: RestockSchedule) -> dict:
+    return {
+        "cafe_id": schedule.cafe_id,
+        "restock_time": schedule.restock_time,
+        "timezone": schedule.timezone,
+        "is_enabled": schedule.is_enabled,
+        "last_restocked_on": schedule.last_restocked_on,
+        "next_run_at": next_run_at(schedule)
+    }
+
+def notify_restocked(cafe_id: int, cafe_name: Optional[str], items_restocked: int):
+    """Tell employees once that the cafe's menu was restocked; failures are only logged."""
+    try:
+        requests.post(
+            f"{NOTIFICATION_SERVICE_URL.rstrip('/')}/notify/menu-update",
+            json={
+                "cafe_id": cafe_id,
+                "cafe_name": cafe_name,
+                "change_type": "restocked",
+                "items_restocked": items_restocked
+            },
+            timeout=REQUEST_TIMEOUT_SECONDS
+        ).raise_for_status()
+    except Exception as e:
+        print(f"Restock notification for cafe {cafe_id} failed: {e}")
+
+class RestockScheduler:
+    """Background thread that runs due cafe restocks every `interval` seconds."""
+
+    def __init__(self, session_factory: sessionmaker, interval: float = RESTOCK_CHECK_SECONDS, notify=notify_restocked):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.notify = notify
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="restock-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=REQUEST_TIMEOUT_SECONDS + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Restock scheduler failed: {e}")
+            self._stop.wait(self.interval)
+
+    def run_once(self, now: Optional[datetime] = None) -> List[Tuple[int, int]]:
+        """Restock every cafe that is due; returns (cafe_id, items restocked) for each."""
+        now = now or datetime.now(timezone.utc)
+        restocked = []
+        db = self.session_factory()
+        try:
+            schedules = db.query(RestockSchedule.cafe_id, RestockSchedule.restock_time,
+                                 RestockSchedule.timezone, RestockSchedule.last_restocked_on).join(
+                Cafe, Cafe.id == RestockSchedule.cafe_id
+            ).filter(
+                RestockSchedule.is_enabled == True,
+                Cafe.is_active == True
+            ).all()
+            for schedule in schedules:
+                try:
+                    day = due_day(schedule, now)
+                except ValueError as e:
+                    print(f"Skipping restock schedule of cafe {schedule.cafe_id}: {e}")
+                    continue
+                if day is None:
+                    continue
+                # Claim the cafe-day; a worker that lost the race sees no row to update
+                claimed = db.execute(
+                    update(RestockSchedule)
+                    .where(
+                        RestockSchedule.cafe_id == schedule.cafe_id,
+                        or_(RestockSchedule.last_restocked_on == None, RestockSchedule.last_restocked_on < day)
+                    )
+                    .values(last_restocked_on=day)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not claimed:
+                    db.rollback()
+                    continue
+                count = restock_cafe(db, schedule.cafe_id)
+                db.commit()
+                restocked.append((schedule.cafe_id, count))
+
+            names = dict(db.query(Cafe.id, Cafe.name).filter(
+                Cafe.id.in_([cafe_id for cafe_id, _ in restocked])
+            ).all()) if restocked else {}
+        finally:
+            db.close()
+
+        for cafe_id, count in restocked:
+            self.notify(cafe_id, names.get(cafe_id), count)
+        return restocked
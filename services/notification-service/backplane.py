@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+# Pub/sub backplane between notification-service workers.
+#
+# A /notify/* request only reaches the worker that received it, while the
+# sockets it targets may be attached to any worker. Publishing goes through
+# the backplane, which hands every message to the local fan-out hub of each
+# worker. It also records which Idempotency-Key values have been handled, so
+# an event redelivered to a different worker is still recognised.
+
+Deliver = Callable[[str, List[str]], int]
+
+class Backplane(ABC):
+    """Interface for notification backplanes."""
+
+    @abstractmethod
+    async def start(self, deliver: Deliver):
+        """Begin handing messages published on any worker to `deliver(message, topics)`."""
+
+    @abstractmethod
+    async def publish(self, message: str, topics: Iterable[str]) -> int:
+        """Publish to every worker; returns the recipients on this worker."""
+
+    @abstractmethod
+    async def claim_event(self, key: str) -> bool:
+        """Record `key` as handled; True only the first time any worker claims it."""
+
+    async def stop(self):
+        pass
+
+class RecentKeys:
+    """Bounded memory of keys already handled in this process."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._keys = OrderedDict()
+
+    def seen(self, key: str) -> bool:
+        """Return True if `key` was handled before, otherwise remember it."""
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        self._keys[key] = None
+        if len(self._keys) > self.max_size:
+            self._keys.popitem(last=False)
+        return False
+
+class InProcessBackplane(Backplane):
+    """Single worker: messages go straight to the local hub."""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+        self._handled = RecentKeys()
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def publish(self, message: str, topics: Iterable[str]) -> int:
+        return self._deliver(message, list(topics))
+
+    async def claim_event(self, key: str) -> bool:
+        return not self._handled.seen(key)
+
+class SQLiteBackplane(Backplane):
+    """Workers on one host share a SQLite event table that each of them polls.
+
+    A message is delivered to the publishing worker's sockets immediately and
+    appended to the table; the other workers pick it up on their next poll.
+    Rows older than `retention_seconds` are pruned. Handled idempotency keys
+    go in a second table keyed by the key, kept for `dedupe_retention_seconds`
+    so they outlast the outbox's retries.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.05, retention_seconds: float = 60,
+                 dedupe_retention_seconds: float = 86400):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.dedupe_retention_seconds = dedupe_retention_seconds
+        self.origin = uuid.uuid4().hex
+        self._deliver: Optional[Deliver] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._poller: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+        self._last_id = await asyncio.to_thread(self._open)
+        self._poller = asyncio.create_task(self._poll())
+
+    async def publish(self, message: str, topics: Iterable[str]) -> int:
+        topics = list(topics)
+        await asyncio.to_thread(self._execute,
+            "INSERT INTO notification_events (origin, topics, message, created_at) VALUES (?, ?, ?, ?)",
+            (self.origin, json.dumps(topics), message, time.time())
+        )
+        return self._deliver(message, topics)
+
+    async def claim_event(self, key: str) -> bool:
+        return await asyncio.to_thread(self._insert_key, key)
+
+    def _insert_key(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO handled_events (key, created_at) VALUES (?, ?)", (key, time.time())
+            )
+            return cursor.rowcount == 1
+
+    async def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _open(self) -> int:
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._execute("PRAGMA journal_mode=WAL")
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS notification_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, topics TEXT NOT NULL, "
+            "message TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._execute("CREATE TABLE IF NOT EXISTS handled_events (key TEXT PRIMARY KEY, created_at REAL NOT NULL)")
+        self._execute("CREATE INDEX IF NOT EXISTS ix_handled_events_created_at ON handled_events (created_at)")
+        # Only deliver what is published from now on
+        return self._execute("SELECT COALESCE(MAX(id), 0) FROM notification_events")[0][0]
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def _poll(self):
+        last_prune = time.monotonic()
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._execute,
+                    "SELECT id, origin, topics, message FROM notification_events WHERE id > ? ORDER BY id",
+                    (self._last_id,)
+                )
+                for event_id, origin, topics, message in rows:
+                    self._last_id = event_id
+                    if origin != self.origin:
+                        self._deliver(message, json.loads(topics))
+
+                if time.monotonic() - last_prune > self.retention_seconds:
+                    last_prune = time.monotonic()
+                    await asyncio.to_thread(self._execute,
+                        "DELETE FROM notification_events WHERE created_at < ?",
+                        (time.time() - self.retention_seconds,)
+                    )
+                    await asyncio.to_thread(self._execute,
+                        "DELETE FROM handled_events WHERE created_at < ?",
+                        (time.time() - self.dedupe_retention_seconds,)
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Notification backplane poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+def create_backplane() -> Backplane:
+    """Build the backplane selected by the NOTIFY_BACKPLANE environment variable."""
+    backplane_name = os.getenv("NOTIFY_BACKPLANE", "memory")
+    if backplane_name == "memory":
+        return InProcessBackplane()
+    if backplane_name == "sqlite":
+        return SQLiteBackplane(
+            path=os.getenv("NOTIFY_BACKPLANE_PATH", "./notification_backplane.db"),
+            poll_interval=int(os.getenv("NOTIFY_BACKPLANE_POLL_MS", "50")) / 1000,
+            dedupe_retention_seconds=float(os.getenv("NOTIFY_DEDUPE_RETENTION_SECONDS", "86400"))
+        )
+    raise ValueError(f"Unknown notification backplane '{backplane_name}'")
@@ -0,0 +1,152 @@
+import os
+import asyncio
+from typing import Dict, Iterable, Optional, Set
+from fastapi import WebSocket
+
+# Topic-based WebSocket fan-out.
+#
+# Every connection subscribes to a set of topics ("user_type:EMPLOYEE",
+# "cafe:3", "customer:42", ...) and owns a bounded send queue drained by its
+# own task. Publishing only enqueues, so one slow client cannot hold up the
+# others; a client whose queue fills up or whose send times out is evicted.
+SEND_QUEUE_SIZE = int(os.getenv("NOTIFY_SEND_QUEUE_SIZE", "256"))
+SEND_TIMEOUT_SECONDS = float(os.getenv("NOTIFY_SEND_TIMEOUT_SECONDS", "5"))
+
+# Close code sent to evicted slow consumers ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+def user_type_topic(user_type: str) -> str:
+    return f"user_type:{user_type}"
+
+def cafe_topic(cafe_id: int) -> str:
+    return f"cafe:{cafe_id}"
+
+def customer_topic(customer_id: int) -> str:
+    return f"customer:{customer_id}"
+
+TOPIC_PREFIXES = ("user_type:", "cafe:", "customer:")
+
+def is_valid_topic(topic: str) -> bool:
+    return any(topic.startswith(prefix) and len(topic) > len(prefix) for prefix in TOPIC_PREFIXES)
+
+class Subscriber:
+    """One WebSocket connection with its topics and send queue."""
+
+    def __init__(self, websocket: WebSocket, user_type: str, queue_size: int):
+        self.websocket = websocket
+        self.user_type = user_type
+        self.topics: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+
+class FanoutHub:
+    """Routes published messages to the subscribers of their topics."""
+
+    def __init__(self, queue_size: int = SEND_QUEUE_SIZE, send_timeout: float = SEND_TIMEOUT_SECONDS):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.subscribers: Set[Subscriber] = set()
+        self.topics: Dict[str, Set[Subscriber]] = {}
+        self.evicted = 0
+
+    async def connect(self, websocket: WebSocket, user_type: str, topics: Iterable[str] = ()) -> Subscriber:
+        """Accept the socket, subscribe it to its user type plus `topics` and start its writer."""
+        await websocket.accept()
+        subscriber = Subscriber(websocket, user_type, self.queue_size)
+        self.subscribers.add(subscriber)
+        self.subscribe(subscriber, [user_type_topic(user_type), *topics])
+        subscriber.writer = asyncio.create_task(self._drain(subscriber))
+        return subscriber
+
+    def subscribe(self, subscriber: Subscriber, topics: Iterable[str]):
+        for topic in topics:
+            subscriber.topics.add(topic)
+            self.topics.setdefault(topic, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber, topics: Iterable[str]):
+        for topic in topics:
+            subscriber.topics.discard(topic)
+            members = self.topics.get(topic)
+            if members is not None:
+                members.discard(subscriber)
+                if not members:
+                    del self.topics[topic]
+
+    def disconnect(self, subscriber: Subscriber):
+        """Forget a subscriber and stop its writer; safe to call more than once."""
+        if subscriber.closed:
+            return
+        subscriber.closed = True
+        self.subscribers.discard(subscriber)
+        self.unsubscribe(subscriber, list(subscriber.topics))
+        if subscriber.writer is not None and subscriber.writer is not asyncio.current_task():
+            subscriber.writer.cancel()
+
+    def publish(self, message: str, topics: Iterable[str]) -> int:
+        """Queue `message` for every subscriber of any of `topics`; returns the recipient count.
+
+        Never waits on a socket. Subscribers whose queue is full are evicted.
+        """
+        recipients = set()
+        for topic in topics:
+            recipients.update(self.topics.get(topic, ()))
+
+        delivered = 0
+        for subscriber in recipients:
+            try:
+                subscriber.queue.put_nowait(message)
+                delivered += 1
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+        return delivered
+
+    def publish_to(self, subscriber: Subscriber, message: str) -> bool:
+        """Queue a direct reply; replies share the queue so only the writer touches the socket."""
+        if subscriber.closed:
+            return False
+        try:
+            subscriber.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self._evict(subscriber)
+            return False
+
+    def count(self, topic: str) -> int:
+        return len(self.topics.get(topic, ()))
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.subscribers),
+            "topics": len(self.topics),
+            "queued_messages": sum(subscriber.queue.qsize() for subscriber in self.subscribers),
+            "evicted_slow_consumers": self.evicted
+        }
+
+    def _evict(self, subscriber: Subscriber):
+        self.evicted += 1
+        self.disconnect(subscriber)
+        asyncio.create_task(self._close(subscriber.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), self.send_timeout)
+        except Exception:
+            pass
+
+    async def _drain(self, subscriber: Subscriber):
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                try:
+                    async with asyncio.timeout(self.send_timeout):
+                        await subscriber.websocket.send_text(message)
+                except TimeoutError:
+                    self._evict(subscriber)
+                    return
+                except Exception:
+                    # Socket already gone; the receive loop will notice as well
+                    self.disconnect(subscriber)
+                    return
+        except asyncio.CancelledError:
+            pass
@@ -1,17 +1,22 @@
 import os
 import uvicorn
 import json
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from typing import Dict, List
-from database import get_db, engine
-from models import Base, User, UserType
+from typing import Dict, List, Optional
+from database import get_db, engine, async_engine, SessionLocal
+from engine_factory import pool_stats
+from models import User, UserType, migrate_schema
 from middleware import get_current_user
+from token_claims import revocation_list
+from token_cache import token_cache
 from datetime import datetime
+from fanout import FanoutHub, user_type_topic, cafe_topic, customer_topic, is_valid_topic
+from backplane import Backplane, create_backplane
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
 
 app = FastAPI(title="Notification Service", version="1.0.0")
 
@@ -24,47 +29,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {
-            "CAFE_OWNER": [],
-            "EMPLOYEE": []
-        }
+USER_TYPES = ["CAFE_OWNER", "EMPLOYEE"]
+
+class ConnectionManager(FanoutHub):
+    """Fan-out hub plus the notification message formats.
+
+    Broadcasts go through the backplane so they reach the sockets of every
+    worker; the returned recipient counts cover this worker only.
+    """
 
-    async def connect(self, websocket: WebSocket, user_type: str):
-        await websocket.accept()
-        if user_type in self.active_connections:
-            self.active_connections[user_type].append(websocket)
-        print(f"User type {user_type} connected. Total connections: {len(self.active_connections[user_type])}")
+    def __init__(self, backplane: Backplane):
+        super().__init__()
+        self.backplane = backplane
 
-    def disconnect(self, websocket: WebSocket, user_type: str):
-        if user_type in self.active_connections and websocket in self.active_connections[user_type]:
-            self.active_connections[user_type].remove(websocket)
-        print(f"User type {user_type} disconnected. Total connections: {len(self.active_connections[user_type])}")
+    async def broadcast(self, message: str, topics: List[str]) -> int:
+        return await self.backplane.publish(message, topics)
 
-    async def send_to_user_type(self, message: str, user_type: str):
+    async def send_to_user_type(self, message: str, user_type: str) -> int:
         """Send message to all users of a specific type."""
-        if user_type not in self.active_connections:
-            return
-        
-        disconnected = []
-        for connection in self.active_connections[user_type]:
-            try:
-                await connection.send_text(message)
-            except:
-                disconnected.append(connection)
-        
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.active_connections[user_type].remove(connection)
+        return await self.broadcast(message, [user_type_topic(user_type)])
 
-    async def send_to_all(self, message: str):
+    async def send_to_all(self, message: str) -> int:
         """Send message to all connected users."""
-        for user_type in self.active_connections:
-            await self.send_to_user_type(message, user_type)
+        return await self.broadcast(message, [user_type_topic(user_type) for user_type in USER_TYPES])
 
-    async def broadcast_order_update(self, order_data: dict, target_user_type: str = None):
-        """Broadcast order updates to relevant users."""
+    async def broadcast_order_update(self, order_data: dict, topics: Optional[List[str]] = None) -> int:
+        """Send an order update to the given topics, or to everyone when none are given."""
         message = {
             "type": "order_update",
             "data": order_data,
@@ -73,13 +63,11 @@ class ConnectionManager:
         
         message_str = json.dumps(message)
         
-        if target_user_type:
-            await self.send_to_user_type(message_str, target_user_type)
-        else:
-            # Send to both cafe owners and employees
-            await self.send_to_all(message_str)
+        if topics:
+            return await self.broadcast(message_str, topics)
+        return await self.send_to_all(message_str)
 
-    async def broadcast_menu_update(self, menu_data: dict):
+    async def broadcast_menu_update(self, menu_data: dict) -> int:
         """Broadcast menu updates to employees."""
         message = {
             "type": "menu_update",
@@ -87,9 +75,37 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        await self.send_to_user_type(json.dumps(message), "EMPLOYEE")
+        return await self.send_to_user_type(json.dumps(message), "EMPLOYEE")
+
+manager = ConnectionManager(create_backplane())
+
+async def already_handled(idempotency_key: Optional[str]) -> bool:
+    """Whether any worker has handled this event before; events without a key are never duplicates."""
+    return bool(idempotency_key) and not await manager.backplane.claim_event(idempotency_key)
+
+def duplicate_response(idempotency_key: str) -> dict:
+    return {"success": True, "duplicate": True, "event_id": idempotency_key, "recipients": 0}
+
+@app.on_event("startup")
+async def start_backplane():
+    await manager.backplane.start(manager.publish)
 
-manager = ConnectionManager()
+@app.on_event("shutdown")
+async def stop_backplane():
+    await manager.backplane.stop()
+
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
 
 @app.get("/")
 async def root():
@@ -99,17 +115,39 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "notification"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
 @app.websocket("/ws/{user_type}")
-async def websocket_endpoint(websocket: WebSocket, user_type: str):
-    """WebSocket endpoint for real-time notifications."""
+async def websocket_endpoint(
+    websocket: WebSocket,
+    user_type: str,
+    cafe_id: List[int] = Query([]),
+    customer_id: Optional[int] = Query(None)
+):
+    """WebSocket endpoint for real-time notifications.
+
+    Cafe owners pass `cafe_id` (repeatable) and employees `customer_id` to
+    receive the notifications for those cafes/customers. Clients can also send
+    {"action": "subscribe" | "unsubscribe", "topics": ["cafe:1", ...]}.
+    """
     
     # Validate user type
-    valid_types = ["CAFE_OWNER", "EMPLOYEE"]
-    if user_type not in valid_types:
+    if user_type not in USER_TYPES:
         await websocket.close(code=1008)  # Policy violation
         return
     
-    await manager.connect(websocket, user_type)
+    topics = [cafe_topic(id) for id in cafe_id]
+    if customer_id is not None:
+        topics.append(customer_topic(customer_id))
+    subscriber = await manager.connect(websocket, user_type, topics)
     
     try:
         while True:
@@ -118,16 +156,29 @@ async def websocket_endpoint(websocket: WebSocket, user_type: str):
             
             # Handle ping/pong for connection health
             if data == "ping":
-                await websocket.send_text("pong")
+                manager.publish_to(subscriber, "pong")
+                continue
+            
+            try:
+                request = json.loads(data)
+            except ValueError:
+                request = None
+            if isinstance(request, dict) and request.get("action") in ("subscribe", "unsubscribe"):
+                requested = [topic for topic in request.get("topics", []) if isinstance(topic, str) and is_valid_topic(topic)]
+                if request["action"] == "subscribe":
+                    manager.subscribe(subscriber, requested)
+                else:
+                    manager.unsubscribe(subscriber, requested)
+                manager.publish_to(subscriber, json.dumps({"type": "subscriptions", "topics": sorted(subscriber.topics)}))
             else:
                 # Echo message back (for testing)
-                await websocket.send_text(f"Received: {data}")
+                manager.publish_to(subscriber, f"Received: {data}")
                 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, user_type)
+        manager.disconnect(subscriber)
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.disconnect(websocket, user_type)
+        manager.disconnect(subscriber)
 
 @app.post("/notify/order-status")
 async def notify_order_status(
@@ -135,9 +186,13 @@ async def notify_order_status(
     status: str,
     customer_id: int,
     cafe_owner_id: int,
-    order_details: dict = None
+    cafe_id: Optional[int] = None,
+    order_details: dict = None,
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Send order status notification to relevant users."""
+    if await already_handled(idempotency_key):
+        return duplicate_response(idempotency_key)
     
     # Prepare notification data
     notification_data = {
@@ -145,24 +200,30 @@ async def notify_order_status(
         "status": status,
         "customer_id": customer_id,
         "cafe_owner_id": cafe_owner_id,
+        "cafe_id": cafe_id,
         "details": order_details or {},
+        "event_id": idempotency_key,
         "message": f"Order #{order_id} status updated to {status}"
     }
     
-    # Send to both cafe owners and employees
-    await manager.broadcast_order_update(notification_data)
+    # Send to the customer and to the owners watching the cafe (all owners if the cafe is unknown)
+    topics = [customer_topic(customer_id), cafe_topic(cafe_id) if cafe_id else user_type_topic("CAFE_OWNER")]
+    recipients = await manager.broadcast_order_update(notification_data, topics)
     
     return {
         "success": True,
         "message": "Order status notification sent",
-        "recipients": ["CAFE_OWNER", "EMPLOYEE"]
+        "recipients": recipients
     }
 
 @app.post("/notify/new-order")
 async def notify_new_order(
-    order_data: dict
+    order_data: dict,
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Notify cafe owners about new orders."""
+    if await already_handled(idempotency_key):
+        return duplicate_response(idempotency_key)
     
     notification_data = {
         "type": "new_order",
@@ -171,15 +232,19 @@ async def notify_new_order(
         "customer_name": order_data.get("customer_name"),
         "total_amount": order_data.get("total_amount"),
         "cafe_id": order_data.get("cafe_id"),
+        "event_id": idempotency_key,
         "message": f"New order #{order_data.get('order_number')} received"
     }
     
-    # Send only to cafe owners
-    await manager.broadcast_order_update(notification_data, "CAFE_OWNER")
+    # Send only to the owners watching the cafe (all cafe owners if the cafe is unknown)
+    cafe_id = order_data.get("cafe_id")
+    topics = [cafe_topic(cafe_id) if cafe_id else user_type_topic("CAFE_OWNER")]
+    recipients = await manager.broadcast_order_update(notification_data, topics)
     
     return {
         "success": True,
-        "message": "New order notification sent to cafe owners"
+        "message": "New order notification sent to cafe owners",
+        "recipients": recipients
     }
 
 @app.post("/notify/menu-update")
@@ -193,17 +258,23 @@ async def notify_menu_update(
         "item_id": menu_item_data.get("item_id"),
         "item_name": menu_item_data.get("item_name"),
         "cafe_id": menu_item_data.get("cafe_id"),
-        "change_type": menu_item_data.get("change_type"),  # 'added', 'updated', 'removed', 'stock_changed'
+        "change_type": menu_item_data.get("change_type"),  # 'added', 'updated', 'removed', 'stock_changed', 'restocked'
         "available_quantity": menu_item_data.get("available_quantity"),
         "message": f"Menu item '{menu_item_data.get('item_name')}' has been updated"
     }
+    if notification_data["change_type"] == "restocked":
+        # One notification per cafe restock instead of one per item
+        notification_data["cafe_name"] = menu_item_data.get("cafe_name")
+        notification_data["items_restocked"] = menu_item_data.get("items_restocked")
+        notification_data["message"] = f"{menu_item_data.get('cafe_name') or 'A cafe'} has restocked its menu"
     
     # Send only to employees
-    await manager.broadcast_menu_update(notification_data)
+    recipients = await manager.broadcast_menu_update(notification_data)
     
     return {
         "success": True,
-        "message": "Menu update notification sent to employees"
+        "message": "Menu update notification sent to employees",
+        "recipients": recipients
     }
 
 @app.post("/notify/payment-status")
@@ -221,23 +292,32 @@ async def notify_payment_status(
         "message": f"Payment {payment_data.get('status')} for ${payment_data.get('amount', 0):.2f}"
     }
     
-    # Send to all users
-    await manager.broadcast_order_update(notification_data)
+    # Send to the paying customer, or to all users if the customer is unknown
+    customer_id = payment_data.get("customer_id")
+    recipients = await manager.broadcast_order_update(
+        notification_data, [customer_topic(customer_id)] if customer_id else None
+    )
     
     return {
         "success": True,
-        "message": "Payment status notification sent"
+        "message": "Payment status notification sent",
+        "recipients": recipients
     }
 
 @app.get("/connections/status")
 async def get_connection_status():
     """Get current WebSocket connection status."""
+    stats = manager.stats()
     return {
         "active_connections": {
-            user_type: len(connections) 
-            for user_type, connections in manager.active_connections.items()
+            user_type: manager.count(user_type_topic(user_type))
+            for user_type in USER_TYPES
         },
-        "total_connections": sum(len(connections) for connections in manager.active_connections.values()),
+        "total_connections": stats["connections"],
+        "topics": stats["topics"],
+        "queued_messages": stats["queued_messages"],
+        "evicted_slow_consumers": stats["evicted_slow_consumers"],
+        "worker_pid": os.getpid(),
         "service_status": "healthy"
     }
 
@@ -248,7 +328,7 @@ async def send_test_notification(
 ):
     """Send a test notification to specific user type."""
     
-    if user_type not in ["CAFE_OWNER", "EMPLOYEE"]:
+    if user_type not in USER_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Invalid user type"
@@ -260,12 +340,12 @@ async def send_test_notification(
         "timestamp": datetime.now().isoformat()
     }
     
-    await manager.send_to_user_type(json.dumps(test_data), user_type)
+    recipients = await manager.send_to_user_type(json.dumps(test_data), user_type)
     
     return {
         "success": True,
         "message": f"Test notification sent to {user_type}",
-        "recipients": len(manager.active_connections.get(user_type, []))
+        "recipients": recipients
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Cache of verified tokens so auth.verify_token does not repeat the signature
+# check and JSON decoding for a token it has already accepted. Entries never
+# outlive the token's own `exp`. This is kept apart from principal_cache: a
+# cached token only vouches for the signature and claims, while the user
+# behind it is still looked up (and invalidated) through the principal cache
+# and the revocation list.
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of decoded claims keyed by the SHA-256 digest of the token."""
+
+    def __init__(self, ttl_seconds: float = TOKEN_CACHE_TTL_SECONDS, max_size: int = TOKEN_CACHE_MAX_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return a copy of the cached claims for `token`, or None if missing or expired."""
+        if self.ttl_seconds <= 0:
+            return None
+        key = self.key_for(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, token: str, payload: dict):
+        """Cache the claims of a token that has just been verified."""
+        if self.ttl_seconds <= 0:
+            return
+        ttl = self.ttl_seconds
+        if "exp" in payload:
+            ttl = min(ttl, float(payload["exp"]) - time.time())
+            if ttl <= 0:
+                return
+        key = self.key_for(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
+
+token_cache = VerifiedTokenCache()
@@ -0,0 +1,117 @@
+import os
+import json
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from models import Order, OrderItem, OrderStatus, OutboxEvent
+
+# Kitchen display stream for cafe owners.
+#
+# Every order change already writes an outbox event, and the outbox id grows
+# across all services, so it doubles as the stream's sequence number. A client
+# gets a snapshot of open orders tagged with the current sequence, then only
+# the events after it; on reconnect it sends the last sequence it saw
+# (Last-Event-ID) and resumes from there.
+#
+# Ids are allocated before commit, so with concurrent writers (several
+# services, or Postgres) event N can become visible after N+1 was read.
+# Each poll therefore re-reads KITCHEN_STREAM_OVERLAP ids behind the cursor
+# and skips the ones this connection already sent, as the rollups do with
+# their watermark. A resumed connection has no record of what was sent, so
+# it may repeat events from that window; deltas carry the order's absolute
+# status rather than a transition, so applying one twice is harmless.
+KITCHEN_STREAM_POLL_SECONDS = float(os.getenv("KITCHEN_STREAM_POLL_SECONDS", "1"))
+KITCHEN_STREAM_HEARTBEAT_SECONDS = float(os.getenv("KITCHEN_STREAM_HEARTBEAT_SECONDS", "15"))
+KITCHEN_STREAM_OVERLAP = int(os.getenv("KITCHEN_STREAM_OVERLAP", "100"))
+
+OPEN_STATUSES = [OrderStatus.PENDING, OrderStatus.ACCEPTED, OrderStatus.PREPARING, OrderStatus.READY]
+
+# Events fetched per poll
+DELTA_BATCH_SIZE = 500
+
+def latest_sequence(db: Session) -> int:
+    return db.query(func.coalesce(func.max(OutboxEvent.id), 0)).scalar()
+
+def open_orders_snapshot(db: Session, cafe_ids: List[int]) -> Tuple[int, List[dict]]:
+    """(sequence, open orders of the cafes); changes after `sequence` arrive as deltas."""
+    # Read the sequence first: anything committed in between is replayed as a delta
+    sequence = latest_sequence(db)
+    orders = db.query(Order).options(
+        joinedload(Order.customer),
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item)
+    ).filter(
+        Order.cafe_id.in_(cafe_ids),
+        Order.status.in_(OPEN_STATUSES)
+    ).order_by(Order.created_at, Order.id).all()
+
+    return sequence, [{
+        "id": order.id,
+        "order_number": order.order_number,
+        "status": order.status.value,
+        "cafe_id": order.cafe_id,
+        "total_amount": order.total_amount,
+        "estimated_preparation_time": order.estimated_preparation_time,
+        "special_instructions": order.special_instructions,
+        "created_at": order.created_at.isoformat() if order.created_at else "",
+        "customer": {
+            "id": order.customer.id,
+            "full_name": order.customer.full_name
+        } if order.customer else None,
+        "items": [{
+            "menu_item_id": item.menu_item_id,
+            "name": item.menu_item.name if item.menu_item else "Unknown Item",
+            "quantity": item.quantity,
+            "special_instructions": item.special_instructions
+        } for item in order.order_items]
+    } for order in orders]
+
+def _delta_name(event: OutboxEvent, payload: dict) -> str:
+    if event.event_type == "new_order":
+        return "order_created"
+    if payload.get("status") == OrderStatus.CANCELLED.value:
+        return "order_cancelled"
+    return "order_status"
+
+class DeltaCursor:
+    """Position of one stream connection in the outbox."""
+
+    def __init__(self, sequence: int, overlap: int = KITCHEN_STREAM_OVERLAP):
+        self.sequence = sequence
+        self.overlap = overlap
+        # Ids read within the overlap window, so re-reads aren't sent twice
+        self._read: Set[int] = set()
+
+    def deltas(self, db: Session, cafe_ids: List[int]) -> List[Tuple[int, str, dict]]:
+        """[(sequence, event name, data)] for the cafes' events not yet read by this cursor."""
+        events = db.query(OutboxEvent).filter(
+            OutboxEvent.id > self.sequence - self.overlap
+        ).order_by(OutboxEvent.id).limit(self.overlap + DELTA_BATCH_SIZE).all()
+
+        wanted = set(cafe_ids)
+        deltas = []
+        for event in events:
+            if event.id in self._read:
+                continue
+            self._read.add(event.id)
+            self.sequence = max(self.sequence, event.id)
+            payload = json.loads(event.payload)
+            if payload.get("cafe_id") in wanted:
+                deltas.append((event.id, _delta_name(event, payload), payload))
+
+        floor = self.sequence - self.overlap
+        self._read = {event_id for event_id in self._read if event_id > floor}
+        return deltas
+
+def parse_sequence(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+def sse_message(event: str, data: dict, sequence: Optional[int] = None) -> str:
+    lines = []
+    if sequence is not None:
+        lines.append(f"id: {sequence}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
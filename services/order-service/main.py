@@ -1,17 +1,32 @@
 import os
 import uvicorn
 import requests
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+import asyncio
+import time
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response, Header
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
-from database import get_db, engine
-from models import Base, User, Order, OrderItem, MenuItem, Cafe, OrderStatus, UserType
-from middleware import get_current_user, get_current_cafe_owner, get_current_employee
+from database import get_db, get_async_db, engine, async_engine, SessionLocal
+from engine_factory import pool_stats
+from models import User, Order, OrderItem, MenuItem, Cafe, OrderStatus, UserType, migrate_schema
+from middleware import get_current_cafe_owner, get_current_employee
+from token_claims import Principal, revocation_list
+from token_cache import token_cache
+from inventory import load_menu_items, reserve_stock, release_stock, InsufficientStockError
+from pagination import OrderPageParams, paginate_orders_async, NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
+from outbox import OutboxDispatcher, record_new_order, record_order_status, OUTBOX_DISPATCHER_ENABLED
+from kitchen_stream import (
+    open_orders_snapshot, DeltaCursor, latest_sequence, parse_sequence, sse_message,
+    KITCHEN_STREAM_POLL_SECONDS, KITCHEN_STREAM_HEARTBEAT_SECONDS
+)
 from datetime import datetime
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
 
 app = FastAPI(title="Order Management Service", version="1.0.0")
 
@@ -22,8 +37,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER],
 )
 
+# Deliver order events from the outbox to notification-service
+outbox_dispatcher = OutboxDispatcher(SessionLocal)
+
+@app.on_event("startup")
+def start_outbox_dispatcher():
+    if OUTBOX_DISPATCHER_ENABLED:
+        outbox_dispatcher.start()
+
+@app.on_event("shutdown")
+def stop_outbox_dispatcher():
+    outbox_dispatcher.stop()
+
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 # Service URLs
 USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:5001")
 CAFE_SERVICE_URL = os.getenv("CAFE_SERVICE_URL", "http://cafe-service:5002")
@@ -92,10 +133,20 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "order-management"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
 @app.post("/orders", response_model=dict)
 async def create_order(
     order_data: OrderCreate,
-    current_user: User = Depends(get_current_employee),
+    current_user: Principal = Depends(get_current_employee),
     db: Session = Depends(get_db)
 ):
     """Create a new order (requires payment completion first)."""
@@ -116,12 +167,9 @@ async def create_order(
     estimated_prep_time = 0
     order_items_data = []
     
+    menu_items = load_menu_items(db, order_data.cafe_id, [item.menu_item_id for item in order_data.items])
     for item_data in order_data.items:
-        menu_item = db.query(MenuItem).filter(
-            MenuItem.id == item_data.menu_item_id,
-            MenuItem.cafe_id == order_data.cafe_id,
-            MenuItem.is_available == True
-        ).first()
+        menu_item = menu_items.get(item_data.menu_item_id)
         
         if not menu_item:
             raise HTTPException(
@@ -172,7 +220,7 @@ async def create_order(
 async def complete_order(
     order_data: OrderCreate,
     payment_confirmation: dict,
-    current_user: User = Depends(get_current_employee),
+    current_user: Principal = Depends(get_current_employee),
     db: Session = Depends(get_db)
 ):
     """Complete order creation after successful payment."""
@@ -195,15 +243,52 @@ async def complete_order(
             detail="Cafe not found or not active"
         )
     
-    # Create the order
-    order_number = generate_order_number()
+    # Price the order from the current menu
     total_amount = 0.0
     estimated_prep_time = 0
+    order_items_data = []
+    
+    menu_items = load_menu_items(
+        db, order_data.cafe_id, [item.menu_item_id for item in order_data.items], available_only=False
+    )
+    for item_data in order_data.items:
+        menu_item = menu_items.get(item_data.menu_item_id)
+        
+        if not menu_item:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Menu item {item_data.menu_item_id} not found"
+            )
+        
+        item_total = menu_item.price * item_data.quantity
+        total_amount += item_total
+        estimated_prep_time = max(estimated_prep_time, menu_item.preparation_time)
+        
+        order_items_data.append({
+            "menu_item": menu_item,
+            "quantity": item_data.quantity,
+            "unit_price": menu_item.price,
+            "total_price": item_total,
+            "special_instructions": item_data.special_instructions
+        })
+    
+    # Reserve stock for every line in one conditional UPDATE
+    try:
+        reserve_stock(db, [(item["menu_item"].id, item["quantity"]) for item in order_items_data])
+    except InsufficientStockError as e:
+        menu_item = next(item["menu_item"] for item in order_items_data if item["menu_item"].id == e.menu_item_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Not enough {menu_item.name} available. Only {e.available} left."
+        )
     
+    # Create the order
+    order_number = generate_order_number()
     db_order = Order(
         order_number=order_number,
-        total_amount=0.0,  # Will be updated below
+        total_amount=total_amount,
         status=OrderStatus.PENDING,
+        estimated_preparation_time=estimated_prep_time,
         special_instructions=order_data.special_instructions,
         payment_status="completed",
         payment_method=payment_confirmation.get("payment_method", "unknown"),
@@ -214,34 +299,19 @@ async def complete_order(
     db.add(db_order)
     db.flush()  # Get the order ID
     
-    # Create order items and update inventory
-    for item_data in order_data.items:
-        menu_item = db.query(MenuItem).filter(
-            MenuItem.id == item_data.menu_item_id
-        ).first()
-        
-        # Update inventory
-        menu_item.available_quantity -= item_data.quantity
-        
-        item_total = menu_item.price * item_data.quantity
-        total_amount += item_total
-        estimated_prep_time = max(estimated_prep_time, menu_item.preparation_time)
-        
-        order_item = OrderItem(
-            quantity=item_data.quantity,
-            unit_price=menu_item.price,
-            total_price=item_total,
-            special_instructions=item_data.special_instructions,
+    for item in order_items_data:
+        db.add(OrderItem(
+            quantity=item["quantity"],
+            unit_price=item["unit_price"],
+            total_price=item["total_price"],
+            special_instructions=item["special_instructions"],
             order_id=db_order.id,
-            menu_item_id=menu_item.id
-        )
-        
-        db.add(order_item)
-    
-    # Update order total and estimated time
-    db_order.total_amount = total_amount
-    db_order.estimated_preparation_time = estimated_prep_time
+            menu_item_id=item["menu_item"].id
+        ))
     
+    # The token only carries id and role; the notification needs the customer's name
+    customer_name = db.query(User.full_name).filter(User.id == current_user.id).scalar()
+    record_new_order(db, db_order, customer_name=customer_name)
     db.commit()
     db.refresh(db_order)
     
@@ -256,11 +326,17 @@ async def complete_order(
 
 @app.get("/orders/my", response_model=List[dict])
 async def get_my_orders(
-    current_user: User = Depends(get_current_employee),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: OrderPageParams = Depends(),
+    current_user: Principal = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all orders for current employee."""
-    orders = db.query(Order).filter(Order.customer_id == current_user.id).all()
+    """Get orders for current employee, newest first, one page at a time."""
+    statement = select(Order).options(
+        joinedload(Order.cafe),
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item)
+    ).where(Order.customer_id == current_user.id)
+    orders = await paginate_orders_async(db, statement, page, response)
     
     result = []
     for order in orders:
@@ -300,24 +376,19 @@ async def get_my_orders(
 
 @app.get("/cafe-orders", response_model=List[dict])
 async def get_cafe_orders(
-    status_filter: Optional[str] = Query(None, description="Filter by order status"),
-    current_user: User = Depends(get_current_cafe_owner),
-    db: Session = Depends(get_db)
+    response: Response,
+    page: OrderPageParams = Depends(),
+    current_user: Principal = Depends(get_current_cafe_owner),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all orders for cafes owned by current user."""
-    query = db.query(Order).join(Cafe).filter(Cafe.owner_id == current_user.id)
-    
-    if status_filter:
-        try:
-            status_enum = OrderStatus(status_filter.upper())
-            query = query.filter(Order.status == status_enum)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid status filter"
-            )
-    
-    orders = query.all()
+    """Get orders for cafes owned by current user, newest first, one page at a time."""
+    owned_cafe_ids = select(Cafe.id).where(Cafe.owner_id == current_user.id)
+    statement = select(Order).options(
+        joinedload(Order.customer),
+        joinedload(Order.cafe),
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item)
+    ).where(Order.cafe_id.in_(owned_cafe_ids.scalar_subquery()))
+    orders = await paginate_orders_async(db, statement, page, response)
     
     result = []
     for order in orders:
@@ -359,11 +430,67 @@ async def get_cafe_orders(
     
     return result
 
+def run_in_session(fn, *args):
+    """Run fn(db, *args) in a short-lived session (for work outside a request's session)."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+@app.get("/cafe-orders/stream")
+async def stream_cafe_orders(
+    request: Request,
+    after: Optional[int] = Query(None, description="Resume after this sequence number"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_cafe_owner)
+):
+    """Kitchen display stream (server-sent events) for the current owner's cafes.
+
+    Sends a `snapshot` of open orders (PENDING through READY), then
+    `order_created`, `order_status` and `order_cancelled` deltas. Every
+    message carries its sequence number as the event id; reconnect with
+    Last-Event-ID (or `after`) to resume without a new snapshot.
+    """
+    owner_id = current_user.id
+    resume_from = after if after is not None else parse_sequence(last_event_id)
+    
+    def owned_cafe_ids(db: Session) -> List[int]:
+        return [cafe_id for (cafe_id,) in db.query(Cafe.id).filter(Cafe.owner_id == owner_id).all()]
+    
+    async def events():
+        cafe_ids = await asyncio.to_thread(run_in_session, owned_cafe_ids)
+        yield "retry: 3000\n\n"
+        
+        sequence = resume_from
+        if sequence is None or sequence > await asyncio.to_thread(run_in_session, latest_sequence):
+            sequence, orders = await asyncio.to_thread(run_in_session, open_orders_snapshot, cafe_ids)
+            yield sse_message("snapshot", {"sequence": sequence, "orders": orders}, sequence)
+        cursor = DeltaCursor(sequence)
+        last_sent = time.monotonic()
+        
+        while not await request.is_disconnected():
+            deltas = await asyncio.to_thread(run_in_session, cursor.deltas, cafe_ids)
+            for delta_sequence, event, data in deltas:
+                yield sse_message(event, {**data, "sequence": delta_sequence}, delta_sequence)
+                last_sent = time.monotonic()
+            
+            if time.monotonic() - last_sent >= KITCHEN_STREAM_HEARTBEAT_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(KITCHEN_STREAM_POLL_SECONDS)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.put("/orders/{order_id}/status")
 async def update_order_status(
     order_id: int,
     status_update: OrderStatusUpdate,
-    current_user: User = Depends(get_current_cafe_owner),
+    current_user: Principal = Depends(get_current_cafe_owner),
     db: Session = Depends(get_db)
 ):
     """Update order status and estimated preparation time."""
@@ -400,6 +527,7 @@ async def update_order_status(
     if status_update.estimated_preparation_time is not None:
         order.estimated_preparation_time = status_update.estimated_preparation_time
     
+    record_order_status(db, order)
     db.commit()
     
     return {
@@ -413,7 +541,7 @@ async def update_order_status(
 @app.put("/orders/{order_id}/cancel")
 async def cancel_order(
     order_id: int,
-    current_user: User = Depends(get_current_employee),
+    current_user: Principal = Depends(get_current_employee),
     db: Session = Depends(get_db)
 ):
     """Cancel an order (only pending orders can be cancelled)."""
@@ -438,10 +566,9 @@ async def cancel_order(
     order.status = OrderStatus.CANCELLED
     
     # Restore inventory
-    for order_item in order.order_items:
-        menu_item = order_item.menu_item
-        menu_item.available_quantity += order_item.quantity
+    release_stock(db, [(item.menu_item_id, item.quantity) for item in order.order_items])
     
+    record_order_status(db, order)
     db.commit()
     
     return {
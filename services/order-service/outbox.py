@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+import requests
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from models import Order, OutboxEvent, RollupWatermark
+
+# Transactional outbox for order events.
+#
+# Order changes add an OutboxEvent to the session they commit, so the event
+# exists if and only if the change does. A background dispatcher claims due
+# events in batches, posts them to notification-service with an
+# Idempotency-Key header and retries failures with exponential backoff.
+# Delivered events are purged once they are OUTBOX_RETENTION_HOURS old.
+NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification-service:5007")
+OUTBOX_DISPATCHER_ENABLED = os.getenv("OUTBOX_DISPATCHER_ENABLED", "true").lower() == "true"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "168"))
+OUTBOX_PURGE_INTERVAL_SECONDS = float(os.getenv("OUTBOX_PURGE_INTERVAL_SECONDS", "3600"))
+
+# How long a claimed batch is reserved for one dispatcher before another may retry it
+CLAIM_SECONDS = 60
+MAX_BACKOFF_SECONDS = 300
+REQUEST_TIMEOUT_SECONDS = 5
+# Events deleted per purge transaction
+PURGE_BATCH_SIZE = 1000
+# Admin-service's rollups read order events after this watermark
+ROLLUP_ORDERS_WATERMARK = "orders"
+
+def _status_value(order_status) -> str:
+    # Handlers may assign the raw status string instead of an OrderStatus
+    return str(getattr(order_status, "value", order_status))
+
+def _record(db: Session, event_type: str, payload: dict):
+    db.add(OutboxEvent(
+        idempotency_key=uuid.uuid4().hex,
+        event_type=event_type,
+        payload=json.dumps(payload),
+        status="pending",
+        next_attempt_at=datetime.utcnow()
+    ))
+
+def record_new_order(db: Session, order: Order, customer_name: Optional[str] = None):
+    """Queue a new_order event; call after the order is flushed and before commit."""
+    _record(db, "new_order", {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "customer_id": order.customer_id,
+        "customer_name": customer_name,
+        "total_amount": order.total_amount,
+        "cafe_id": order.cafe_id,
+        "status": _status_value(order.status)
+    })
+
+def record_order_status(db: Session, order: Order):
+    """Queue an order_status event for the order's current status; call before commit."""
+    _record(db, "order_status", {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "status": _status_value(order.status),
+        "customer_id": order.customer_id,
+        "cafe_id": order.cafe_id,
+        "cafe_owner_id": order.cafe.owner_id if order.cafe else 0
+    })
+
+def purge_delivered_events(db: Session, retention: timedelta = timedelta(hours=OUTBOX_RETENTION_HOURS),
+                           batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete delivered events older than `retention`, a batch per commit; returns the number deleted.
+
+    Events the rollups have not read yet are kept, and so is the newest event:
+    SQLite would reuse its id, and the kitchen stream and rollups rely on ids
+    only growing.
+    """
+    newest = db.query(func.max(OutboxEvent.id)).scalar()
+    if newest is None:
+        return 0
+    criteria = [
+        OutboxEvent.status == "delivered",
+        OutboxEvent.delivered_at < datetime.utcnow() - retention,
+        OutboxEvent.id < newest
+    ]
+    watermark = db.query(RollupWatermark.last_id).filter(RollupWatermark.name == ROLLUP_ORDERS_WATERMARK).scalar()
+    if watermark is not None:
+        criteria.append(OutboxEvent.id <= watermark)
+
+    deleted = 0
+    while True:
+        batch = select(OutboxEvent.id).where(*criteria).order_by(OutboxEvent.id).limit(batch_size)
+        count = db.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+class OutboxDispatcher:
+    """Background thread that delivers pending outbox events to notification-service."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        notification_url: str = NOTIFICATION_SERVICE_URL,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS
+    ):
+        self.session_factory = session_factory
+        self.notification_url = notification_url.rstrip("/")
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._http = requests.Session()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_purge = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=REQUEST_TIMEOUT_SECONDS + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._purge_if_due()
+                # Keep going without sleeping while full batches are waiting
+                if self.run_once() == self.batch_size:
+                    continue
+            except Exception as e:
+                print(f"Outbox dispatch failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _purge_if_due(self):
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + OUTBOX_PURGE_INTERVAL_SECONDS
+        db = self.session_factory()
+        try:
+            purge_delivered_events(db)
+        finally:
+            db.close()
+
+    def run_once(self) -> int:
+        """Claim and deliver one batch of due events; returns the number claimed."""
+        db = self.session_factory()
+        try:
+            events = self._claim(db)
+            for event in events:
+                self._deliver(event)
+            db.commit()
+            return len(events)
+        finally:
+            db.close()
+
+    def _claim(self, db: Session) -> List[OutboxEvent]:
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        due = select(OutboxEvent.id).where(
+            OutboxEvent.status == "pending",
+            OutboxEvent.next_attempt_at <= now
+        ).order_by(OutboxEvent.id).limit(self.batch_size)
+        db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(due.scalar_subquery()), OutboxEvent.next_attempt_at <= now)
+            .values(claim_token=token, next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return db.query(OutboxEvent).filter(OutboxEvent.claim_token == token).order_by(OutboxEvent.id).all()
+
+    def _send(self, event: OutboxEvent) -> requests.Response:
+        payload = json.loads(event.payload)
+        headers = {"Idempotency-Key": event.idempotency_key}
+        if event.event_type == "new_order":
+            return self._http.post(
+                f"{self.notification_url}/notify/new-order",
+                json=payload, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS
+            )
+        if event.event_type == "order_status":
+            params = {key: payload[key] for key in ("order_id", "status", "customer_id", "cafe_owner_id", "cafe_id")}
+            return self._http.post(
+                f"{self.notification_url}/notify/order-status",
+                params=params, json={"order_number": payload.get("order_number")},
+                headers=headers, timeout=REQUEST_TIMEOUT_SECONDS
+            )
+        raise ValueError(f"Unknown outbox event type '{event.event_type}'")
+
+    def _deliver(self, event: OutboxEvent):
+        try:
+            response = self._send(event)
+            response.raise_for_status()
+        except Exception as e:
+            event.attempts = (event.attempts or 0) + 1
+            event.last_error = str(e)[:500]
+            event.claim_token = None
+            if event.attempts >= self.max_attempts:
+                event.status = "failed"
+            else:
+                backoff = min(2 ** event.attempts, MAX_BACKOFF_SECONDS)
+                event.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff)
+            return
+        event.status = "delivered"
+        event.delivered_at = datetime.utcnow()
+        event.claim_token = None
+        event.last_error = None
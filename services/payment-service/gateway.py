@@ -0,0 +1,115 @@
+import os
+import random
+import string
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+# Processing delay (min, max seconds) for each simulator latency profile
+LATENCY_PROFILES = {
+    "instant": (0.0, 0.0),
+    "fast": (0.05, 0.2),
+    "realistic": (0.5, 2.0),
+    "slow": (2.0, 5.0),
+}
+
+# Different success rates for different payment methods
+SUCCESS_RATES = {
+    "credit_card": 0.95,
+    "paypal": 0.98,
+    "corporate_account": 0.99,
+    "apple_pay": 0.97,
+    "google_pay": 0.97
+}
+
+REFUND_SUCCESS_RATE = 0.98
+
+# Simulated failure types
+FAILURES = [
+    {"error_code": "INSUFFICIENT_FUNDS", "message": "Insufficient funds in account"},
+    {"error_code": "CARD_DECLINED", "message": "Payment method declined"},
+    {"error_code": "NETWORK_ERROR", "message": "Network timeout - please try again"},
+    {"error_code": "INVALID_CARD", "message": "Invalid payment method details"}
+]
+
+class PaymentGateway(ABC):
+    """Interface for payment processors.
+
+    Implementations must be non-blocking: any network or simulated delay has
+    to be awaited so other requests keep being served while a charge is in
+    flight.
+    """
+
+    @abstractmethod
+    async def charge(self, method: str, amount: float) -> dict:
+        """Charge `amount` via `method`; returns success, transaction_id, message and error_code."""
+
+    @abstractmethod
+    async def refund(self, transaction_id: str, amount: float) -> dict:
+        """Refund part or all of a transaction; returns success and refund_id."""
+
+class SimulatedGateway(PaymentGateway):
+    """In-process payment simulator with realistic success/failure rates.
+
+    Passing a seed makes outcomes and transaction ids reproducible, and the
+    latency profile controls how long each simulated call takes.
+    """
+
+    def __init__(self, seed: Optional[int] = None, latency_profile: str = "realistic"):
+        if latency_profile not in LATENCY_PROFILES:
+            raise ValueError(
+                f"Unknown latency profile '{latency_profile}'. "
+                f"Available profiles: {', '.join(LATENCY_PROFILES)}"
+            )
+        self.rng = random.Random(seed)
+        self.latency_profile = latency_profile
+
+    async def _simulate_latency(self):
+        low, high = LATENCY_PROFILES[self.latency_profile]
+        if high > 0:
+            await asyncio.sleep(self.rng.uniform(low, high))
+
+    def generate_transaction_id(self, prefix: str = "TXN") -> str:
+        """Generate a mock transaction ID."""
+        timestamp = str(int(datetime.now().timestamp()))[-8:]
+        random_part = ''.join(self.rng.choices(string.ascii_uppercase + string.digits, k=6))
+        return f"{prefix}-{timestamp}-{random_part}"
+
+    async def charge(self, method: str, amount: float) -> dict:
+        await self._simulate_latency()
+
+        success_rate = SUCCESS_RATES.get(method.lower(), 0.90)
+        if self.rng.random() < success_rate:
+            return {
+                "success": True,
+                "transaction_id": self.generate_transaction_id(),
+                "message": f"Payment of ${amount:.2f} processed successfully via {method}",
+                "error_code": None
+            }
+
+        failure = self.rng.choice(FAILURES)
+        return {
+            "success": False,
+            "transaction_id": None,
+            "message": failure["message"],
+            "error_code": failure["error_code"]
+        }
+
+    async def refund(self, transaction_id: str, amount: float) -> dict:
+        await self._simulate_latency()
+
+        if self.rng.random() < REFUND_SUCCESS_RATE:
+            return {"success": True, "refund_id": self.generate_transaction_id("REF")}
+        return {"success": False, "refund_id": None}
+
+def create_gateway() -> PaymentGateway:
+    """Build the gateway selected by the PAYMENT_GATEWAY environment variable."""
+    gateway_name = os.getenv("PAYMENT_GATEWAY", "simulated")
+    if gateway_name == "simulated":
+        seed = os.getenv("PAYMENT_SIMULATOR_SEED")
+        return SimulatedGateway(
+            seed=int(seed) if seed else None,
+            latency_profile=os.getenv("PAYMENT_LATENCY_PROFILE", "realistic")
+        )
+    raise ValueError(f"Unknown payment gateway '{gateway_name}'")
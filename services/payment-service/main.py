@@ -1,21 +1,37 @@
 import os
 import uvicorn
-import random
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from typing import Optional
-from database import get_db, engine
-from models import Base
-from middleware import get_current_user
+from database import get_db, engine, async_engine, SessionLocal
+from engine_factory import pool_stats
+from models import migrate_schema
+from middleware import get_current_principal
+from token_claims import revocation_list
+from token_cache import token_cache
+from gateway import create_gateway
 from datetime import datetime
 from pydantic import BaseModel
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
 
 app = FastAPI(title="Payment Processing Service", version="1.0.0")
 
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -41,55 +57,8 @@ class PaymentResponse(BaseModel):
     order_status: str
     error_code: Optional[str] = None
 
-def generate_transaction_id() -> str:
-    """Generate a mock transaction ID."""
-    import string
-    timestamp = str(int(datetime.now().timestamp()))[-8:]
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"TXN-{timestamp}-{random_part}"
-
-def simulate_payment_processing(method: str, amount: float) -> dict:
-    """Simulate payment processing with realistic success/failure rates."""
-    # Different success rates for different payment methods
-    success_rates = {
-        "credit_card": 0.95,
-        "paypal": 0.98,
-        "corporate_account": 0.99,
-        "apple_pay": 0.97,
-        "google_pay": 0.97
-    }
-    
-    success_rate = success_rates.get(method.lower(), 0.90)
-    
-    # Simulate processing delay
-    import time
-    time.sleep(random.uniform(0.5, 2.0))  # 0.5-2 second delay
-    
-    is_successful = random.random() < success_rate
-    
-    if is_successful:
-        return {
-            "success": True,
-            "transaction_id": generate_transaction_id(),
-            "message": f"Payment of ${amount:.2f} processed successfully via {method}",
-            "error_code": None
-        }
-    else:
-        # Simulate different types of failures
-        failures = [
-            {"error_code": "INSUFFICIENT_FUNDS", "message": "Insufficient funds in account"},
-            {"error_code": "CARD_DECLINED", "message": "Payment method declined"},
-            {"error_code": "NETWORK_ERROR", "message": "Network timeout - please try again"},
-            {"error_code": "INVALID_CARD", "message": "Invalid payment method details"}
-        ]
-        
-        failure = random.choice(failures)
-        return {
-            "success": False,
-            "transaction_id": None,
-            "message": failure["message"],
-            "error_code": failure["error_code"]
-        }
+# Payment processor (simulated unless PAYMENT_GATEWAY selects another one)
+gateway = create_gateway()
 
 @app.get("/")
 async def root():
@@ -99,10 +68,20 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "payment-processing"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
 @app.post("/process-payment", response_model=PaymentResponse)
 async def process_payment(
     payment_request: PaymentRequest,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ):
     """Process a payment for an order."""
     
@@ -128,8 +107,8 @@ async def process_payment(
         )
     
     # Process the payment
-    payment_result = simulate_payment_processing(
-        payment_request.method, 
+    payment_result = await gateway.charge(
+        payment_request.method,
         payment_request.amount
     )
     
@@ -195,7 +174,7 @@ async def process_refund(
     transaction_id: str,
     amount: float,
     reason: str,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ):
     """Process a refund for a transaction."""
     
@@ -205,14 +184,12 @@ async def process_refund(
             detail="Refund amount must be greater than 0"
         )
     
-    # Simulate refund processing
-    refund_success = random.random() < 0.98  # 98% success rate for refunds
+    refund_result = await gateway.refund(transaction_id, amount)
     
-    if refund_success:
-        refund_id = generate_transaction_id().replace("TXN", "REF")
+    if refund_result["success"]:
         return {
             "success": True,
-            "refund_id": refund_id,
+            "refund_id": refund_result["refund_id"],
             "original_transaction_id": transaction_id,
             "amount": amount,
             "reason": reason,
@@ -231,7 +208,7 @@ async def process_refund(
 @app.get("/transaction/{transaction_id}")
 async def get_transaction_status(
     transaction_id: str,
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ):
     """Get the status of a transaction."""
     
@@ -1,13 +1,29 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import (
+    Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Text, Enum, Index, UniqueConstraint,
+    func, inspect, insert, select
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 import enum
 
+# Shared schema: every service carries an identical copy of this module.
+#
+# The indexes below are named and follow the services' real filters: orders
+# are listed per customer, per cafe, per cafe and status, or by status, always
+# ordered by (created_at, id); menu items are read per cafe (and matched by
+# name on import); feedback is read per cafe, order and customer; the outbox
+# is polled by status and claim token. Bump SCHEMA_VERSION with any new table
+# or index so migrate_schema adds it to existing databases.
+SCHEMA_VERSION = 3
+
 Base = declarative_base()
 
 class UserType(enum.Enum):
     CAFE_OWNER = "CAFE_OWNER"
     EMPLOYEE = "EMPLOYEE"
+    SUPER_ADMIN = "SUPER_ADMIN"
 
 class OrderStatus(enum.Enum):
     PENDING = "PENDING"
@@ -32,9 +48,13 @@ class User(Base):
     # Relationships
     owned_cafes = relationship("Cafe", back_populates="owner")
     orders = relationship("Order", back_populates="customer")
+    feedbacks = relationship("OrderFeedback", back_populates="customer")
 
 class Cafe(Base):
     __tablename__ = "cafes"
+    __table_args__ = (
+        Index("ix_cafes_owner", "owner_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -49,6 +69,7 @@ class Cafe(Base):
     owner = relationship("User", back_populates="owned_cafes")
     menu_items = relationship("MenuItem", back_populates="cafe")
     orders = relationship("Order", back_populates="cafe")
+    feedbacks = relationship("OrderFeedback", back_populates="cafe")
 
 class Category(Base):
     __tablename__ = "categories"
@@ -63,6 +84,11 @@ class Category(Base):
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        # A cafe's menu, and import matching by (cafe_id, name)
+        Index("ix_menu_items_cafe_name", "cafe_id", "name"),
+        Index("ix_menu_items_category", "category_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -84,6 +110,15 @@ class MenuItem(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination indexes: listings are ordered by (created_at, id)
+        Index("ix_orders_customer_created", "customer_id", "created_at", "id"),
+        Index("ix_orders_cafe_created", "cafe_id", "created_at", "id"),
+        Index("ix_orders_created", "created_at", "id"),
+        # Status-filtered listings and the kitchen's open orders
+        Index("ix_orders_cafe_status_created", "cafe_id", "status", "created_at", "id"),
+        Index("ix_orders_status_created", "status", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String, unique=True, nullable=False)
@@ -102,6 +137,7 @@ class Order(Base):
     customer = relationship("User", back_populates="orders")
     cafe = relationship("Cafe", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order")
+    feedback = relationship("OrderFeedback", back_populates="order", uselist=False)
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -111,9 +147,154 @@ class OrderItem(Base):
     unit_price = Column(Float, nullable=False)
     total_price = Column(Float, nullable=False)
     special_instructions = Column(Text)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
-    menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False, index=True)
     
     # Relationships
     order = relationship("Order", back_populates="order_items")
-    menu_item = relationship("MenuItem", back_populates="order_items")
\ No newline at end of file
+    menu_item = relationship("MenuItem", back_populates="order_items")
+
+class OrderFeedback(Base):
+    __tablename__ = "order_feedbacks"
+    __table_args__ = (
+        Index("ix_order_feedbacks_cafe_created", "cafe_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    customer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    cafe_id = Column(Integer, ForeignKey("cafes.id"), nullable=False)
+    rating = Column(Integer, nullable=False)  # 1-5 stars
+    feedback_text = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    order = relationship("Order", back_populates="feedback")
+    customer = relationship("User", back_populates="feedbacks")
+    cafe = relationship("Cafe", back_populates="feedbacks")
+
+class OutboxEvent(Base):
+    """Event written in the same transaction as an order change and delivered
+    to notification-service by the outbox dispatcher."""
+    __tablename__ = "outbox_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String, unique=True, nullable=False)
+    event_type = Column(String, nullable=False)  # 'new_order', 'order_status'
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String, default="pending")  # 'pending', 'delivered', 'failed'
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    claim_token = Column(String)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    delivered_at = Column(DateTime)
+    
+    __table_args__ = (
+        # The dispatcher polls for due pending events, then reads back the ones it claimed
+        Index("ix_outbox_events_due", "status", "next_attempt_at"),
+        Index("ix_outbox_events_claim", "claim_token"),
+    )
+
+class DailyCafeSales(Base):
+    """Per-cafe, per-day order totals maintained by admin-service's rollup job."""
+    __tablename__ = "daily_cafe_sales"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cafe_id = Column(Integer, ForeignKey("cafes.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    orders = Column(Integer, default=0)  # all orders placed that day, including cancelled ones
+    cancelled_orders = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)  # excludes cancelled orders
+    items = Column(Integer, default=0)  # units sold, excludes cancelled orders
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("cafe_id", "day", name="uq_daily_cafe_sales_cafe_day"),
+        Index("ix_daily_cafe_sales_day", "day"),
+    )
+
+class DailyCafeRating(Base):
+    """Per-cafe, per-day feedback totals maintained by admin-service's rollup job."""
+    __tablename__ = "daily_cafe_ratings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cafe_id = Column(Integer, ForeignKey("cafes.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    ratings = Column(Integer, default=0)
+    rating_total = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("cafe_id", "day", name="uq_daily_cafe_ratings_cafe_day"),
+        Index("ix_daily_cafe_ratings_day", "day"),
+    )
+
+class RollupWatermark(Base):
+    """Last source row id folded into the rollups, per source."""
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RestockSchedule(Base):
+    """Daily automatic restock of a cafe's menu, run by menu-service's restock scheduler."""
+    __tablename__ = "restock_schedules"
+    
+    cafe_id = Column(Integer, ForeignKey("cafes.id"), primary_key=True)
+    restock_time = Column(String, nullable=False, default="07:00")  # local opening time, HH:MM
+    timezone = Column(String, nullable=False, default="UTC")  # IANA name, e.g. 'Asia/Kolkata'
+    is_enabled = Column(Boolean, default=True)
+    last_restocked_on = Column(Date)  # local date of the last scheduled restock
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TokenRevocation(Base):
+    """Access tokens for a user issued with a `ver` claim below token_version are revoked."""
+    __tablename__ = "token_revocations"
+    
+    user_id = Column(Integer, primary_key=True)  # no foreign key: deleted users stay revoked
+    token_version = Column(Integer, nullable=False, default=1)
+    revoked_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class SchemaVersion(Base):
+    """Schema versions applied to this database by migrate_schema."""
+    __tablename__ = "schema_versions"
+    
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+def schema_version(bind) -> int:
+    """Highest schema version recorded in the database; 0 for a database that predates versioning."""
+    with bind.connect() as conn:
+        if not inspect(conn).has_table(SchemaVersion.__tablename__):
+            return 0
+        return conn.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+
+def migrate_schema(bind) -> int:
+    """Bring the database up to SCHEMA_VERSION and return the version it is at.
+
+    Creates missing tables, then missing indexes on tables that already
+    existed (create_all only indexes the tables it creates). Every step is
+    idempotent, so all services run it at startup against the shared database.
+    """
+    current = schema_version(bind)
+    if current >= SCHEMA_VERSION:
+        return current
+
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        if conn.dialect.name == "sqlite":
+            # Let the planner gather statistics for the new indexes
+            conn.exec_driver_sql("PRAGMA optimize")
+    try:
+        with bind.begin() as conn:
+            conn.execute(insert(SchemaVersion).values(version=SCHEMA_VERSION))
+    except IntegrityError:
+        # Another service recorded it first
+        pass
+    return SCHEMA_VERSION
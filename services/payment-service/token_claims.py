@@ -0,0 +1,145 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, sessionmaker
+from models import TokenRevocation, UserType
+from auth import ACCESS_TOKEN_EXPIRE_MINUTES
+
+# Role claims and token revocation.
+#
+# Access tokens carry the user's id (`uid`), role (`role`) and token version
+# (`ver`) next to `sub`, so role-gated endpoints authorize from the verified
+# token alone instead of reading the users table. Deactivating, deleting or
+# changing a user bumps their row in token_revocations; every service keeps
+# those rows in memory, refreshed in the background, and rejects tokens whose
+# `ver` is below the user's current version.
+TOKEN_REVOCATION_REFRESH_SECONDS = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "5"))
+
+# A token issued before a revocation expires within this long of it, so older
+# revocations no longer need to be held in memory
+TOKEN_LIFETIME = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+# Re-read revocations this far behind the watermark so rows committed late are not missed
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+class Principal:
+    """The caller as described by the claims of a verified access token."""
+
+    def __init__(self, id: int, username: str, user_type: UserType):
+        self.id = id
+        self.username = username
+        self.user_type = user_type
+        self.is_active = True
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.username, user.user_type)
+
+def token_claims(user, token_version: int) -> dict:
+    """Claims for a new access token for `user`."""
+    return {"sub": user.username, "uid": user.id, "role": user.user_type.value, "ver": token_version}
+
+def principal_from_claims(payload: dict) -> Optional[Principal]:
+    """Principal for a token carrying role claims; None for tokens issued without them."""
+    if "uid" not in payload or "role" not in payload or "ver" not in payload:
+        return None
+    try:
+        return Principal(int(payload["uid"]), payload.get("sub"), UserType(payload["role"]))
+    except ValueError:
+        return None
+
+def current_token_version(db: Session, user_id: int) -> int:
+    """The `ver` claim to put in tokens issued to a user now."""
+    return db.scalar(select(TokenRevocation.token_version).where(TokenRevocation.user_id == user_id)) or 0
+
+def revoke_user_tokens(db: Session, user_id: int) -> int:
+    """Revoke every token issued to a user so far and return the new version; the caller commits."""
+    now = datetime.utcnow()
+    updated = db.execute(
+        update(TokenRevocation)
+        .where(TokenRevocation.user_id == user_id)
+        .values(token_version=TokenRevocation.token_version + 1, revoked_at=now)
+    )
+    if updated.rowcount == 0:
+        db.add(TokenRevocation(user_id=user_id, token_version=1, revoked_at=now))
+        db.flush()
+    return current_token_version(db, user_id)
+
+class RevocationList:
+    """In-memory copy of recent token revocations, kept current by a background thread."""
+
+    def __init__(self, refresh_seconds: float = TOKEN_REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, Tuple[int, datetime]] = {}
+        self._watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+        entry = self._versions.get(user_id)
+        return entry is not None and token_version < entry[0]
+
+    def add(self, user_id: int, token_version: int, revoked_at: Optional[datetime] = None):
+        """Record a revocation; call after committing revoke_user_tokens to apply it here at once."""
+        revoked_at = revoked_at or datetime.utcnow()
+        with self._lock:
+            entry = self._versions.get(user_id)
+            if entry is None or token_version >= entry[0]:
+                self._versions[user_id] = (token_version, revoked_at)
+
+    def refresh(self, db: Session) -> int:
+        """Load revocations made since the last refresh; returns the number of rows read."""
+        now = datetime.utcnow()
+        since = self._watermark - REFRESH_OVERLAP if self._watermark else now - TOKEN_LIFETIME
+        rows = db.execute(
+            select(TokenRevocation.user_id, TokenRevocation.token_version, TokenRevocation.revoked_at)
+            .where(TokenRevocation.revoked_at >= since)
+        ).all()
+        for user_id, token_version, revoked_at in rows:
+            self.add(user_id, token_version, revoked_at)
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+        if self._watermark is None:
+            self._watermark = since
+
+        with self._lock:
+            expired = [user_id for user_id, (_, revoked_at) in self._versions.items()
+                       if revoked_at < now - TOKEN_LIFETIME]
+            for user_id in expired:
+                del self._versions[user_id]
+        return len(rows)
+
+    def start(self, session_factory: sessionmaker):
+        if self._thread is None:
+            # Load the current list before serving so no revoked token slips through at startup
+            self._refresh_once(session_factory)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(session_factory,),
+                                            name="token-revocations", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_seconds + 1)
+            self._thread = None
+
+    def _refresh_once(self, session_factory: sessionmaker):
+        db = session_factory()
+        try:
+            self.refresh(db)
+        except Exception as e:
+            print(f"Token revocation refresh failed: {e}")
+        finally:
+            db.close()
+
+    def _run(self, session_factory: sessionmaker):
+        while not self._stop.wait(self.refresh_seconds):
+            self._refresh_once(session_factory)
+
+    def stats(self) -> dict:
+        return {"revoked_users": len(self._versions), "watermark": self._watermark}
+
+revocation_list = RevocationList()
@@ -0,0 +1,77 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Cafe, MenuItem
+
+# Snapshot of the cafe catalogue served by /employee/cafes.
+#
+# The snapshot (active cafes with their menu and available-item counts) is
+# built with one grouped query and kept in-process until a menu or cafe write
+# in this service invalidates it. Writes made by other services (cafe-service,
+# menu-service) are picked up once the TTL expires.
+CATALOGUE_CACHE_TTL_SECONDS = float(os.getenv("CATALOGUE_CACHE_TTL_SECONDS", "60"))
+
+async def build_catalogue(db: AsyncSession) -> List[dict]:
+    """Active cafes with `menu_count` and `available_count`, from one grouped query."""
+    rows = (await db.execute(select(
+        Cafe,
+        func.count(MenuItem.id),
+        func.coalesce(func.sum(case((MenuItem.is_available == True, 1), else_=0)), 0)
+    ).outerjoin(
+        MenuItem, MenuItem.cafe_id == Cafe.id
+    ).where(
+        Cafe.is_active == True
+    ).group_by(Cafe.id).order_by(Cafe.id))).all()
+
+    return [{
+        "id": cafe.id,
+        "name": cafe.name,
+        "description": cafe.description,
+        "address": cafe.address,
+        "phone": cafe.phone,
+        "is_active": cafe.is_active,
+        "menu_count": menu_count,
+        "available_count": int(available_count)
+    } for cafe, menu_count, available_count in rows]
+
+def catalogue_etag(cafes: List[dict]) -> str:
+    body = json.dumps(cafes, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+
+class CatalogueCache:
+    """Single cached catalogue snapshot plus its ETag."""
+
+    def __init__(self, ttl_seconds: float = CATALOGUE_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[Tuple[List[dict], str, float]] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    async def get(self, db: AsyncSession) -> Tuple[List[dict], str]:
+        """Return (cafes, etag), rebuilding the snapshot if it is missing or expired."""
+        with self._lock:
+            snapshot = self._snapshot
+            generation = self._generation
+        if snapshot is not None and snapshot[2] > time.monotonic():
+            return snapshot[0], snapshot[1]
+
+        cafes = await build_catalogue(db)
+        etag = catalogue_etag(cafes)
+        with self._lock:
+            # Don't store a snapshot that an invalidation raced with
+            if generation == self._generation and self.ttl_seconds > 0:
+                self._snapshot = (cafes, etag, time.monotonic() + self.ttl_seconds)
+        return cafes, etag
+
+    def invalidate(self):
+        """Drop the snapshot after a cafe or menu item was written."""
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+catalogue_cache = CatalogueCache()
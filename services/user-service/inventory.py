@@ -0,0 +1,95 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+from models import MenuItem
+
+# Stock reservation for order placement.
+#
+# Stock is decremented with a single conditional UPDATE covering every line of
+# the order, so the check and the write happen atomically inside the database
+# instead of as a Python read-modify-write that can oversell under concurrency.
+
+class InsufficientStockError(Exception):
+    """Raised when at least one line of an order cannot be reserved."""
+
+    def __init__(self, menu_item_id: int, requested: int, available: int):
+        self.menu_item_id = menu_item_id
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Menu item {menu_item_id}: requested {requested}, available {available}")
+
+def load_menu_items(db: Session, cafe_id: int, menu_item_ids: List[int], available_only: bool = True) -> Dict[int, MenuItem]:
+    """Fetch the requested menu items of a cafe with one IN (...) query, keyed by id.
+
+    Ids that do not belong to the cafe (or are unavailable, when
+    `available_only` is set) are simply missing from the result.
+    """
+    query = db.query(MenuItem).filter(
+        MenuItem.cafe_id == cafe_id,
+        MenuItem.id.in_(set(menu_item_ids))
+    )
+    if available_only:
+        query = query.filter(MenuItem.is_available == True)
+    return {item.id: item for item in query.all()}
+
+def _total_quantities(lines: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    totals = defaultdict(int)
+    for menu_item_id, quantity in lines:
+        totals[menu_item_id] += quantity
+    return dict(totals)
+
+def _decrement(db: Session, quantities: Dict[int, int]) -> bool:
+    requested = case(quantities, value=MenuItem.id)
+    result = db.execute(
+        update(MenuItem.__table__)
+        .where(MenuItem.id.in_(quantities.keys()), MenuItem.available_quantity >= requested)
+        .values(available_quantity=MenuItem.available_quantity - requested)
+    )
+    return result.rowcount == len(quantities)
+
+def reserve_stock(db: Session, lines: Iterable[Tuple[int, int]]):
+    """Decrement stock for all (menu_item_id, quantity) lines, or for none of them.
+
+    Runs one UPDATE ... WHERE available_quantity >= requested for every item
+    at once. If any item is short the transaction is rolled back and
+    InsufficientStockError is raised, so call this before adding the order
+    itself to the session. The caller commits on success.
+    """
+    quantities = _total_quantities(lines)
+    if not quantities:
+        return
+
+    if _decrement(db, quantities):
+        return
+    db.rollback()
+
+    available = dict(
+        db.query(MenuItem.id, MenuItem.available_quantity)
+        .filter(MenuItem.id.in_(quantities.keys()))
+        .all()
+    )
+    for menu_item_id, quantity in quantities.items():
+        in_stock = available.get(menu_item_id) or 0
+        if in_stock < quantity:
+            raise InsufficientStockError(menu_item_id, quantity, in_stock)
+
+    # Every line fits now, so stock was replenished after the UPDATE ran; retry once
+    if _decrement(db, quantities):
+        return
+    db.rollback()
+    menu_item_id, quantity = next(iter(quantities.items()))
+    raise InsufficientStockError(menu_item_id, quantity, available.get(menu_item_id) or 0)
+
+def release_stock(db: Session, lines: Iterable[Tuple[int, int]]):
+    """Return stock for cancelled (menu_item_id, quantity) lines in one UPDATE."""
+    quantities = _total_quantities(lines)
+    if not quantities:
+        return
+
+    released = case(quantities, value=MenuItem.id)
+    db.execute(
+        update(MenuItem.__table__)
+        .where(MenuItem.id.in_(quantities.keys()))
+        .values(available_quantity=MenuItem.available_quantity + released)
+    )
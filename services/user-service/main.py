@@ -1,18 +1,30 @@
 import os
 import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query
+from fastapi import FastAPI, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import Optional, List
-from auth import verify_password, get_password_hash, create_access_token, verify_token
-from database import get_db, engine
-from models import Base, User, UserType, Cafe, MenuItem, Order, OrderItem, Category, OrderStatus
+from auth import verify_password_async, get_password_hash_async, create_access_token, verify_token
+from database import get_db, get_async_db, engine, async_engine, SessionLocal
+from engine_factory import pool_stats
+from models import User, UserType, Cafe, MenuItem, Order, OrderItem, Category, OrderStatus, migrate_schema
 from schemas import UserCreate, UserResponse, Token, UserLogin
-from middleware import get_current_user
+from middleware import get_current_user, get_current_principal
+from token_claims import Principal, token_claims, current_token_version, revocation_list
+from token_cache import token_cache
+from inventory import load_menu_items, reserve_stock, InsufficientStockError
+from pagination import OrderPageParams, paginate_orders_async, NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
+from catalogue import catalogue_cache
+from search import ensure_search_index, search_menu_items, search_facets
+from menu_import import parse_menu_import, import_menu_items, MenuImportError
+from outbox import OutboxDispatcher, record_new_order, record_order_status, OUTBOX_DISPATCHER_ENABLED
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or migrate the shared schema
+migrate_schema(engine)
+ensure_search_index(engine)
 
 app = FastAPI(title="User Management Service", version="1.0.0")
 
@@ -23,8 +35,56 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, "ETag"],
 )
 
+# Deliver order events from the outbox to notification-service
+outbox_dispatcher = OutboxDispatcher(SessionLocal)
+
+@app.on_event("startup")
+def start_outbox_dispatcher():
+    if OUTBOX_DISPATCHER_ENABLED:
+        outbox_dispatcher.start()
+
+@app.on_event("shutdown")
+def stop_outbox_dispatcher():
+    outbox_dispatcher.stop()
+
+# Keep this service's copy of the token revocation list current
+@app.on_event("startup")
+def start_revocation_list():
+    revocation_list.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_revocation_list():
+    revocation_list.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+async def load_orders_with_details(db: AsyncSession, page: OrderPageParams, response: Response, *criteria) -> List[Order]:
+    """Load one page of orders with customer, cafe and line items eager-loaded.
+
+    Customer and cafe are joined into the order query and the line items (with
+    their menu items) are fetched by one extra SELECT ... IN, so the number of
+    round trips stays the same however many orders match.
+    """
+    statement = select(Order).options(
+        joinedload(Order.customer),
+        joinedload(Order.cafe),
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item)
+    ).where(*criteria)
+    return await paginate_orders_async(db, statement, page, response)
+
+def format_order_item_summaries(order: Order) -> List[dict]:
+    """Short item listing used by the order overview endpoints."""
+    return [{
+        "name": item.menu_item.name if item.menu_item else "Unknown Item",
+        "quantity": item.quantity,
+        "price": item.unit_price
+    } for item in order.order_items]
+
 @app.get("/")
 async def root():
     return {"message": "User Management Service", "service": "users", "version": "1.0.0"}
@@ -33,6 +93,16 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "user-management"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool usage for this service's engines."""
+    return {**pool_stats(engine), "async_pool": pool_stats(async_engine)}
+
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Hit and miss counters for the verified-token cache."""
+    return {"token_cache": token_cache.stats(), "revocations": revocation_list.stats()}
+
 @app.post("/register", response_model=Token)
 async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user (cafe owner or employee)."""
@@ -55,7 +125,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
             )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -69,7 +139,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     db.refresh(db_user)
     
     # Create access token
-    access_token = create_access_token(data={"sub": db_user.username})
+    access_token = create_access_token(data=token_claims(db_user, current_token_version(db, db_user.id)))
     user_response = UserResponse.model_validate(db_user)
     
     return Token(access_token=access_token, token_type="bearer", user=user_response)
@@ -81,7 +151,8 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessi
     # Find user by username
     user = db.query(User).filter(User.username == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = await verify_password_async(form_data.password, user.hashed_password) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -94,8 +165,14 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessi
             detail="Inactive user"
         )
     
+    # Upgrade hashes made with an old work factor while the plain password is at hand
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+        db.refresh(user)
+    
     # Create access token
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data=token_claims(user, current_token_version(db, user.id)))
     user_response = UserResponse.model_validate(user)
     
     return Token(access_token=access_token, token_type="bearer", user=user_response)
@@ -129,7 +206,7 @@ async def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
 
 # Additional endpoints for testing - Cafe Owner features
 @app.post("/cafe-owner/cafes")
-async def create_cafe_endpoint(cafe_data: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_cafe_endpoint(cafe_data: dict, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Create a new cafe (save to actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can create cafes")
@@ -146,6 +223,7 @@ async def create_cafe_endpoint(cafe_data: dict, current_user: User = Depends(get
     
     db.add(new_cafe)
     db.commit()
+    catalogue_cache.invalidate()
     db.refresh(new_cafe)
     
     return {
@@ -160,7 +238,7 @@ async def create_cafe_endpoint(cafe_data: dict, current_user: User = Depends(get
     }
 
 @app.get("/cafe-owner/cafes")
-async def get_my_cafes_endpoint(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_my_cafes_endpoint(current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get user's cafes (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -185,7 +263,7 @@ async def get_my_cafes_endpoint(current_user: User = Depends(get_current_user),
     return cafe_list
 
 @app.get("/cafe-owner/cafes/{cafe_id}")
-async def get_cafe_details(cafe_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_cafe_details(cafe_id: int, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get cafe details (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -211,120 +289,113 @@ async def get_cafe_details(cafe_id: int, current_user: User = Depends(get_curren
     }
 
 @app.get("/cafe-owner/orders")
-async def get_cafe_orders_endpoint(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_cafe_orders_endpoint(
+    response: Response,
+    page: OrderPageParams = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get cafe orders (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
     
-    # Get cafes owned by current user
-    user_cafes = db.query(Cafe).filter(Cafe.owner_id == current_user.id).all()
-    cafe_ids = [cafe.id for cafe in user_cafes]
-    
-    if not cafe_ids:
-        return []
-    
     # Get orders for user's cafes, ordered by newest first
-    orders = db.query(Order).filter(Order.cafe_id.in_(cafe_ids)).order_by(Order.created_at.desc()).all()
+    owned_cafe_ids = select(Cafe.id).where(Cafe.owner_id == current_user.id)
+    orders = await load_orders_with_details(db, page, response, Order.cafe_id.in_(owned_cafe_ids.scalar_subquery()))
     
     # Convert to response format
     order_list = []
     for order in orders:
-        # Get customer info
-        customer = db.query(User).filter(User.id == order.customer_id).first()
-        
-        # Get cafe info
-        cafe = db.query(Cafe).filter(Cafe.id == order.cafe_id).first()
-        
-        # Get order items
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-        items = []
-        for item in order_items:
-            menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
-            items.append({
-                "name": menu_item.name if menu_item else "Unknown Item",
-                "quantity": item.quantity,
-                "price": item.unit_price
-            })
-        
         order_list.append({
             "id": order.id,
             "order_number": order.order_number,
             "total_amount": order.total_amount,
             "status": order.status.value,
-            "customer_name": customer.full_name if customer else "Unknown Customer",
-            "cafe_name": cafe.name if cafe else "Unknown Cafe",
+            "customer_name": order.customer.full_name if order.customer else "Unknown Customer",
+            "cafe_name": order.cafe.name if order.cafe else "Unknown Cafe",
             "created_at": order.created_at.isoformat() if order.created_at else "",
-            "items": items
+            "items": format_order_item_summaries(order)
         })
     
     return order_list
 
+@app.get("/cafe-owner/orders/summary")
+async def get_cafe_orders_summary(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Order totals across the owner's cafes, for the dashboard (the listing itself is paginated)."""
+    if current_user.user_type.value != "CAFE_OWNER":
+        raise HTTPException(status_code=403, detail="Only cafe owners can access this")
+    
+    owned_cafe_ids = select(Cafe.id).where(Cafe.owner_id == current_user.id)
+    total_orders, total_revenue, pending_orders = (await db.execute(
+        select(
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.total_amount), 0),
+            func.coalesce(func.sum(case((Order.status == OrderStatus.PENDING, 1), else_=0)), 0)
+        ).where(Order.cafe_id.in_(owned_cafe_ids.scalar_subquery()))
+    )).one()
+    
+    return {
+        "total_orders": total_orders,
+        "total_revenue": float(total_revenue),
+        "pending_orders": pending_orders
+    }
+
 # Employee endpoints
 @app.get("/employee/cafes")
-async def get_cafes_for_employee(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get available cafes for employees (from actual database)."""
+async def get_cafes_for_employee(
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get available cafes for employees, served from the cached catalogue."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
     
-    # Query all active cafes from database
-    cafes = db.query(Cafe).filter(Cafe.is_active == True).all()
+    cafe_list, etag = await catalogue_cache.get(db)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    # Convert to response format with menu count
-    cafe_list = []
-    for cafe in cafes:
-        menu_count = db.query(MenuItem).filter(MenuItem.cafe_id == cafe.id).count()
-        cafe_list.append({
-            "id": cafe.id,
-            "name": cafe.name,
-            "description": cafe.description,
-            "address": cafe.address,
-            "phone": cafe.phone,
-            "is_active": cafe.is_active,
-            "menu_count": menu_count
-        })
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
     
+    response.headers.update(cache_headers)
     return cafe_list
 
 @app.get("/employee/orders")
-async def get_employee_orders(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_employee_orders(
+    response: Response,
+    page: OrderPageParams = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get employee order history (from actual database)."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
     
     # Get orders for current employee, ordered by newest first
-    orders = db.query(Order).filter(Order.customer_id == current_user.id).order_by(Order.created_at.desc()).all()
+    orders = await load_orders_with_details(db, page, response, Order.customer_id == current_user.id)
     
     # Convert to response format
     order_list = []
     for order in orders:
-        # Get cafe info
-        cafe = db.query(Cafe).filter(Cafe.id == order.cafe_id).first()
-        
-        # Get order items
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-        items = []
-        for item in order_items:
-            menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
-            items.append({
-                "name": menu_item.name if menu_item else "Unknown Item",
-                "quantity": item.quantity,
-                "price": item.unit_price
-            })
-        
         order_list.append({
             "id": order.id,
             "order_number": order.order_number,
             "total_amount": order.total_amount,
             "status": order.status.value,
-            "cafe_name": cafe.name if cafe else "Unknown Cafe",
+            "cafe_name": order.cafe.name if order.cafe else "Unknown Cafe",
             "created_at": order.created_at.isoformat() if order.created_at else "",
-            "items": items
+            "items": format_order_item_summaries(order)
         })
     
     return order_list
 
 @app.get("/employee/orders/{order_id}")
-async def get_employee_order_details(order_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_employee_order_details(order_id: int, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get detailed information for a specific employee order (from actual database)."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
@@ -393,7 +464,7 @@ async def get_employee_order_details(order_id: int, current_user: User = Depends
 async def update_order_status(
     order_id: int,
     status_data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update order status (cafe owner only)."""
@@ -423,6 +494,7 @@ async def update_order_status(
     if new_status == "ACCEPTED" and "estimated_preparation_time" in status_data:
         order.estimated_preparation_time = status_data["estimated_preparation_time"]
     
+    record_order_status(db, order)
     db.commit()
     
     return {
@@ -434,7 +506,7 @@ async def update_order_status(
 @app.patch("/orders/{order_id}/cancel")
 async def cancel_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Cancel an order (employee only)."""
@@ -458,6 +530,7 @@ async def cancel_order(
     from models import OrderStatus
     order.status = OrderStatus.CANCELLED
     
+    record_order_status(db, order)
     db.commit()
     
     return {
@@ -471,15 +544,17 @@ async def cancel_order(
 async def get_cafe_menu(
     cafe_id: int, 
     category_id: Optional[int] = Query(None, description="Filter by category"),
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get menu items for a specific cafe (from actual database)."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
     
-    # Get menu items for the cafe
-    query = db.query(MenuItem).filter(
+    # Get menu items for the cafe, with their category names from the same query
+    statement = select(MenuItem, Category.name).outerjoin(
+        Category, Category.id == MenuItem.category_id
+    ).where(
         MenuItem.cafe_id == cafe_id,
         MenuItem.is_available == True,
         MenuItem.available_quantity > 0
@@ -487,20 +562,19 @@ async def get_cafe_menu(
     
     # Add category filter if specified
     if category_id:
-        query = query.filter(MenuItem.category_id == category_id)
+        statement = statement.where(MenuItem.category_id == category_id)
     
-    menu_items = query.all()
+    menu_items = (await db.execute(statement)).all()
     
     # Convert to response format
     items_list = []
-    for item in menu_items:
-        category = db.query(Category).filter(Category.id == item.category_id).first()
+    for item, category_name in menu_items:
         items_list.append({
             "id": item.id,
             "name": item.name,
             "description": item.description,
             "price": item.price,
-            "category": category.name if category else "Uncategorized",
+            "category": category_name or "Uncategorized",
             "available": item.is_available and item.available_quantity > 0,
             "available_quantity": item.available_quantity,
             "is_available": item.is_available,
@@ -513,39 +587,22 @@ async def get_cafe_menu(
 async def search_food_items(
     query: str = Query(..., description="Search query"),
     category_id: Optional[int] = Query(None, description="Filter by category"),
-    current_user: User = Depends(get_current_user), 
+    cafe_id: Optional[int] = Query(None, description="Filter by cafe"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of results"),
+    current_user: Principal = Depends(get_current_principal), 
     db: Session = Depends(get_db)
 ):
-    """Search food items across all cafes (from actual database)."""
+    """Search food items across all cafes, best matches first."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
     
-    # Build search query
-    search_query = db.query(MenuItem).join(Cafe).filter(
-        Cafe.is_active == True,
-        MenuItem.is_available == True,
-        MenuItem.available_quantity > 0
-    )
-    
-    # Add text search on name and description
-    search_terms = query.lower().split()
-    for term in search_terms:
-        search_query = search_query.filter(
-            (MenuItem.name.ilike(f"%{term}%")) | 
-            (MenuItem.description.ilike(f"%{term}%"))
-        )
-    
-    # Add category filter if specified
-    if category_id:
-        search_query = search_query.filter(MenuItem.category_id == category_id)
-    
-    menu_items = search_query.all()
+    menu_items = search_menu_items(db, query, category_id=category_id, cafe_id=cafe_id, limit=limit)
     
     # Convert to response format
     results = []
     for item in menu_items:
-        cafe = db.query(Cafe).filter(Cafe.id == item.cafe_id).first()
-        category = db.query(Category).filter(Category.id == item.category_id).first()
+        cafe = item.cafe
+        category = item.category
         
         results.append({
             "id": item.id,
@@ -567,8 +624,22 @@ async def search_food_items(
     
     return results
 
+@app.get("/employee/search/facets")
+async def search_food_item_facets(
+    query: str = Query(..., description="Search query"),
+    category_id: Optional[int] = Query(None, description="Filter by category"),
+    cafe_id: Optional[int] = Query(None, description="Filter by cafe"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Number of matching food items per cafe and per category."""
+    if current_user.user_type.value != "EMPLOYEE":
+        raise HTTPException(status_code=403, detail="Only employees can access this")
+    
+    return search_facets(db, query, category_id=category_id, cafe_id=cafe_id)
+
 @app.get("/employee/categories")
-async def get_categories_for_employee(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_categories_for_employee(current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get all food categories for employees (from actual database)."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
@@ -620,12 +691,9 @@ async def create_order(
         total_amount = 0
         validated_items = []
         
+        menu_items = load_menu_items(db, order_data["cafe_id"], [item["menu_item_id"] for item in order_data["items"]])
         for item_data in order_data["items"]:
-            menu_item = db.query(MenuItem).filter(
-                MenuItem.id == item_data["menu_item_id"],
-                MenuItem.cafe_id == order_data["cafe_id"],
-                MenuItem.is_available == True
-            ).first()
+            menu_item = menu_items.get(item_data["menu_item_id"])
             
             if not menu_item:
                 raise HTTPException(
@@ -650,6 +718,16 @@ async def create_order(
                 "special_instructions": item_data.get("special_instructions", "")
             })
         
+        # Reserve stock for every line in one conditional UPDATE
+        try:
+            reserve_stock(db, [(item["menu_item"].id, item["quantity"]) for item in validated_items])
+        except InsufficientStockError as e:
+            menu_item = next(item["menu_item"] for item in validated_items if item["menu_item"].id == e.menu_item_id)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Not enough stock for {menu_item.name}. Available: {e.available}"
+            )
+        
         # Generate unique order number
         import uuid
         order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
@@ -683,10 +761,8 @@ async def create_order(
                 menu_item_id=item_data["menu_item"].id
             )
             db.add(order_item)
-            
-            # Reduce available quantity
-            item_data["menu_item"].available_quantity -= item_data["quantity"]
         
+        record_new_order(db, new_order, customer_name=current_user.full_name)
         db.commit()
         
         # Return order details
@@ -711,7 +787,7 @@ async def create_order(
 
 # Payment endpoints (mock payment system)
 @app.get("/payments/payment-methods")
-async def get_payment_methods(current_user: User = Depends(get_current_user)):
+async def get_payment_methods(current_user: Principal = Depends(get_current_principal)):
     """Get available payment methods (mock for demo)."""
     return {
         "methods": [
@@ -751,7 +827,7 @@ async def get_payment_methods(current_user: User = Depends(get_current_user)):
 async def process_payment(
     order_id: int,
     payment_data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Process payment for an order (mock payment system)."""
@@ -797,7 +873,7 @@ async def process_payment(
 @app.patch("/cafe-owner/menu-items/{item_id}/availability")
 async def toggle_item_availability(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Toggle menu item availability (mark as out of stock)."""
@@ -824,6 +900,7 @@ async def toggle_item_availability(
         menu_item.available_quantity = 0
     
     db.commit()
+    catalogue_cache.invalidate()
     
     status = "available" if menu_item.is_available else "out of stock"
     return {
@@ -838,7 +915,7 @@ async def toggle_item_availability(
 async def restock_item(
     item_id: int,
     restock_data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Restock menu item with specified quantity."""
@@ -869,6 +946,7 @@ async def restock_item(
     menu_item.is_available = True
     
     db.commit()
+    catalogue_cache.invalidate()
     
     return {
         "success": True,
@@ -881,7 +959,7 @@ async def restock_item(
 
 # Categories endpoint that the frontend is looking for
 @app.get("/employee/cafes/{cafe_id}/categories")
-async def get_cafe_categories(cafe_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_cafe_categories(cafe_id: int, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get categories for a specific cafe (from actual database)."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
@@ -905,14 +983,14 @@ async def get_cafe_categories(cafe_id: int, current_user: User = Depends(get_cur
 
 # Dummy data initialization endpoint that frontend is calling
 @app.post("/employee/init-dummy-data")
-async def init_dummy_data(current_user: User = Depends(get_current_user)):
+async def init_dummy_data(current_user: Principal = Depends(get_current_principal)):
     """Initialize dummy data (placeholder endpoint)."""
     return {"message": "Dummy data already initialized", "status": "success"}
 
 # Missing cafe owner endpoints that frontend expects
 
 @app.get("/cafe-owner/categories") 
-async def get_categories_cafe_owner(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_categories_cafe_owner(current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get all food categories for cafe owners (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -933,7 +1011,7 @@ async def get_categories_cafe_owner(current_user: User = Depends(get_current_use
     return category_list
 
 @app.post("/cafe-owner/categories")
-async def create_category_cafe_owner(category_data: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_category_cafe_owner(category_data: dict, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Create a new category (save to actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -959,7 +1037,7 @@ async def create_category_cafe_owner(category_data: dict, current_user: User = D
 async def update_category_cafe_owner(
     category_id: int,
     category_data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update a category (save to actual database)."""
@@ -987,7 +1065,7 @@ async def update_category_cafe_owner(
 @app.delete("/cafe-owner/categories/{category_id}")
 async def delete_category_cafe_owner(
     category_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete a category (from actual database)."""
@@ -1017,7 +1095,7 @@ async def delete_category_cafe_owner(
     }
 
 @app.get("/cafe-owner/cafes/{cafe_id}/menu-items")
-async def get_menu_items_cafe_owner(cafe_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_menu_items_cafe_owner(cafe_id: int, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get menu items for a cafe (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -1058,7 +1136,7 @@ async def get_menu_items_cafe_owner(cafe_id: int, current_user: User = Depends(g
 async def update_menu_item_cafe_owner(
     item_id: int,
     item_data: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update a menu item."""
@@ -1100,6 +1178,7 @@ async def update_menu_item_cafe_owner(
     menu_item.updated_at = datetime.utcnow()
     
     db.commit()
+    catalogue_cache.invalidate()
     db.refresh(menu_item)
     
     # Get category info
@@ -1127,7 +1206,7 @@ async def update_menu_item_cafe_owner(
 @app.delete("/cafe-owner/menu-items/{item_id}")
 async def delete_menu_item_cafe_owner(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete a menu item."""
@@ -1163,6 +1242,7 @@ async def delete_menu_item_cafe_owner(
     # Delete the menu item
     db.delete(menu_item)
     db.commit()
+    catalogue_cache.invalidate()
     
     return {
         "success": True,
@@ -1171,7 +1251,7 @@ async def delete_menu_item_cafe_owner(
     }
 
 @app.post("/cafe-owner/cafes/{cafe_id}/menu-items")
-async def create_menu_item_cafe_owner(cafe_id: int, item_data: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_menu_item_cafe_owner(cafe_id: int, item_data: dict, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Create a new menu item (save to actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -1196,6 +1276,7 @@ async def create_menu_item_cafe_owner(cafe_id: int, item_data: dict, current_use
     
     db.add(new_menu_item)
     db.commit()
+    catalogue_cache.invalidate()
     db.refresh(new_menu_item)
     
     # Get category info
@@ -1217,10 +1298,35 @@ async def create_menu_item_cafe_owner(cafe_id: int, item_data: dict, current_use
         "created_at": new_menu_item.created_at.isoformat() if new_menu_item.created_at else ""
     }
 
+@app.post("/cafe-owner/cafes/{cafe_id}/menu-items/bulk")
+async def bulk_import_menu_items_cafe_owner(cafe_id: int, request: Request, atomic: bool = False, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
+    """Create or update many menu items at once from a JSON list or CSV, matching items by name."""
+    if current_user.user_type.value != "CAFE_OWNER":
+        raise HTTPException(status_code=403, detail="Only cafe owners can access this")
+    
+    # Verify cafe ownership
+    cafe = db.query(Cafe).filter(Cafe.id == cafe_id, Cafe.owner_id == current_user.id).first()
+    if not cafe:
+        raise HTTPException(status_code=404, detail="Cafe not found or access denied")
+    
+    try:
+        rows = parse_menu_import(await request.body(), request.headers.get("content-type"))
+    except MenuImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    report = import_menu_items(db, cafe_id, rows, atomic=atomic)
+    if not report["applied"]:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=report)
+    db.commit()
+    if report["created"] or report["updated"]:
+        catalogue_cache.invalidate()
+    return report
+
 # Additional CRUD endpoints for complete functionality
 
 @app.put("/cafe-owner/cafes/{cafe_id}/menu-items/{item_id}")
-async def update_menu_item_cafe_owner(cafe_id: int, item_id: int, item_data: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_menu_item_cafe_owner(cafe_id: int, item_id: int, item_data: dict, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Update a menu item (save to actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -1252,6 +1358,7 @@ async def update_menu_item_cafe_owner(cafe_id: int, item_id: int, item_data: dic
         menu_item.is_available = bool(item_data["is_available"])
     
     db.commit()
+    catalogue_cache.invalidate()
     db.refresh(menu_item)
     
     # Get category info
@@ -1274,7 +1381,7 @@ async def update_menu_item_cafe_owner(cafe_id: int, item_id: int, item_data: dic
     }
 
 @app.delete("/cafe-owner/cafes/{cafe_id}/menu-items/{item_id}")
-async def delete_menu_item_cafe_owner(cafe_id: int, item_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_menu_item_cafe_owner(cafe_id: int, item_id: int, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Delete a menu item (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -1290,11 +1397,12 @@ async def delete_menu_item_cafe_owner(cafe_id: int, item_id: int, current_user:
     
     db.delete(menu_item)
     db.commit()
+    catalogue_cache.invalidate()
     
     return {"message": "Menu item deleted successfully"}
 
 @app.get("/cafe-owner/cafes/{cafe_id}")
-async def get_cafe_details(cafe_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_cafe_details(cafe_id: int, current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get cafe details (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
@@ -1316,44 +1424,36 @@ async def get_cafe_details(cafe_id: int, current_user: User = Depends(get_curren
     }
 
 @app.get("/cafe-owner/cafes/{cafe_id}/orders")
-async def get_cafe_specific_orders(cafe_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_cafe_specific_orders(
+    cafe_id: int,
+    response: Response,
+    page: OrderPageParams = Depends(),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get orders for a specific cafe (from actual database)."""
     if current_user.user_type.value != "CAFE_OWNER":
         raise HTTPException(status_code=403, detail="Only cafe owners can access this")
     
     # Verify cafe ownership
-    cafe = db.query(Cafe).filter(Cafe.id == cafe_id, Cafe.owner_id == current_user.id).first()
-    if not cafe:
+    cafe_owned = await db.scalar(select(Cafe.id).where(Cafe.id == cafe_id, Cafe.owner_id == current_user.id))
+    if not cafe_owned:
         raise HTTPException(status_code=404, detail="Cafe not found or access denied")
     
     # Get orders for this specific cafe
-    orders = db.query(Order).filter(Order.cafe_id == cafe_id).all()
+    orders = await load_orders_with_details(db, page, response, Order.cafe_id == cafe_id)
     
     # Convert to response format
     order_list = []
     for order in orders:
-        # Get customer info
-        customer = db.query(User).filter(User.id == order.customer_id).first()
-        
-        # Get order items
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-        items = []
-        for item in order_items:
-            menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
-            items.append({
-                "name": menu_item.name if menu_item else "Unknown Item",
-                "quantity": item.quantity,
-                "price": item.unit_price
-            })
-        
         order_list.append({
             "id": order.id,
             "order_number": order.order_number,
             "total_amount": order.total_amount,
             "status": order.status.value,
-            "customer_name": customer.full_name if customer else "Unknown Customer",
+            "customer_name": order.customer.full_name if order.customer else "Unknown Customer",
             "created_at": order.created_at.isoformat() if order.created_at else "",
-            "items": items
+            "items": format_order_item_summaries(order)
         })
     
     return order_list
@@ -1361,7 +1461,7 @@ async def get_cafe_specific_orders(cafe_id: int, current_user: User = Depends(ge
 # Additional missing employee endpoints
 
 @app.get("/employee/categories")
-async def get_all_categories_employee(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_all_categories_employee(current_user: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     """Get all food categories for employees (from actual database)."""
     if current_user.user_type.value != "EMPLOYEE":
         raise HTTPException(status_code=403, detail="Only employees can access this")
@@ -1387,7 +1487,7 @@ async def filter_menu_items_employee(
     min_price: Optional[float] = Query(None, description="Minimum price"),
     max_price: Optional[float] = Query(None, description="Maximum price"),
     available_only: bool = Query(True, description="Show only available items"),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Filter menu items with various criteria (from actual database)."""
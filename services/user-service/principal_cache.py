@@ -0,0 +1,68 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Cache of authenticated principals so get_current_user does not have to hit
+# the users table on every request. Entries expire after the TTL, which bounds
+# how long a change made by another service (e.g. deactivating a user in the
+# admin service) can go unnoticed here.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+class PrincipalCache:
+    """Bounded LRU cache of users keyed by token subject and issued-at time."""
+
+    def __init__(self, ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS, max_size: int = PRINCIPAL_CACHE_MAX_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(payload: dict) -> str:
+        """Cache key for a decoded token; tokens without `iat` fall back to `exp`."""
+        return f"{payload.get('sub')}:{payload.get('iat', payload.get('exp'))}"
+
+    def get(self, key: str):
+        """Return the cached user for `key`, or None if missing or expired."""
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def put(self, key: str, user):
+        """Cache a user that is no longer attached to a session."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: Optional[int] = None, username: Optional[str] = None):
+        """Drop every cached entry for a user, e.g. after it was updated or deleted."""
+        with self._lock:
+            stale = [
+                key for key, (user, _) in self._entries.items()
+                if (user_id is not None and user.id == user_id)
+                or (username is not None and user.username == username)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,145 @@
+import re
+from typing import List, Optional
+from sqlalchemy import Float, Integer, and_, func, literal, or_, select, text
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from models import Cafe, Category, MenuItem
+
+# Full-text search over menu item names and descriptions.
+#
+# SQLite keeps an FTS5 index (menu_items_fts) in sync with menu_items through
+# triggers, so writes from any service are indexed without application code.
+# PostgreSQL uses a GIN index on the same tsvector expression the queries use.
+# Results are ranked (BM25 / ts_rank), every search term matches as a prefix,
+# and matching items are loaded together with their cafe and category in one
+# query.
+
+FTS_TABLE = "menu_items_fts"
+
+_SQLITE_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, content='menu_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON menu_items BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON menu_items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON menu_items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+_PG_DOCUMENT = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+# Set once the SQLite FTS5 table exists; without it searches fall back to LIKE.
+_sqlite_fts_ready = False
+
+def ensure_search_index(bind):
+    """Create the search index for the current database if it is missing."""
+    global _sqlite_fts_ready
+    with bind.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first()
+            try:
+                for statement in _SQLITE_FTS_DDL:
+                    conn.execute(text(statement))
+            except Exception:
+                # SQLite built without FTS5
+                return
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            _sqlite_fts_ready = True
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_menu_items_search ON menu_items USING gin ({_PG_DOCUMENT})"))
+
+def search_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+def _hits(db: Session, terms: List[str]):
+    """Subquery of (item_id, score) for items matching every term; lower score ranks first."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite" and _sqlite_fts_ready:
+        match = " ".join(f'"{term}"*' for term in terms)
+        return text(
+            f"SELECT rowid AS item_id, bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=match).columns(item_id=Integer, score=Float).subquery("hits")
+    if dialect == "postgresql":
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        return text(
+            f"SELECT id AS item_id, -ts_rank({_PG_DOCUMENT}, to_tsquery('simple', :tsquery)) AS score "
+            f"FROM menu_items WHERE {_PG_DOCUMENT} @@ to_tsquery('simple', :tsquery)"
+        ).bindparams(tsquery=tsquery).columns(item_id=Integer, score=Float).subquery("hits")
+    return select(MenuItem.id.label("item_id"), literal(0.0).label("score")).where(and_(*[
+        or_(MenuItem.name.ilike(f"%{term}%"), MenuItem.description.ilike(f"%{term}%"))
+        for term in terms
+    ])).subquery("hits")
+
+def _criteria(category_id: Optional[int], cafe_id: Optional[int]):
+    criteria = [
+        Cafe.is_active == True,
+        MenuItem.is_available == True,
+        MenuItem.available_quantity > 0
+    ]
+    if category_id:
+        criteria.append(MenuItem.category_id == category_id)
+    if cafe_id:
+        criteria.append(MenuItem.cafe_id == cafe_id)
+    return and_(*criteria)
+
+def search_menu_items(
+    db: Session,
+    query: str,
+    category_id: Optional[int] = None,
+    cafe_id: Optional[int] = None,
+    limit: int = 50
+) -> List[MenuItem]:
+    """Best matches for `query` among available items, with cafe and category loaded."""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    hits = _hits(db, terms)
+    return db.query(MenuItem).join(
+        hits, hits.c.item_id == MenuItem.id
+    ).join(
+        Cafe, Cafe.id == MenuItem.cafe_id
+    ).options(
+        contains_eager(MenuItem.cafe),
+        joinedload(MenuItem.category)
+    ).filter(
+        _criteria(category_id, cafe_id)
+    ).order_by(hits.c.score, MenuItem.id).limit(limit).all()
+
+def search_facets(
+    db: Session,
+    query: str,
+    category_id: Optional[int] = None,
+    cafe_id: Optional[int] = None
+) -> dict:
+    """Number of matching items per cafe and per category."""
+    terms = search_terms(query)
+    if not terms:
+        return {"cafes": [], "categories": []}
+    hits = _hits(db, terms)
+    criteria = _criteria(category_id, cafe_id)
+
+    cafes = db.query(Cafe.id, Cafe.name, func.count(MenuItem.id)).select_from(MenuItem).join(
+        hits, hits.c.item_id == MenuItem.id
+    ).join(Cafe, Cafe.id == MenuItem.cafe_id).filter(criteria).group_by(Cafe.id, Cafe.name).order_by(
+        func.count(MenuItem.id).desc(), Cafe.name
+    ).all()
+    categories = db.query(Category.id, Category.name, func.count(MenuItem.id)).select_from(MenuItem).join(
+        hits, hits.c.item_id == MenuItem.id
+    ).join(Cafe, Cafe.id == MenuItem.cafe_id).join(Category, Category.id == MenuItem.category_id).filter(
+        criteria
+    ).group_by(Category.id, Category.name).order_by(func.count(MenuItem.id).desc(), Category.name).all()
+
+    return {
+        "cafes": [{"id": id, "name": name, "count": count} for id, name, count in cafes],
+        "categories": [{"id": id, "name": name, "count": count} for id, name, count in categories]
+    }